@@ -0,0 +1,277 @@
+import threading
+import time
+from serial_writer import SerialWriter
+from serial_reader import SerialReader
+from serial_protocol import BAUD_RATE, encode_reset, encode_stats, encode_tone, encode_queue
+
+# Zamanlanmış (cihaz saatli) oynatma ayarları
+SCHEDULE_LOOKAHEAD = 0.25   # Notalar çalınmadan bu kadar saniye önce gönderilir
+RESET_TIMEOUT = 0.5         # RESET yanıtı gelmezse eski moda dönülür
+CREDIT_TIMEOUT = 1.0
+
+# Bağlantı ayarları
+BOOT_TIMEOUT = 3.0          # Kart bu sürede hazır olmazsa bağlantı başarısız
+PROBE_DELAY = 1.0           # DTR ile yeniden başlayan kartın bootloader'ına bu süre bayt gönderilmez
+PROBE_INTERVAL = 0.1        # Karşılama gelmezse STATS yoklaması aralığı
+RECONNECT_DELAYS = (0.25, 0.5, 1.0, 2.0, 4.0)   # Yeniden bağlanma denemeleri arası (son değer tekrarlanır)
+RECONNECT_TIMEOUT = 60.0    # Bu süre içinde bağlanamazsa vazgeçilir
+RELEASE_TIMEOUT = 1.0       # Port kapatılmadan okuyucu/yazıcı thread'lerinin bitmesi için beklenen en uzun süre
+
+
+class ArduinoBuzzer:
+    """Arduino iletişim sınıfı"""
+    def __init__(self):
+        self.ser = None
+        self.last_freq = -1
+        self.is_connected = False
+        self.writer = None      # Tüm yazmalar bu thread üzerinden yapılır
+        self.reader = None      # Gelen tüm veri bu thread üzerinden okunur
+        self.last_error = None
+        self.on_status = None   # on_status(metin): bağlantı olayları (arka plan thread'lerinden çağrılır)
+        
+        # Bağlantı yönetimi: port şarkılar arasında açık kalır, kopunca yeniden açılır
+        self.port = None
+        self.reset_on_connect = True   # False: açılışta DTR indirilmez, kart yeniden başlamaz
+        self.auto_reconnect = True
+        self.reconnecting = False
+        self.reconnects = 0
+        self.connect_time = None       # Son bağlantının port açılışından hazır olana kadar süresi
+        self._closing = threading.Event()
+        self._lock = threading.Lock()
+        self._reconnect_thread = None
+        
+        # Zamanlanmış mod: notalar cihazdaki kuyruğa önceden yüklenir
+        self.scheduled_mode = False
+        self.lookahead = 0.0
+        self.schedule_epoch = None   # Cihaz saatinin 0 anına denk gelen perf_counter
+        self.last_scheduled = 0.0
+    
+    def connect(self, port):
+        try:
+            self.close()
+            self._closing.clear()
+            self.port = port
+            self._open()
+            self.last_error = None
+            self.is_connected = True
+            return True, f"Başarıyla bağlandı ({self.connect_time:.2f} sn)"
+        except Exception as e:
+            self._release()
+            self.is_connected = False
+            return False, f"Bağlantı hatası: {str(e)}"
+    
+    def _open(self):
+        """Portu aç, okuyucu/yazıcı thread'lerini başlat ve kart hazır olana kadar bekle"""
+        import serial  # pyserial yalnızca bağlanırken yüklenir
+        ser = serial.Serial(None, BAUD_RATE, timeout=0.05)
+        ser.port = self.port
+        if not self.reset_on_connect:
+            ser.dtr = False  # Windows'ta ve Linux'ta `stty -hupcl` ile kart yeniden başlamaz
+        started = time.perf_counter()
+        ser.open()
+        self.ser = ser
+        self.writer = SerialWriter(ser, on_error=self._on_io_error)
+        self.writer.start()
+        self.reader = SerialReader(ser, on_error=self._on_io_error, on_boot=self._on_boot)
+        self.reader.start()
+        if not self._handshake(started):
+            raise TimeoutError("Arduino yanıt vermedi")
+        self.connect_time = time.perf_counter() - started
+        self.last_freq = -1
+    
+    def _handshake(self, started):
+        """Sabit süre uyumak yerine kartın karşılama satırını veya yoklamaya yanıtını bekle.
+        
+        Yeniden başlatılan kart açılınca karşılama satırını yazar; yeniden
+        başlamayan (DTR kapalı, yerleşik USB'li kartlar) kart STATS yoklamasına
+        yanıt verir. Bootloader çalışırken yoklama gönderilmez.
+        """
+        probe_at = started + (PROBE_DELAY if self.reset_on_connect else 0.0)
+        deadline = started + BOOT_TIMEOUT
+        while not self._closing.is_set():
+            now = time.perf_counter()
+            if now >= deadline:
+                return False
+            if now >= probe_at:
+                self.writer.send(encode_stats())
+                wait = PROBE_INTERVAL
+            else:
+                wait = probe_at - now
+            if self.reader.ready.wait(min(wait, deadline - now)):
+                return True
+        return False
+    
+    def send_freq(self, freq, at=None, on_written=None):
+        """Frekansı gönder; zamanlanmış modda `at` (perf_counter) anında çalınmak üzere kuyruğa ekle.
+
+        Anlık gönderilen tonda `on_written(bitiş_zamanı)` komut porta yazılınca çağrılır.
+        """
+        if not self.is_connected or freq == self.last_freq:
+            return
+        if at is not None and self.schedule_epoch is not None:
+            try:
+                self._queue_freq(freq, at)
+            except TimeoutError as e:
+                # Cihaz kredi göndermiyorsa anlık moda dön
+                self.last_error = e
+                self.fall_back_to_immediate()
+                self.writer.send_tone(encode_tone(freq), on_written)
+        else:
+            self.writer.send_tone(encode_tone(freq), on_written)
+        self.last_freq = freq
+    
+    def begin_playback(self):
+        """Oynatma başında çağrılır: zamanlanmış modda cihaz saatini eşitle"""
+        self.last_freq = -1
+        self.lookahead = 0.0
+        self.schedule_epoch = None
+        if not (self.scheduled_mode and self.is_connected):
+            return
+        
+        self.reader.prepare_reset()
+        sent = time.perf_counter()
+        self.writer.send(encode_reset())
+        
+        if self.reader.reset_event.wait(RESET_TIMEOUT):
+            # Cihaz saati, gidiş-dönüş süresinin ortasında sıfırlandı kabul edilir
+            self.schedule_epoch = (sent + time.perf_counter()) / 2
+            self.last_scheduled = self.schedule_epoch
+            self.lookahead = SCHEDULE_LOOKAHEAD
+    
+    def end_playback(self, wait=True):
+        """Kuyruktaki notalar çalınana kadar bekle ve zamanlanmış modu kapat"""
+        if self.schedule_epoch is None:
+            return
+        if wait:
+            remaining = self.last_scheduled - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+        self.schedule_epoch = None
+        self.lookahead = 0.0
+        if self.is_connected:
+            self.writer.send(encode_reset())
+    
+    def _queue_freq(self, freq, at):
+        # Kredi yoksa cihaz yer açana kadar bekle (tampon asla taşmaz)
+        if not self.reader.credits.acquire(timeout=CREDIT_TIMEOUT):
+            raise TimeoutError("Arduino kuyruğu yanıt vermiyor")
+        
+        device_ms = max(0, int(round((at - self.schedule_epoch) * 1000)))
+        self.writer.send(encode_queue(device_ms, freq))
+        self.last_scheduled = max(self.last_scheduled, at)
+    
+    def get_stats(self):
+        """Yeni telemetri iste ve son alınanı hemen döndür (hiç beklemez)"""
+        if not self.is_connected:
+            return None
+        self.writer.send(encode_stats())
+        return self.reader.stats()
+    
+    def write_metrics(self):
+        """Yazıcı thread'inin sayaçları (bytes/sn, kuyruk, birleştirilen, gecikme)"""
+        return self.writer.metrics() if self.writer else None
+    
+    def _notify(self, text):
+        if self.on_status:
+            self.on_status(text)
+    
+    def _on_io_error(self, error):
+        # Yazıcı/okuyucu thread'inden çağrılır: hata last_error'a yazılır ve on_status ile bildirilir
+        with self._lock:
+            self.last_error = error
+            if not self.is_connected:
+                return  # Diğer thread zaten bildirdi
+            self.is_connected = False
+            self.fall_back_to_immediate()
+            reconnect = self.auto_reconnect and not self._closing.is_set()
+            if reconnect:
+                self.reconnecting = True
+                self._reconnect_thread = threading.Thread(target=self._reconnect, daemon=True)
+                self._reconnect_thread.start()
+        self._notify(f"Seri port hatası: {error}" + (" - yeniden bağlanılıyor" if reconnect else ""))
+    
+    def _on_boot(self):
+        # Kart kendiliğinden yeniden başladı (güç dalgalanması, reset düğmesi): kuyruğu ve saati gitti
+        self.fall_back_to_immediate()
+        self.last_freq = -1
+    
+    def fall_back_to_immediate(self):
+        """Cihaz kuyruğu kullanılamıyor: süren oynatma anlık modda devam eder"""
+        self.schedule_epoch = None
+        self.lookahead = 0.0
+    
+    def _reconnect(self):
+        """USB kopup yeniden listelenirse aynı porta artan aralıklarla yeniden bağlan"""
+        self._release()
+        deadline = time.perf_counter() + RECONNECT_TIMEOUT
+        attempt = 0
+        message = None
+        while not self._closing.wait(RECONNECT_DELAYS[min(attempt, len(RECONNECT_DELAYS) - 1)]):
+            attempt += 1
+            try:
+                self._open()
+            except Exception as e:
+                self._release()
+                self.last_error = e
+                if time.perf_counter() >= deadline:
+                    message = f"Yeniden bağlanılamadı: {self.port}"
+                    break
+                continue
+            with self._lock:
+                if not self._closing.is_set():
+                    self.reconnects += 1
+                    self.is_connected = True
+                    message = f"Yeniden bağlandı: {self.port} ({attempt}. deneme)"
+            if message is None:
+                self._release()  # Açılırken close() çağrıldı: port kapalı kalır
+            break
+        self.reconnecting = False
+        if message:
+            self._notify(message)
+    
+    def stop(self):
+        """Çalmayı sustur; port bir sonraki şarkı için açık kalır"""
+        self.end_playback(wait=False)
+        self.send_freq(0)
+    
+    def disconnect(self):
+        """Sustur ve portu kapat (yeniden bağlanma denemeleri de durur)"""
+        self.stop()
+        self.close()
+    
+    def close(self):
+        """Bekleyen komutları yazıp portu kapat"""
+        with self._lock:
+            # Kilit altında: bundan sonra hata bildirimi yeni yeniden bağlanma thread'i başlatmaz
+            self._closing.set()
+            reconnect, self._reconnect_thread = self._reconnect_thread, None
+        if reconnect and reconnect is not threading.current_thread():
+            reconnect.join()
+        if self.writer and self.is_connected:
+            self.writer.flush()
+        self.is_connected = False
+        self._release()
+    
+    def _release(self):
+        # Thread'leri durdur, bitmelerini bekle ve portu kapat: kapanmış porta yazma
+        # yapılmaz. Nesneler yerinde kalır: bağlantı koptuğu an send_freq'e girmiş
+        # bir oynatıcı hata almaz
+        threads = [thread for thread in (self.writer, self.reader) if thread]
+        for thread in threads:
+            thread.stop()
+        for thread in threads:
+            if thread is not threading.current_thread() and thread.is_alive():
+                thread.join(RELEASE_TIMEOUT)
+        if self.ser and self.ser.is_open:
+            try:
+                self.ser.close()
+            except Exception:
+                pass  # Kopmuş USB aygıtı
+        self.ser = None
+    
+    @staticmethod
+    def get_note_name(note):
+        if note <= 0:
+            return "Sus"
+        names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
+        return f"{names[note % 12]}{(note // 12) - 1}"
@@ -7,16 +7,64 @@
  * - Buzzer (+) pini -> Arduino Pin 8
  * - Buzzer (-) pini -> Arduino GND
  * 
- * Seri Port Formatı: "FREQUENCY,DURATION\n"
- * Örnek: "440,200\n" -> 440 Hz frekansı 200 ms boyunca çal
- *        "0,0\n" -> Sesi durdur
+ * Seri Port Formatı (ikili, serial_protocol.py ile aynı):
+ *   [0xA0 | OPCODE] [VERİ (opcode'a göre sabit uzunluk)] [CHECKSUM]
+ *   CHECKSUM = başlık ve veri baytlarının XOR'u, değerler little-endian
+ * Örnek: A1 B8 01 18 -> 440 Hz sürekli çal
+ *        A1 00 00 A1 -> Sesi durdur
+ * 
+ * Zamanlanmış mod: A3 A3 (RESET) cihaz saatini sıfırlar ve "RESET:64" yanıtı
+ * verir. Ardından A4 komutları (cihaz zamanı ms + frekans) halka tampona
+ * yazılır ve millis() saatine göre çalınır. Boşalan yerler "CREDIT:n"
+ * satırlarıyla Python'a geri bildirilir.
+ * 
+ * Telemetri: A2 A2 (STATS) -> "STATS:<sıcaklık °C>,<boş RAM>,<millis>"
  */
 
-#define BUZZER_PIN 8  // Buzzer'ın bağlı olduğu pin
+#define BUZZER_PIN 8        // Buzzer'ın bağlı olduğu pin
+#define BAUD_RATE 115200    // Python tarafındaki BAUD_RATE ile aynı olmalı
+
+// Çerçeve başlığı: üst 4 bit sabit, alt 4 bit opcode
+#define FRAME_HEADER 0xA0
+#define FRAME_MASK   0xF0
+#define MAX_PAYLOAD  6
+
+// Opcode'lar
+#define OP_TONE  0x01       // Veri: uint16 frekans (Hz), 0 = sessiz
+#define OP_STATS 0x02       // Veri yok: telemetri satırı gönder
+#define OP_RESET 0x03       // Veri yok: kuyruğu boşalt, sustur, saati sıfırla
+#define OP_QUEUE 0x04       // Veri: uint32 cihaz zamanı (ms) + uint16 frekans
+
+// Zamanlanmış notalar için halka tampon (64 x 6 bayt = 384 bayt RAM)
+#define QUEUE_SIZE 64
+#define CREDIT_BATCH 8            // Bu kadar yer boşalınca hemen bildir
+#define CREDIT_INTERVAL_MS 20     // ...ya da en geç bu sürede bir
+
+uint32_t queueTime[QUEUE_SIZE];
+uint16_t queueFreq[QUEUE_SIZE];
+uint8_t queueHead = 0;
+uint8_t queueCount = 0;
+uint32_t clockEpoch = 0;
+uint8_t pendingCredits = 0;
+uint32_t lastCreditReport = 0;
+
+// Bloklamayan ayrıştırıcı durumları
+enum ParserState {
+  WAIT_HEADER,
+  READ_PAYLOAD,
+  READ_CHECKSUM
+};
+
+ParserState parserState = WAIT_HEADER;
+uint8_t frameHeader = 0;
+uint8_t payload[MAX_PAYLOAD];
+uint8_t payloadLength = 0;
+uint8_t payloadIndex = 0;
+uint8_t checksum = 0;
 
 void setup() {
   // Seri portu başlat
-  Serial.begin(9600);
+  Serial.begin(BAUD_RATE);
   
   // Buzzer pinini çıkış olarak ayarla
   pinMode(BUZZER_PIN, OUTPUT);
@@ -30,51 +78,151 @@ void setup() {
   tone(BUZZER_PIN, 1500, 100);
   delay(150);
   noTone(BUZZER_PIN);
+  
+  // Dahili sıcaklık sensörü: 1.1V referans, ADC8. Referansın oturması için
+  // bekleme sadece burada yapılır; STATS isteğinde loop() bloklanmaz.
+  ADMUX = _BV(REFS1) | _BV(REFS0) | _BV(MUX3);
+  ADCSRA |= _BV(ADEN);
+  delay(20);
 }
 
-void loop() {
-  // Seri porttan veri gelip gelmediğini kontrol et
-  if (Serial.available() > 0) {
-    // Satır sonuna kadar oku
-    String data = Serial.readStringUntil('\n');
-    data.trim();  // Boşlukları temizle
-    
-    // Virgül ile ayır
-    int commaIndex = data.indexOf(',');
-    if (commaIndex > 0) {
-      // Frekans ve süre değerlerini al
-      String freqStr = data.substring(0, commaIndex);
-      String durStr = data.substring(commaIndex + 1);
+// Opcode'a göre veri uzunluğu, bilinmeyen opcode için -1
+int8_t payloadSize(uint8_t opcode) {
+  switch (opcode) {
+    case OP_TONE:  return 2;
+    case OP_STATS: return 0;
+    case OP_RESET: return 0;
+    case OP_QUEUE: return 6;
+    default:       return -1;
+  }
+}
+
+void playFreq(uint16_t freq) {
+  // Frekans 0 ise sesi durdur, aksi halde sürekli çal
+  if (freq == 0) {
+    noTone(BUZZER_PIN);
+  } else {
+    tone(BUZZER_PIN, freq);
+  }
+}
+
+int freeRam() {
+  extern int __heap_start, *__brkval;
+  int v;
+  return (int)&v - (__brkval == 0 ? (int)&__heap_start : (int)__brkval);
+}
+
+float readChipTemp() {
+  // Tek dönüşüm ~100 us sürer
+  ADCSRA |= _BV(ADSC);
+  while (bit_is_set(ADCSRA, ADSC));
+  return (ADCW - 324.31) / 1.22;
+}
+
+void sendStats() {
+  Serial.print("STATS:");
+  Serial.print(readChipTemp(), 1);
+  Serial.print(",");
+  Serial.print(freeRam());
+  Serial.print(",");
+  Serial.println(millis());
+}
+
+void handleFrame(uint8_t opcode) {
+  switch (opcode) {
+    case OP_TONE:
+      playFreq(payload[0] | ((uint16_t)payload[1] << 8));
+      break;
       
-      int frequency = freqStr.toInt();
-      int duration = durStr.toInt();
+    case OP_STATS:
+      sendStats();
+      break;
       
-      // Debug için seri porta yazdır
-      Serial.print("Freq: ");
-      Serial.print(frequency);
-      Serial.print(" Hz, Dur: ");
-      Serial.print(duration);
-      Serial.println(" ms");
+    case OP_RESET:
+      queueHead = 0;
+      queueCount = 0;
+      pendingCredits = 0;
+      noTone(BUZZER_PIN);
+      clockEpoch = millis();
+      Serial.print("RESET:");
+      Serial.println(QUEUE_SIZE);
+      break;
       
-      // Frekans 0 ise sesi durdur
-      if (frequency == 0) {
-        noTone(BUZZER_PIN);
-      } 
-      // Aksi halde notayı çal
-      else {
-        // Duration 0 ise sürekli çal
-        if (duration == 0) {
-          tone(BUZZER_PIN, frequency);
-        } 
-        // Duration verilmişse belirtilen süre boyunca çal
-        else {
-          tone(BUZZER_PIN, frequency, duration);
-        }
+    case OP_QUEUE:
+      // Python kredi sayarak taşmayı önler; yine de doluysa komut atılır
+      if (queueCount < QUEUE_SIZE) {
+        uint8_t tail = (queueHead + queueCount) % QUEUE_SIZE;
+        queueTime[tail] = (uint32_t)payload[0] | ((uint32_t)payload[1] << 8) |
+                          ((uint32_t)payload[2] << 16) | ((uint32_t)payload[3] << 24);
+        queueFreq[tail] = payload[4] | ((uint16_t)payload[5] << 8);
+        queueCount++;
       }
+      break;
+  }
+}
+
+void readSerial() {
+  // Gelen baytları tek tek işle; hiçbir zaman satır sonu beklenmez
+  while (Serial.available() > 0) {
+    uint8_t b = Serial.read();
+    
+    switch (parserState) {
+      case WAIT_HEADER:
+        if ((b & FRAME_MASK) == FRAME_HEADER) {
+          int8_t size = payloadSize(b & 0x0F);
+          if (size < 0) break;
+          frameHeader = b;
+          checksum = b;
+          payloadLength = size;
+          payloadIndex = 0;
+          parserState = size > 0 ? READ_PAYLOAD : READ_CHECKSUM;
+        }
+        break;
+        
+      case READ_PAYLOAD:
+        payload[payloadIndex++] = b;
+        checksum ^= b;
+        if (payloadIndex >= payloadLength) {
+          parserState = READ_CHECKSUM;
+        }
+        break;
+        
+      case READ_CHECKSUM:
+        // Bozuk çerçeveler sessizce atlanır (debug yankısı yok)
+        if (b == checksum) {
+          handleFrame(frameHeader & 0x0F);
+        }
+        parserState = WAIT_HEADER;
+        break;
     }
   }
 }
 
+void playQueue() {
+  uint32_t now = millis() - clockEpoch;
+  
+  // Zamanı gelmiş girdileri çal; gecikme varsa en sonuncusu kalır
+  while (queueCount > 0 && (int32_t)(now - queueTime[queueHead]) >= 0) {
+    playFreq(queueFreq[queueHead]);
+    queueHead = (queueHead + 1) % QUEUE_SIZE;
+    queueCount--;
+    pendingCredits++;
+  }
+  
+  if (pendingCredits > 0 &&
+      (pendingCredits >= CREDIT_BATCH || millis() - lastCreditReport >= CREDIT_INTERVAL_MS)) {
+    Serial.print("CREDIT:");
+    Serial.println(pendingCredits);
+    pendingCredits = 0;
+    lastCreditReport = millis();
+  }
+}
+
+void loop() {
+  readSerial();
+  playQueue();
+}
+
 /*
  * NOTLAR:
  * 
@@ -0,0 +1,508 @@
+"""Arayüzsüz komut satırı oynatıcısı.
+
+    python -m arduino_midi_studio play song.mid --port /dev/ttyUSB0 --mode arpej --speed 1.5
+    python -m arduino_midi_studio play --playlist liste.txt --port /dev/ttyUSB0 --loop
+    python -m arduino_midi_studio play song.mid --mode poly --port /dev/ttyUSB0 --port /dev/ttyUSB1
+    python -m arduino_midi_studio play set.mid --port /dev/ttyUSB0 --start 40:00
+    python -m arduino_midi_studio render song.mid -o song.wav --mode arpej
+    python -m arduino_midi_studio emulate --record kayit.json
+    python -m arduino_midi_studio library --scan ~/midi piyano --fits 0
+    python -m arduino_midi_studio live --input "USB MIDI" --port /dev/ttyUSB0 --mode arpej
+    python -m arduino_midi_studio live --udp 5004 --port /dev/ttyUSB0 --stats canli.json
+    python -m arduino_midi_studio ports
+
+Tkinter hiç yüklenmez; pyserial bağlanırken, NumPy yalnızca Chiptune modunda,
+mido yalnızca MIDI girişi kullanılırken yüklenir.
+"""
+import argparse
+import json
+import os
+import signal
+import sys
+import threading
+from types import MappingProxyType
+
+from scheduler import PRECISION_PROFILES, DEFAULT_PRECISION, Scheduler
+from tuning import DEFAULT_A4
+from instrumentation import format_summary
+from melody import STRATEGIES, DEFAULT_STRATEGY
+
+# Çıkış kodları (systemd için)
+EXIT_OK = 0
+EXIT_PLAYBACK_ERROR = 1
+EXIT_USAGE = 2
+EXIT_CONNECTION = 3
+
+MODES = ('solo', 'arpej')
+PLAY_MODES = MODES + ('poly',)   # Çok kartlı çalma yalnızca gerçek/sanal portlarla
+# arpeggiator.PATTERNS ile aynı anahtarlar (NumPy'ı açılışta yüklememek için kopya)
+PATTERN_KEYS = ('up', 'down', 'updown', 'played')
+
+
+def read_playlist(path):
+    """Her satırda bir dosya yolu; boş ve # ile başlayan satırlar atlanır ("-" = stdin)"""
+    stream = sys.stdin if path == "-" else open(path, encoding='utf-8')
+    try:
+        return [line.strip() for line in stream if line.strip() and not line.lstrip().startswith("#")]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def build_settings(args):
+    """Oynatıcıların okuduğu ayar görüntüsü (oynatma boyunca sabit)"""
+    return MappingProxyType({
+        'transpose': args.transpose,
+        'playback_speed': args.speed,
+        'arp_speed': args.arp_speed,
+        'arp_pattern': args.pattern,
+        'a4': args.a4,
+        'cents': args.cents,
+        'melody': args.melody,
+    })
+
+
+class ConsoleStatus:
+    """Oynatıcı durum geri çağrısı: hataları ve (istenirse) notaları stdout'a yazar"""
+    def __init__(self, verbose=False):
+        self.verbose = verbose
+        self.error = None
+
+    def __call__(self, text, active):
+        if text.startswith("Hata:"):
+            self.error = text
+            print(text, file=sys.stderr, flush=True)
+        elif self.verbose:
+            print(text, flush=True)
+
+
+def print_status(text):
+    """Bağlantı olayları (kopma, yeniden bağlanma) stderr'e yazılır"""
+    print(text, file=sys.stderr, flush=True)
+
+
+def parse_pin(text):
+    """'KANAL:KART' (1'den başlar) -> (kanal, ses) sıfır tabanlı çift"""
+    try:
+        channel, board = (int(part) for part in text.split(":"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"KANAL:KART bekleniyordu: {text}")
+    if not 1 <= channel <= 16 or board < 1:
+        raise argparse.ArgumentTypeError(f"Geçersiz kanal veya kart: {text}")
+    return channel - 1, board - 1
+
+
+def parse_position(text):
+    """'SANİYE', 'DD:SS' veya 'SS:DD:SS' -> saniye"""
+    try:
+        seconds = 0.0
+        for part in text.split(":"):
+            seconds = seconds * 60 + float(part)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Geçersiz konum: {text}")
+    if seconds < 0:
+        raise argparse.ArgumentTypeError(f"Geçersiz konum: {text}")
+    return seconds
+
+
+def parse_udp(text):
+    """'[HOST:]PORT' -> (host, port); host verilmezse yalnızca yerel bağlantılar"""
+    host, _, port = text.rpartition(":")
+    try:
+        return host or "127.0.0.1", int(port)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"[HOST:]PORT bekleniyordu: {text}")
+
+
+def build_pins(pairs):
+    """--pin çiftlerini kanal -> ses listesi eşlemesine çevir"""
+    pins = {}
+    for channel, voice in pairs:
+        pins.setdefault(channel, [])
+        if voice not in pins[channel]:
+            pins[channel].append(voice)
+    return pins
+
+
+def player_class(mode):
+    if mode == 'poly':
+        from player_poly import PolyPlayer
+        return PolyPlayer
+    if mode == 'arpej':
+        from player_arpej import ChiptunePlayer
+        return ChiptunePlayer
+    from player_solo import SoloPlayer
+    return SoloPlayer
+
+
+def cmd_play(args):
+    files = list(args.files)
+    if args.playlist:
+        try:
+            files += read_playlist(args.playlist)
+        except OSError as e:
+            print(f"Çalma listesi okunamadı: {e}", file=sys.stderr)
+            return EXIT_USAGE
+    if not files:
+        print("Çalınacak dosya yok", file=sys.stderr)
+        return EXIT_USAGE
+
+    # Çok kartlı modda her port bir ses; diğer modlar yalnızca ilk portu kullanır
+    ports = args.port if args.mode == 'poly' else args.port[:1]
+    pins = build_pins(args.pin or ())
+    if any(voice >= len(ports) for voices in pins.values() for voice in voices):
+        print(f"--pin kart numarası 1-{len(ports)} aralığında olmalı", file=sys.stderr)
+        return EXIT_USAGE
+
+    from arduino_buzzer import ArduinoBuzzer
+    buzzers = []
+    for port in ports:
+        buzzer = ArduinoBuzzer()
+        buzzer.reset_on_connect = not args.no_reset
+        buzzer.on_status = print_status
+        ok, message = buzzer.connect(port)
+        if not ok:
+            print(f"{port}: {message}", file=sys.stderr)
+            for connected in buzzers:
+                connected.disconnect()
+            return EXIT_CONNECTION
+        if args.verbose:
+            print(f"{port}: {message}", flush=True)
+        buzzer.scheduled_mode = args.device_timing
+        buzzers.append(buzzer)
+    if args.stats_dir:
+        os.makedirs(args.stats_dir, exist_ok=True)
+
+    from playlist import Playlist, PlaylistPlayer
+    settings = build_settings(args)
+    status = ConsoleStatus(args.verbose)
+    playlist = Playlist(files, loop=args.loop)
+    failed = []
+    disconnected = []
+
+    def on_start(path):
+        print(f"Çalınıyor: {path}", flush=True)
+        status.error = None
+
+    def on_end(path, song):
+        print(f"Zamanlama: {format_summary(song.stats.summary())}", flush=True)
+        if args.stats_dir:
+            name = os.path.splitext(os.path.basename(path))[0] + ".json"
+            song.stats.export(os.path.join(args.stats_dir, name))
+        if status.error:
+            failed.append(path)
+        for buzzer in buzzers:
+            # Kopan port arka planda yeniden açılır; yalnızca vazgeçilmişse liste durur
+            if not buzzer.is_connected and not buzzer.reconnecting:
+                disconnected.append(buzzer)
+                player.stop()
+
+    # Şarkılar aynı thread'de, her biri öncekinin bittiği anda başlar
+    options = {'pins': pins} if args.mode == 'poly' else {}
+    player = PlaylistPlayer(playlist, player_class(args.mode), buzzers if args.mode == 'poly' else buzzers[0],
+                            status, lambda: settings, Scheduler(args.precision), start_at=args.start,
+                            on_start=on_start, on_end=on_end, **options)
+
+    def on_signal(signum, frame):
+        # systemd stop / Ctrl+C: çalan notayı kes ve temiz çık
+        player.stop()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    try:
+        player.start()
+        # join() zaman aşımıyla çağrılır ki sinyaller ana thread'de işlenebilsin
+        while player.is_alive():
+            player.join(0.2)
+    finally:
+        playlist.close()
+        for buzzer in buzzers:
+            buzzer.disconnect()
+
+    if disconnected:
+        print(f"Bağlantı koptu: {disconnected[0].last_error}", file=sys.stderr)
+        return EXIT_CONNECTION
+    return EXIT_PLAYBACK_ERROR if failed else EXIT_OK
+
+
+def cmd_live(args):
+    """MIDI girişini (mido portu veya UDP) durdurulana kadar buzzer'a çal"""
+    from live_input import LivePlayer, MidoSource, UdpSource
+
+    try:
+        source = UdpSource(*args.udp) if args.udp else MidoSource(args.input)
+    except ImportError:
+        print("MIDI girişi için mido gerekli (pip install mido python-rtmidi) veya --udp kullanın",
+              file=sys.stderr)
+        return EXIT_USAGE
+    except OSError as e:
+        print(f"UDP portu açılamadı: {e}", file=sys.stderr)
+        return EXIT_USAGE
+
+    from arduino_buzzer import ArduinoBuzzer
+    buzzer = ArduinoBuzzer()
+    buzzer.reset_on_connect = not args.no_reset
+    buzzer.on_status = print_status
+    ok, message = buzzer.connect(args.port)
+    if not ok:
+        print(f"{args.port}: {message}", file=sys.stderr)
+        source.close()
+        return EXIT_CONNECTION
+    if args.verbose:
+        print(f"{args.port}: {message}", flush=True)
+
+    settings = build_settings(args)
+    status = ConsoleStatus(args.verbose)
+    player = LivePlayer(source, buzzer, status, lambda: settings, args.mode, Scheduler(args.precision))
+
+    def on_signal(signum, frame):
+        player.stop()
+
+    signal.signal(signal.SIGINT, on_signal)
+    signal.signal(signal.SIGTERM, on_signal)
+
+    try:
+        player.start()
+        while player.is_alive():
+            player.join(0.2)
+            if not buzzer.is_connected and not buzzer.reconnecting:
+                player.stop()
+        lost = not buzzer.is_connected
+    finally:
+        source.close()
+        buzzer.disconnect()
+
+    summary = player.latency_summary()
+    latency = summary['latency']
+    if latency:
+        print(f"{summary['messages']} mesaj, {latency['count']} komut, giriş -> seri port: ort {latency['mean_ms']:.3f} ms, "
+              f"p99 {latency['p99_ms']:.3f} ms, en çok {latency['max_ms']:.3f} ms, "
+              f"{summary['budget_ms']:g} ms üstü {summary['over_budget']}")
+        for bucket, count in summary['histogram'].items():
+            print(f"  {bucket:>9}  {count}")
+    if args.stats:
+        with open(args.stats, "w", encoding="utf-8") as f:
+            json.dump({'summary': summary, 'latency': list(player.latency)}, f, indent=2)
+
+    if lost:
+        print(f"Bağlantı koptu: {buzzer.last_error}", file=sys.stderr)
+        return EXIT_CONNECTION
+    return EXIT_PLAYBACK_ERROR if status.error else EXIT_OK
+
+
+def cmd_render(args):
+    """Dosyaları donanım olmadan buzzer sesiyle WAV'a işle"""
+    from wav_renderer import render_file
+
+    files = list(args.files)
+    if args.playlist:
+        try:
+            files += read_playlist(args.playlist)
+        except OSError as e:
+            print(f"Çalma listesi okunamadı: {e}", file=sys.stderr)
+            return EXIT_USAGE
+    if not files:
+        print("İşlenecek dosya yok", file=sys.stderr)
+        return EXIT_USAGE
+
+    # Tek dosyada -o çıktı dosyasıdır, birden fazla dosyada çıktı klasörü
+    single_output = args.output and len(files) == 1 and args.output.lower().endswith(".wav")
+    if args.output and not single_output:
+        os.makedirs(args.output, exist_ok=True)
+
+    settings = build_settings(args)
+    failed = 0
+    for path in files:
+        name = os.path.splitext(os.path.basename(path))[0] + ".wav"
+        if single_output:
+            wav_path = args.output
+        elif args.output:
+            wav_path = os.path.join(args.output, name)
+        else:
+            wav_path = os.path.splitext(path)[0] + ".wav"
+        try:
+            seconds = render_file(path, wav_path, args.mode, settings, args.sample_rate)
+        except Exception as e:
+            print(f"Hata: {path}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"{wav_path} ({seconds:.1f} sn)", flush=True)
+
+    return EXIT_PLAYBACK_ERROR if failed else EXIT_OK
+
+
+def cmd_emulate(args):
+    """Sahte terminalde sanal Arduino başlat; dosya verilirse tüm yığını ona çalıp ölç"""
+    from virtual_arduino import VirtualArduino, measure
+
+    files = list(args.files)
+    if args.playlist:
+        try:
+            files += read_playlist(args.playlist)
+        except OSError as e:
+            print(f"Çalma listesi okunamadı: {e}", file=sys.stderr)
+            return EXIT_USAGE
+
+    if files:
+        settings = build_settings(args)
+        results = {}
+        exit_code = EXIT_OK
+        for path in files:
+            try:
+                results[path] = measure(path, args.mode, settings, args.device_timing, args.baud)
+            except ConnectionError as e:
+                print(f"Sanal karta bağlanılamadı: {path}: {e}", file=sys.stderr)
+                exit_code = EXIT_CONNECTION
+            except Exception as e:
+                print(f"Hata: {path}: {e}", file=sys.stderr)
+                exit_code = max(exit_code, EXIT_PLAYBACK_ERROR)
+        print(json.dumps(results, indent=2))
+        return exit_code
+
+    stopped = threading.Event()
+    signal.signal(signal.SIGINT, lambda signum, frame: stopped.set())
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopped.set())
+
+    with VirtualArduino(args.baud) as device:
+        print(f"Sanal Arduino hazır: {device.port}", flush=True)
+        while not stopped.wait(1.0):
+            pass
+        if args.record:
+            device.save(args.record)
+        print(json.dumps(device.summary()), flush=True)
+    return EXIT_OK
+
+
+def cmd_library(args):
+    """Kütüphane dizinini tara ve/veya ara"""
+    from library import Library, channel_list
+
+    library = Library(args.db)
+    if args.scan or args.rescan:
+        def progress(done, total):
+            print(f"\rTaranıyor: {done} / {total}", end="", file=sys.stderr, flush=True)
+        result = library.scan(args.scan, progress)
+        print(f"\n{result['files']} dosya, {result['scanned']} okundu, {result['removed']} silindi, "
+              f"{result['failed']} okunamadı", file=sys.stderr)
+        if not args.query and args.fits is None and args.max_polyphony is None:
+            return EXIT_OK
+
+    for row in library.search(" ".join(args.query), transpose=args.fits, max_polyphony=args.max_polyphony,
+                              limit=args.limit):
+        notes = f"{row['note_min']}-{row['note_max']}" if row['note_max'] is not None else "-"
+        print(f"{row['path']}\t{row['duration']:.1f} sn\t{row['tempo_min']:.0f}-{row['tempo_max']:.0f} BPM\t"
+              f"nota {notes}\tpolifoni {row['polyphony']}\tkanal {channel_list(row['channels'])}")
+    return EXIT_OK
+
+
+def cmd_ports(args):
+    import serial.tools.list_ports
+    for port in serial.tools.list_ports.comports():
+        print(f"{port.device}\t{port.description}")
+    from live_input import input_names
+    for name in input_names():
+        print(f"MIDI giriş\t{name}")
+    return EXIT_OK
+
+
+def add_settings_arguments(parser, modes=MODES):
+    """play ve render için ortak dosya ve ses ayarları"""
+    parser.add_argument("files", nargs="*", help=".mid dosyaları")
+    parser.add_argument("--playlist", help="Her satırda bir dosya yolu olan liste ('-' = stdin)")
+    parser.add_argument("--mode", choices=modes, default='solo')
+    parser.add_argument("--speed", type=float, default=1.0, help="Oynatma hızı çarpanı")
+    parser.add_argument("--transpose", type=int, default=0, help="Yarım ton kaydırma")
+    parser.add_argument("--arp-speed", type=int, default=40, help="Arpej adımı (ms)")
+    parser.add_argument("--pattern", choices=PATTERN_KEYS, default='up', help="Arpej deseni")
+    parser.add_argument("--melody", choices=list(STRATEGIES), default=DEFAULT_STRATEGY,
+                        help="Solo modunda melodi çıkarma stratejisi")
+    parser.add_argument("--a4", type=float, default=DEFAULT_A4, help="A4 referans frekansı (Hz)")
+    parser.add_argument("--cents", type=int, default=0, help="İnce akort (cent)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="arduino_midi_studio",
+        description="Arduino MIDI Studio - arayüzsüz oynatıcı"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    play = commands.add_parser("play", help="MIDI dosyalarını çal")
+    add_settings_arguments(play, PLAY_MODES)
+    play.add_argument("--port", action="append", required=True,
+                      help="Arduino seri portu (ör. /dev/ttyUSB0, COM3); poly modunda her kart için tekrarlanır")
+    play.add_argument("--pin", action="append", type=parse_pin, metavar="KANAL:KART",
+                      help="poly: MIDI kanalını belirli bir karta sabitle (1'den başlar, tekrarlanabilir)")
+    play.add_argument("--loop", action="store_true", help="Listeyi durdurulana kadar tekrarla")
+    play.add_argument("--start", type=parse_position, default=0.0, metavar="KONUM",
+                      help="İlk dosyayı bu konumdan başlat (saniye veya dd:ss)")
+    play.add_argument("--device-timing", action="store_true", help="Notaları Arduino kuyruğuna önden yükle")
+    play.add_argument("--no-reset", action="store_true",
+                      help="Bağlanırken kartı DTR ile yeniden başlatma (kart zaten çalışıyorsa anında bağlanır)")
+    play.add_argument("--precision", choices=list(PRECISION_PROFILES), default=DEFAULT_PRECISION,
+                      help="Zamanlayıcı hassasiyeti")
+    play.add_argument("--stats-dir", help="Her dosyadan sonra zamanlama kaydının (JSON) yazılacağı klasör")
+    play.add_argument("-v", "--verbose", action="store_true", help="Çalınan notaları yazdır")
+    play.set_defaults(func=cmd_play)
+
+    render = commands.add_parser("render", help="Buzzer sesini WAV dosyasına işle (donanım gerekmez)")
+    add_settings_arguments(render)
+    render.add_argument("-o", "--output", help="Çıktı .wav dosyası veya klasörü (varsayılan: MIDI'nin yanına)")
+    render.add_argument("--sample-rate", type=int, default=44100, help="Örnekleme hızı (Hz)")
+    render.set_defaults(func=cmd_render)
+
+    emulate = commands.add_parser("emulate", help="Sahte terminalde sanal Arduino çalıştır (Linux)")
+    add_settings_arguments(emulate)
+    emulate.add_argument("--record", help="Kapanışta komut/ton zaman çizelgesinin yazılacağı JSON")
+    emulate.add_argument("--baud", type=int, default=115200, help="Taklit edilen hat hızı (0 = sınırsız)")
+    emulate.add_argument("--device-timing", action="store_true", help="Ölçümde cihaz zamanlamasını kullan")
+    emulate.set_defaults(func=cmd_emulate)
+
+    library = commands.add_parser("library", help="MIDI kütüphanesini tara ve ara")
+    library.add_argument("query", nargs="*", help="Dosya yolunda geçmesi gereken kelimeler")
+    library.add_argument("--scan", action="append", metavar="KLASÖR",
+                         help="Klasörü dizine ekle ve tara (tekrarlanabilir)")
+    library.add_argument("--rescan", action="store_true", help="Daha önce taranan klasörleri yeniden tara")
+    library.add_argument("--fits", type=int, metavar="YARIM_TON",
+                         help="Yalnızca bu transpozla buzzer aralığına sığan dosyalar")
+    library.add_argument("--max-polyphony", type=int, help="En fazla bu kadar eş zamanlı nota")
+    library.add_argument("--limit", type=int, default=500, help="En fazla sonuç sayısı")
+    library.add_argument("--db", help="Dizin dosyası (varsayılan: önbellek klasöründe library.sqlite)")
+    library.set_defaults(func=cmd_library)
+
+    live = commands.add_parser("live", help="MIDI klavye girişini anlık olarak buzzer'a çal")
+    source = live.add_mutually_exclusive_group()
+    source.add_argument("--input", metavar="AD", help="mido giriş portu (varsayılan: sistemin ilk girişi)")
+    source.add_argument("--udp", type=parse_udp, metavar="[HOST:]PORT",
+                        help="Ham MIDI baytlarını UDP'den al (ör. 5004 veya 0.0.0.0:5004)")
+    live.add_argument("--port", required=True, help="Arduino seri portu (ör. /dev/ttyUSB0, COM3)")
+    live.add_argument("--no-reset", action="store_true", help="Bağlanırken kartı DTR ile yeniden başlatma")
+    live.add_argument("--mode", choices=MODES, default='solo')
+    live.add_argument("--transpose", type=int, default=0, help="Yarım ton kaydırma")
+    live.add_argument("--arp-speed", type=int, default=40, help="Arpej adımı (ms)")
+    live.add_argument("--pattern", choices=PATTERN_KEYS, default='up', help="Arpej deseni")
+    live.add_argument("--a4", type=float, default=DEFAULT_A4, help="A4 referans frekansı (Hz)")
+    live.add_argument("--cents", type=int, default=0, help="İnce akort (cent)")
+    live.add_argument("--precision", choices=list(PRECISION_PROFILES), default=DEFAULT_PRECISION,
+                      help="Arpej adımlarının zamanlayıcı hassasiyeti")
+    live.add_argument("--stats", help="Kapanışta mesaj gecikmelerinin yazılacağı JSON")
+    live.add_argument("-v", "--verbose", action="store_true", help="Çalınan notaları yazdır")
+    live.set_defaults(func=cmd_live, speed=1.0, melody=DEFAULT_STRATEGY)
+
+    ports = commands.add_parser("ports", help="Seri portları ve MIDI girişlerini listele")
+    ports.set_defaults(func=cmd_ports)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    for option, name in (('speed', "--speed"), ('arp_speed', "--arp-speed"), ('a4', "--a4")):
+        if getattr(args, option, 1) <= 0:
+            print(f"{name} sıfırdan büyük olmalı", file=sys.stderr)
+            return EXIT_USAGE
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import numpy as np
+from midi_timeline import NOTE_ON, PITCH_BEND
+from tuning import CENTS_PER_NOTE, REST
+
+# Arpej desenleri: anahtar -> arayüzde görünen isim
+PATTERNS = {
+    'up': "Yukarı",
+    'down': "Aşağı",
+    'updown': "Yukarı-Aşağı",
+    'played': "Çalındığı Sıra",
+}
+
+
+def iter_chords(events):
+    """Olay akışını akorun sabit kaldığı (başlangıç, bitiş, perdeler, yeni_vuruş) aralıklarına böl.
+
+    Perdeler (nota * 100 + kanal bükmesi) basılma sırasıyla verilir; boş demet
+    sessizlik demektir. Basılı notalar aynı kalıp yalnızca bükme değiştiyse
+    yeni_vuruş False olur.
+    """
+    active_notes = []  # (nota, kanal) basılma sırasıyla
+    bends = [0] * 16
+    batch_time = 0.0
+    chord = None
+    chord_keys = None
+
+    def pitches(keys):
+        return tuple(note * CENTS_PER_NOTE + bends[channel] for note, channel in keys)
+
+    for event_time, note, kind, channel, bend in events:
+        if event_time > batch_time:
+            keys = tuple(active_notes)
+            current = pitches(keys)
+            if current != chord:
+                if chord is not None:
+                    yield chord_start, batch_time, chord, retrigger
+                retrigger = keys != chord_keys
+                chord, chord_keys = current, keys
+                chord_start = batch_time
+            batch_time = event_time
+
+        if kind == PITCH_BEND:
+            bends[channel] = bend
+        elif kind == NOTE_ON:
+            if (note, channel) not in active_notes: active_notes.append((note, channel))
+        else:
+            if (note, channel) in active_notes: active_notes.remove((note, channel))
+
+    if chord is not None:
+        yield chord_start, batch_time, chord, retrigger
+    keys = tuple(active_notes)
+    yield batch_time, batch_time, pitches(keys), keys != chord_keys
+
+
+def pattern_order(notes, pattern):
+    """Akorun bir arpej turunda çalınacak perde sırası"""
+    if pattern == 'played':
+        return list(notes)
+    ordered = sorted(notes)
+    if pattern == 'down':
+        return ordered[::-1]
+    if pattern == 'updown':
+        # Uçlardaki notalar tekrar edilmez: C E G -> C E G E
+        return ordered + ordered[-2:0:-1]
+    return ordered
+
+
+def arp_steps(start, end, notes, step, pattern='up', first_index=0):
+    """Bir akor aralığının tüm arpej adımlarını tek seferde üret: (zamanlar, perdeler).
+
+    Zamanlar şarkı saniyesidir; `first_index` desenin hangi adımdan devam
+    edeceğini belirler (aralık ortasında yeniden üretirken kullanılır).
+    """
+    if len(notes) <= 1:
+        return [start], [notes[0] if notes else REST]
+
+    sequence = np.array(pattern_order(notes, pattern), dtype=np.int32)
+    # Küçük pay: kayan nokta hatası aralık sonuna fazladan adım eklemesin
+    count = max(1, int(np.ceil((end - start) / step - 1e-9)))
+    index = np.arange(count)
+    times = start + index * step
+    stepped = sequence[(index + first_index) % len(sequence)]
+    return times.tolist(), stepped.tolist()
+
+
+def build_schedule(events, step, pattern='up'):
+    """Tüm dosyanın arpej programını (zamanlar, perdeler) NumPy dizileri olarak üret"""
+    times = []
+    notes = []
+    for start, end, chord, retrigger in iter_chords(events):
+        chord_times, chord_notes = arp_steps(start, end, chord, step, pattern)
+        times.append(np.asarray(chord_times, dtype=np.float64))
+        notes.append(np.asarray(chord_notes, dtype=np.int32))
+    if not times:
+        return np.zeros(0), np.zeros(0, dtype=np.int32)
+    return np.concatenate(times), np.concatenate(notes)
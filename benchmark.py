@@ -0,0 +1,377 @@
+"""Sıcak yolların ölçümü: ayrıştırma, derleme, programlama, seri kodlama, zamanlayıcı.
+
+    python benchmark.py --output sonuc.json
+    python benchmark.py --sizes 1k,10k --baseline baseline.json
+    python benchmark.py --save-baseline baseline.json
+
+Sentetik MIDI dosyaları geçici bir klasörde üretilir. --baseline verilirse
+süreler karşılaştırılır ve tolerans aşılırsa çıkış kodu 1 olur.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import random
+import struct
+import sys
+import tempfile
+import time
+from types import MappingProxyType
+
+from midi_timeline import stream_events, compile_midi
+from timeline_cache import TimelineCache, content_digest
+from player_solo import iter_solo_segments
+from melody import extract_melody, DEFAULT_STRATEGY
+from arpeggiator import build_schedule
+from serial_protocol import encode_tone, encode_queue
+from scheduler import Scheduler, PRECISION_PROFILES
+from tuning import DEFAULT_A4
+
+SIZES = {'1k': 1000, '10k': 10000, '100k': 100000, '1M': 1000000}
+DEFAULT_SIZES = ('1k', '10k', '100k', '1M')
+# Ana korpus her boyutta ölçülür; uç profiller yalnızca VARIANT_SIZE boyutunda
+MAIN_PROFILE = {'tracks': 8, 'polyphony': 4, 'tempo_changes': 50}
+VARIANTS = {
+    'mono': {'tracks': 1, 'polyphony': 1, 'tempo_changes': 0},
+    'wide': {'tracks': 32, 'polyphony': 8, 'tempo_changes': 500},
+}
+VARIANT_SIZE = '100k'
+MIDO_MAX_EVENTS = 100000    # mido bu boyuttan büyük dosyalarda çok yavaş
+DEFAULT_TOLERANCE = 0.15    # Taban çizgisinden %15 yavaşlama regresyon sayılır
+# Bu mutlak farkın altındaki değişimler ölçüm gürültüsü sayılır
+NOISE_FLOOR_SECONDS = 0.001
+NOISE_FLOOR_JITTER_MS = 0.5
+SETTINGS = MappingProxyType({
+    'transpose': 0, 'playback_speed': 1.0, 'arp_speed': 40,
+    'arp_pattern': 'up', 'a4': DEFAULT_A4, 'cents': 0,
+    'melody': 'latest',   # Melodi çıkarma ayrıca ölçülür (schedule.melody)
+})
+
+
+# --- Sentetik korpus ---
+
+def _varlen(value):
+    out = [value & 0x7F]
+    value >>= 7
+    while value:
+        out.append(0x80 | (value & 0x7F))
+        value >>= 7
+    return bytes(reversed(out))
+
+
+def _track_chunk(events):
+    """(tick, baytlar) listesini delta zamanlı bir MTrk parçasına çevir"""
+    body = bytearray()
+    last = 0
+    for tick, data in sorted(events, key=lambda e: e[0]):
+        body += _varlen(tick - last)
+        body += data
+        last = tick
+    body += b"\x00\xff\x2f\x00"  # Parça sonu
+    return b"MTrk" + struct.pack(">I", len(body)) + bytes(body)
+
+
+def make_midi(path, events, tracks=8, polyphony=4, tempo_changes=50, seed=1):
+    """`events` kadar nota açma/kapama olayı içeren format 1 MIDI dosyası yaz.
+
+    Her parça `polyphony` sesi sırayla kullanır; tempo değişiklikleri ilk
+    parçaya eşit aralıklarla yerleştirilir.
+    """
+    rng = random.Random(seed)
+    ppq = 480
+    notes_per_track = max(1, events // 2 // tracks)
+    chunks = []
+    length = 0
+
+    for track in range(tracks):
+        channel = track % 16
+        if channel == 9:
+            channel = 8  # Davul kanalı atlanır, olaylar ayrıştırıcıda düşmesin
+        data = []
+        voice_free = [0] * polyphony
+        tick = 0
+        for i in range(notes_per_track):
+            tick += rng.randint(30, 240)
+            voice = i % polyphony
+            start = max(tick, voice_free[voice])
+            duration = rng.randint(60, 240 * polyphony)
+            note = rng.randint(36, 96)
+            data.append((start, bytes((0x90 | channel, note, rng.randint(40, 127)))))
+            data.append((start + duration, bytes((0x80 | channel, note, 0))))
+            voice_free[voice] = start + duration + 1
+        length = max(length, max(t for t, _ in data))
+        chunks.append(data)
+
+    for i in range(tempo_changes):
+        tempo = rng.randint(300000, 900000)
+        chunks[0].append((length * i // max(1, tempo_changes),
+                          b"\xff\x51\x03" + tempo.to_bytes(3, 'big')))
+
+    with open(path, "wb") as f:
+        f.write(b"MThd" + struct.pack(">IHHH", 6, 1, tracks, ppq))
+        for data in chunks:
+            f.write(_track_chunk(data))
+
+
+# --- Ölçümler ---
+
+def best_of(func, repeat):
+    """En iyi süre (sn) ve son sonuç"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def mido_baseline(path):
+    """Eski yol: mido ile yükle, olayları sözlük listesine topla ve sırala"""
+    import mido
+    events = []
+    for track in mido.MidiFile(path).tracks:
+        abs_time = 0
+        for msg in track:
+            abs_time += msg.time
+            if msg.type in ('note_on', 'note_off', 'set_tempo'):
+                if hasattr(msg, 'channel') and msg.channel == 9:
+                    continue
+                events.append({'time': abs_time, 'msg': msg})
+    events.sort(key=lambda x: x['time'])
+    return events
+
+
+def bench_corpus(path, label, count, repeat, cache, use_mido):
+    results = {}
+
+    def record(name, seconds, items=None, **extra):
+        entry = {'seconds': seconds}
+        if items:
+            entry['per_sec'] = items / seconds if seconds else 0.0
+        entry.update(extra)
+        results[f"{name}@{label}"] = entry
+
+    seconds, events = best_of(lambda: sum(1 for _ in stream_events(path)), repeat)
+    record("parse.stream", seconds, events, events=events)
+
+    compile_seconds, timeline = best_of(lambda: compile_midi(path), repeat)
+    record("parse.compile", compile_seconds, len(timeline))
+
+    # Karşılaştırma: mido + sözlük listesi + sıralama (ayrıştırıcıdan önceki yol)
+    if use_mido and count <= MIDO_MAX_EVENTS:
+        seconds, _ = best_of(lambda: mido_baseline(path), repeat)
+        record("parse.mido", seconds, len(timeline), speedup=seconds / compile_seconds)
+
+    key = cache.key_for(path)
+    cache.store(key, timeline, content_digest(path))
+    seconds, _ = best_of(lambda: cache.load(key), repeat)
+    record("cache.load", seconds, len(timeline))
+
+    seconds, segments = best_of(lambda: sum(1 for _ in iter_solo_segments(timeline)), repeat)
+    record("schedule.solo", seconds, len(timeline), segments=segments)
+
+    seconds, melody = best_of(lambda: extract_melody(timeline, DEFAULT_STRATEGY), repeat)
+    record("schedule.melody", seconds, len(timeline), segments=len(melody))
+
+    seconds, schedule = best_of(lambda: build_schedule(timeline, 0.04, 'up'), repeat)
+    record("schedule.arpej", seconds, len(timeline), steps=len(schedule[0]))
+
+    # Oynatıcı döngüsünün tamamı (ayarlar, tablo, seyreltme) sanal saatle
+    from wav_renderer import render_schedule
+    for mode in ('solo', 'arpej'):
+        seconds, sent = best_of(lambda: render_schedule(path, mode, SETTINGS, cache)[0], repeat)
+        record(f"player.{mode}", seconds, len(timeline), commands=len(sent))
+
+    return results
+
+
+class NullSerial:
+    """Yazılanları atan seri port: kodlama ve yazıcı yolunu G/Ç'siz ölçmek için"""
+    is_open = True
+    in_waiting = 0
+
+    def write(self, data):
+        return len(data)
+
+    def read(self, size=1):
+        time.sleep(0.01)
+        return b""
+
+    def close(self):
+        self.is_open = False
+
+
+def bench_serial(count, repeat):
+    results = {}
+    freqs = [200 + i % 1800 for i in range(count)]
+
+    seconds, _ = best_of(lambda: [encode_tone(f) for f in freqs], repeat)
+    results["serial.encode_tone"] = {'seconds': seconds, 'per_sec': count / seconds}
+
+    seconds, _ = best_of(lambda: [encode_queue(i, f) for i, f in enumerate(freqs)], repeat)
+    results["serial.encode_queue"] = {'seconds': seconds, 'per_sec': count / seconds}
+
+    # send_freq -> yazıcı thread'i -> port; çağrı hızı ve boşaltma süresi
+    from arduino_buzzer import ArduinoBuzzer
+    from serial_writer import SerialWriter
+
+    def run():
+        buzzer = ArduinoBuzzer()
+        buzzer.writer = SerialWriter(NullSerial())
+        buzzer.writer.start()
+        buzzer.is_connected = True
+        start = time.perf_counter()
+        for freq in freqs:
+            buzzer.send_freq(freq)
+        calls = time.perf_counter() - start
+        buzzer.writer.flush(timeout=10.0)
+        drained = time.perf_counter() - start
+        metrics = buzzer.writer.metrics()
+        buzzer.writer.stop()
+        return calls, drained, metrics
+
+    best = None
+    for _ in range(repeat):
+        calls, drained, metrics = run()
+        if best is None or calls < best[0]:
+            best = (calls, drained, metrics)
+    calls, drained, metrics = best
+    results["serial.send_freq"] = {
+        'seconds': calls,
+        'per_sec': count / calls,
+        'drain_seconds': drained,
+        'coalesced': metrics['coalesced'],
+        'dropped': metrics['dropped'],
+    }
+    return results
+
+
+def bench_scheduler(waits, interval):
+    """Her hassasiyet profilinde `interval` aralıklı beklemelerin gecikme dağılımı (ms)"""
+    results = {}
+    for profile in PRECISION_PROFILES:
+        scheduler = Scheduler(profile, history=waits)
+        target = time.perf_counter() + interval
+        cpu_start = time.process_time()
+        for _ in range(waits):
+            scheduler.wait_until(target)
+            target += interval
+        cpu = time.process_time() - cpu_start
+        samples = sorted(scheduler.lateness)
+        results[f"scheduler.{profile}"] = {
+            'p50_ms': samples[len(samples) // 2] * 1000,
+            'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+            'max_ms': samples[-1] * 1000,
+            'cpu_ratio': cpu / (waits * interval),
+        }
+    return results
+
+
+# --- Karşılaştırma ---
+
+def primary_metric(name, entry):
+    """Regresyon kontrolünde kullanılan değer (büyük = kötü) ve gürültü eşiği"""
+    if name.startswith("scheduler."):
+        return entry['p99_ms'], NOISE_FLOOR_JITTER_MS
+    return entry['seconds'], NOISE_FLOOR_SECONDS
+
+
+def compare(results, baseline, tolerance):
+    """Taban çizgisine göre yavaşlayan ölçümleri döndür: [(ad, eski, yeni, oran)]"""
+    regressions = []
+    for name, entry in sorted(results.items()):
+        old = baseline.get(name)
+        if not old:
+            continue
+        before, floor = primary_metric(name, old)
+        after, _ = primary_metric(name, entry)
+        ratio = after / before if before else 1.0
+        slower = ratio > 1 + tolerance and after - before > floor
+        marker = "  << REGRESYON" if slower else ""
+        print(f"{name:28s} {before:12.6f} -> {after:12.6f}  x{ratio:5.2f}{marker}")
+        if marker:
+            regressions.append((name, before, after, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Arduino MIDI Studio benchmark")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES),
+                        help="Olay sayıları: " + ", ".join(SIZES))
+    parser.add_argument("--repeat", type=int, default=3, help="Tekrar sayısı (en iyisi alınır)")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON")
+    parser.add_argument("--baseline", help="Karşılaştırılacak önceki JSON")
+    parser.add_argument("--save-baseline", help="Sonuçları yeni taban çizgisi olarak kaydet")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--no-variants", action="store_true", help="Sadece ana korpusu ölç")
+    parser.add_argument("--no-mido", action="store_true", help="mido ile karşılaştırmayı atla")
+    parser.add_argument("--jitter-waits", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    labels = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in labels if s not in SIZES]
+    if unknown:
+        parser.error(f"bilinmeyen boyut: {', '.join(unknown)}")
+
+    use_mido = not args.no_mido and importlib.util.find_spec("mido") is not None
+    if not args.no_mido and not use_mido:
+        print("mido yüklü değil: parse.mido ölçülmeyecek", file=sys.stderr)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        # Oynatıcı yolu kullanıcının önbelleğine yazmasın: önbellek her ölçüme açıkça verilir
+        cache = TimelineCache(os.path.join(workdir, "cache"))
+
+        corpora = [(label, SIZES[label], MAIN_PROFILE) for label in labels]
+        if not args.no_variants and VARIANT_SIZE in labels:
+            corpora += [(f"{VARIANT_SIZE}-{name}", SIZES[VARIANT_SIZE], profile)
+                        for name, profile in VARIANTS.items()]
+
+        for label, count, profile in corpora:
+            path = os.path.join(workdir, f"{label}.mid")
+            make_midi(path, count, **profile)
+            repeat = 1 if count >= SIZES['1M'] else args.repeat
+            print(f"[{label}] {count} olay, {profile}", file=sys.stderr, flush=True)
+            results.update(bench_corpus(path, label, count, repeat, cache, use_mido))
+
+    print("[serial]", file=sys.stderr, flush=True)
+    results.update(bench_serial(100000, args.repeat))
+    print("[scheduler]", file=sys.stderr, flush=True)
+    results.update(bench_scheduler(args.jitter_waits, 0.002))
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'sizes': labels,
+        },
+        'results': results,
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)['results']
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} ölçümde regresyon", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+import atexit
+import os
+import shutil
+import tempfile
+
+# Modüller depo kökünde durur; pytest bu dosyanın klasörünü sys.path'e ekler.
+# Testler (ve başlattıkları süreçler) kullanıcının disk önbelleğine yazmasın.
+_cache_dir = tempfile.mkdtemp(prefix="ams-test-cache-")
+os.environ["ARDUINO_MIDI_CACHE"] = _cache_dir
+atexit.register(shutil.rmtree, _cache_dir, True)
@@ -0,0 +1,122 @@
+import csv
+import json
+import time
+from collections import deque
+
+HISTORY = 4096   # Her ölçüm için tutulan son örnek sayısı
+
+
+def distribution(samples):
+    """Saniye cinsinden örneklerin ms özeti (örnek yoksa None)"""
+    ordered = sorted(samples)
+    if not ordered:
+        return None
+    n = len(ordered)
+    return {
+        'count': n,
+        'mean_ms': sum(ordered) / n * 1000,
+        'p50_ms': ordered[n // 2] * 1000,
+        'p99_ms': ordered[min(n - 1, int(n * 0.99))] * 1000,
+        'max_ms': ordered[-1] * 1000,
+    }
+
+
+class PlaybackStats:
+    """Bir oynatmanın zamanlama kayıtları.
+
+    Gecikmeler zamanlayıcının halka tamponundan okunur; arayüz ve ayar
+    çağrılarının süreleri sabit boyutlu deque'lere eklenir. Kayıt, çağrı
+    başına iki perf_counter okumasından ibarettir.
+    """
+    def __init__(self, lateness, history=HISTORY):
+        self.lateness = lateness                    # Zamanlayıcının tamponu (sn)
+        self.ui_time = deque(maxlen=history)        # update_ui çağrı süreleri (sn)
+        self.settings_time = deque(maxlen=history)  # get_settings çağrı süreleri (sn)
+        self.started = None
+        self.finished = None
+        self._writers = []
+        self._commands_at_start = 0
+        self._commands_at_finish = None
+
+    def timed(self, func, samples):
+        """`func`'ı her çağrının süresini `samples`'a ekleyen bir sarmalayıcıyla döndür"""
+        clock = time.perf_counter
+        append = samples.append
+
+        def wrapper(*args):
+            start = clock()
+            result = func(*args)
+            append(clock() - start)
+            return result
+        return wrapper
+
+    def begin(self, *buzzers):
+        # Çalma listesinde zamanlayıcı (ve tamponu) şarkılar arasında paylaşılır:
+        # bu kaydın gecikmeleri boş tamponla başlar
+        self.lateness.clear()
+        self.started = time.perf_counter()
+        # Çok kartlı oynatmada her kartın kendi yazıcısı vardır; komutlar toplanır
+        self._writers = [b.writer for b in buzzers if getattr(b, 'writer', None)]
+        self._commands_at_start = self._commands_written()
+
+    def finish(self):
+        self.finished = time.perf_counter()
+        # Sonraki şarkı tamponu temizlemeden önce gecikmeler bu kayda sabitlenir
+        self.lateness = tuple(self.lateness) if self.started else ()
+        if self._writers:
+            self._commands_at_finish = self._commands_written()
+
+    def _commands_written(self):
+        return sum(writer.commands_written for writer in self._writers)
+
+    def summary(self):
+        """Gecikme, çağrı süreleri ve seri komut hızının özeti"""
+        end = self.finished or time.perf_counter()
+        duration = end - self.started if self.started else 0.0
+        commands = 0
+        if self._writers:
+            last = self._commands_at_finish
+            if last is None:
+                last = self._commands_written()
+            commands = last - self._commands_at_start
+        return {
+            'duration_s': duration,
+            'lateness': distribution(self.lateness),
+            'update_ui': distribution(self.ui_time),
+            'get_settings': distribution(self.settings_time),
+            'commands': commands,
+            'commands_per_sec': commands / duration if duration else 0.0,
+            'writers': [writer.metrics() for writer in self._writers],
+        }
+
+    def export(self, path):
+        """Özeti ve ham örnekleri yaz: .csv uzantısında örnek satırları, aksi halde JSON"""
+        samples = {
+            'lateness': list(self.lateness),
+            'update_ui': list(self.ui_time),
+            'get_settings': list(self.settings_time),
+        }
+        if path.lower().endswith(".csv"):
+            with open(path, "w", newline="", encoding="utf-8") as f:
+                out = csv.writer(f)
+                out.writerow(["metric", "index", "ms"])
+                for metric, values in samples.items():
+                    for index, value in enumerate(values):
+                        out.writerow([metric, index, f"{value * 1000:.4f}"])
+        else:
+            data = {
+                'summary': self.summary(),
+                'samples_ms': {k: [v * 1000 for v in values] for k, values in samples.items()},
+            }
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+
+
+def format_summary(summary):
+    """Tek satırlık okunabilir özet (komut satırı için)"""
+    lateness = summary['lateness']
+    text = f"{summary['commands_per_sec']:.0f} komut/sn"
+    if lateness:
+        text = (f"gecikme p50 {lateness['p50_ms']:.2f} ms, p99 {lateness['p99_ms']:.2f} ms, "
+                f"max {lateness['max_ms']:.2f} ms | " + text)
+    return text
@@ -0,0 +1,262 @@
+import multiprocessing
+import os
+import sqlite3
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from midi_timeline import DEFAULT_TEMPO, NOTE_ON, PITCH_BEND, stream_events
+from timeline_cache import default_cache
+from tuning import CENTS_PER_NOTE, get_table
+
+MIDI_EXTENSIONS = ('.mid', '.midi')
+DB_NAME = "library.sqlite"      # Zaman çizelgesi önbelleğinin klasöründe
+CHUNK_SIZE = 32                 # Çalışan sürece bir seferde gönderilen dosya sayısı
+COMMIT_EVERY = 500              # Tarama sırasında bu kadar sonuçta bir kaydet (arama ara sonuçları görür)
+SEARCH_LIMIT = 500
+
+# Buzzer'ın duyulur biçimde çaldığı aralık (Hz): tone() alt sınırı ve pasif buzzer için pratik üst sınır
+BUZZER_LOW_FREQ = 31
+BUZZER_HIGH_FREQ = 5000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    duration REAL,
+    events INTEGER,
+    tempo_min REAL,
+    tempo_max REAL,
+    note_min INTEGER,
+    note_max INTEGER,
+    polyphony INTEGER,
+    channels INTEGER,
+    fit_low INTEGER,
+    fit_high INTEGER,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS files_name ON files (name);
+CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY);
+"""
+COLUMNS = ('path', 'name', 'mtime_ns', 'size', 'duration', 'events', 'tempo_min', 'tempo_max',
+           'note_min', 'note_max', 'polyphony', 'channels', 'fit_low', 'fit_high', 'error')
+
+
+@lru_cache(maxsize=1)
+def audible_notes():
+    """Varsayılan akortta buzzer aralığına düşen en pes ve en tiz MIDI notası.
+
+    Frekans tablosu içe aktarmada değil ilk taranan dosyada bir kez kurulur.
+    """
+    table = get_table()
+    notes = [note for note in range(128)
+             if BUZZER_LOW_FREQ <= table.lookup(note * CENTS_PER_NOTE) <= BUZZER_HIGH_FREQ]
+    return notes[0], notes[-1]
+
+
+def iter_midi_files(root):
+    """Klasör ağacındaki MIDI dosyaları"""
+    for directory, _, names in os.walk(root):
+        for name in names:
+            if name.lower().endswith(MIDI_EXTENSIONS):
+                yield os.path.join(directory, name)
+
+
+def scan_file(path):
+    """Çalışan süreçte: dosyayı tek geçişte okuyup özet bilgilerini çıkar.
+
+    Zaman çizelgesi önbelleğe yazılmaz; binlerce dosyalık taramalar çalınan
+    şarkıların önbellek kayıtlarını silmesin.
+    """
+    st = os.stat(path)
+    row = {'path': path, 'name': os.path.basename(path), 'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+    try:
+        tempos = []
+        held = set()
+        polyphony = events = channels = 0
+        note_min, note_max = 127, -1
+        duration = 0.0
+        for event_time, note, kind, channel, bend in stream_events(path, tempos):
+            events += 1
+            duration = event_time
+            if kind == PITCH_BEND:
+                continue
+            if kind == NOTE_ON:
+                held.add((note, channel))
+                polyphony = max(polyphony, len(held))
+                channels |= 1 << channel
+                note_min = min(note_min, note)
+                note_max = max(note_max, note)
+            else:
+                held.discard((note, channel))
+    except Exception as e:
+        # Hatalı dosya da kaydedilir: değişmedikçe yeniden okunmaz
+        row['error'] = str(e) or type(e).__name__
+        return row
+
+    # İlk tempo olayından önce MIDI varsayılanı geçerlidir
+    if not tempos or tempos[0][0] > 0:
+        tempos.insert(0, (0.0, DEFAULT_TEMPO))
+    bpms = [60e6 / tempo for _, tempo in tempos]
+    row.update(duration=duration, events=events, tempo_min=min(bpms), tempo_max=max(bpms),
+               polyphony=polyphony, channels=channels)
+    if note_max >= 0:
+        # Buzzer aralığında kalan transpoz aralığı (yarım ton); fit_low > fit_high ise hiç sığmaz
+        audible_low, audible_high = audible_notes()
+        row.update(note_min=note_min, note_max=note_max,
+                   fit_low=audible_low - note_min, fit_high=audible_high - note_max)
+    return row
+
+
+def scan_entry(path):
+    try:
+        return scan_file(path)
+    except OSError:
+        return None
+
+
+def like_pattern(word):
+    """Kelimeyi `LIKE ... ESCAPE '\\'` için kalıba çevir: %, _ ve \\ harfiyen aranır"""
+    escaped = word.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def channel_list(mask):
+    """Kanal maskesi -> '1, 3, 10' (1'den başlar)"""
+    return ", ".join(str(channel + 1) for channel in range(16) if mask & 1 << channel)
+
+
+class Library:
+    """MIDI kütüphanesi dizini (SQLite).
+
+    Taranan klasörlerdeki her dosyanın süresi, tempo ve nota aralığı, en fazla
+    eş zamanlı nota sayısı, kullanılan kanallar ve buzzer aralığına sığdığı
+    transpozlar saklanır. Yeniden taramada yalnızca değiştirilme zamanı veya
+    boyutu değişen dosyalar okunur; okuma süreç havuzunda paralel yapılır.
+    """
+    def __init__(self, path=None):
+        self.path = path or os.path.join(default_cache.directory, DB_NAME)
+        self._cancelled = threading.Event()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        db = self._connect()
+        try:
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        # Her çağrı kendi bağlantısını açar: tarama thread'i yazarken arayüz arama yapabilir
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.row_factory = sqlite3.Row
+        return db
+
+    def roots(self):
+        db = self._connect()
+        try:
+            return [row['path'] for row in db.execute("SELECT path FROM roots ORDER BY path")]
+        finally:
+            db.close()
+
+    def scan(self, roots=None, progress=None, workers=None):
+        """Klasörleri (varsayılan: daha önce taranan tümü) tara ve dizini güncelle.
+
+        `progress(bitmiş, toplam)` tarayan thread'den çağrılır. Silinen dosyalar
+        dizinden çıkarılır. Sayıları içeren bir sözlük döndürür.
+        """
+        self._cancelled.clear()
+        db = self._connect()
+        try:
+            roots = [os.path.abspath(root) for root in roots] if roots else self.roots()
+            db.executemany("INSERT OR IGNORE INTO roots (path) VALUES (?)", [(root,) for root in roots])
+            known = {row['path']: (row['mtime_ns'], row['size'])
+                     for row in db.execute("SELECT path, mtime_ns, size FROM files")}
+
+            found = set()
+            changed = []
+            for root in roots:
+                for path in iter_midi_files(root):
+                    found.add(path)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    if known.get(path) != (st.st_mtime_ns, st.st_size):
+                        changed.append(path)
+
+            removed = [path for path in known
+                       if path not in found and any(path.startswith(os.path.join(root, "")) for root in roots)]
+            db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in removed])
+            db.commit()
+
+            failed = done = 0
+            if progress:
+                progress(done, len(changed))
+            if changed:
+                # spawn: Tk ve oynatıcı thread'leri olan süreç çatallanmaz
+                executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context('spawn'))
+                try:
+                    for row in executor.map(scan_entry, changed, chunksize=CHUNK_SIZE):
+                        if row is None:
+                            continue  # Tarama sırasında silinmiş
+                        if self._cancelled.is_set():
+                            break
+                        values = [row.get(column) for column in COLUMNS]
+                        db.execute(f"INSERT OR REPLACE INTO files VALUES ({', '.join('?' * len(COLUMNS))})", values)
+                        failed += row.get('error') is not None
+                        done += 1
+                        if done % COMMIT_EVERY == 0:
+                            db.commit()
+                        if progress:
+                            progress(done, len(changed))
+                finally:
+                    executor.shutdown(wait=not self._cancelled.is_set(), cancel_futures=True)
+            db.commit()
+            return {'files': len(found), 'scanned': done, 'removed': len(removed), 'failed': failed}
+        finally:
+            db.close()
+
+    def cancel(self):
+        """Süren taramayı durdur (o ana kadar okunanlar kaydedilir)"""
+        self._cancelled.set()
+
+    def search(self, text="", transpose=None, max_polyphony=None, min_duration=None, max_duration=None,
+               limit=SEARCH_LIMIT):
+        """Yolunda `text`in tüm kelimeleri geçen, okunabilmiş dosyalar (isme göre).
+
+        `transpose` verilirse yalnızca bu transpozla buzzer aralığına sığan
+        dosyalar döndürülür.
+        """
+        where = ["error IS NULL"]
+        params = []
+        for word in text.split():
+            where.append("path LIKE ? ESCAPE '\\'")
+            params.append(like_pattern(word))
+        if transpose is not None:
+            where.append("fit_low <= ? AND ? <= fit_high")
+            params += [transpose, transpose]
+        if max_polyphony is not None:
+            where.append("polyphony <= ?")
+            params.append(max_polyphony)
+        if min_duration is not None:
+            where.append("duration >= ?")
+            params.append(min_duration)
+        if max_duration is not None:
+            where.append("duration <= ?")
+            params.append(max_duration)
+        params.append(limit)
+
+        db = self._connect()
+        try:
+            return db.execute(f"SELECT * FROM files WHERE {' AND '.join(where)} ORDER BY name LIMIT ?",
+                              params).fetchall()
+        finally:
+            db.close()
+
+    def count(self):
+        db = self._connect()
+        try:
+            return db.execute("SELECT COUNT(*) FROM files WHERE error IS NULL").fetchone()[0]
+        finally:
+            db.close()
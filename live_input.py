@@ -0,0 +1,326 @@
+import socket
+import threading
+import time
+from collections import deque
+from instrumentation import HISTORY, PlaybackStats, distribution
+from midi_timeline import (NOTE_OFF, NOTE_ON, PITCH_BEND, DRUM_CHANNEL, DEFAULT_BEND_RANGE,
+                           CC_RPN_MSB, CC_RPN_LSB, CC_DATA_MSB, CC_DATA_LSB)
+from scheduler import Scheduler
+from tuning import CENTS_PER_NOTE, REST, get_table, note_of, transposed
+
+LATENCY_BUDGET = 0.002      # Girişten seri porta yazılmaya kadar hedef süre (sn)
+HISTOGRAM_MS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)   # Gecikme histogramının kova üst sınırları
+UDP_PORT = 5004
+UDP_TIMEOUT = 0.2           # Durdurulunca alıcı thread'in fark etme süresi
+IDLE_WAIT = 0.5             # Arpej çalmazken zamanlayıcı thread'inin uyanma aralığı
+
+# Durum baytından sonraki veri baytı sayısı (0x80-0xE0)
+_DATA_LENGTH = {0x80: 2, 0x90: 2, 0xA0: 2, 0xB0: 2, 0xC0: 1, 0xD0: 1, 0xE0: 2}
+_SYSTEM_LENGTH = {0xF1: 1, 0xF2: 2, 0xF3: 1}
+
+
+class MidiDecoder:
+    """Gerçek zamanlı ham MIDI baytlarını oynatıcı olaylarına çevirir.
+
+    Running status, SysEx ve gerçek zamanlı baytlar atlanır; pitch bend,
+    dosya ayrıştırıcısındaki gibi kanalın RPN 0 aralığıyla cent'e çevrilir.
+    Davul kanalı çalınmaz.
+    """
+    def __init__(self):
+        self.running = 0
+        self.data = []
+        self.expected = 0
+        self.in_sysex = False
+        self.rpn_msb = [127] * 16
+        self.rpn_lsb = [127] * 16
+        self.bend_range = [DEFAULT_BEND_RANGE] * 16
+        self.bends = [0] * 16
+
+    def feed(self, data):
+        """Baytlarda tamamlanan (nota, tür, kanal, bükme) olaylarını döndür"""
+        events = []
+        for byte in data:
+            if byte >= 0xF8:
+                continue  # Gerçek zamanlı mesajlar (saat, aktif algılama) araya girebilir
+            if byte >= 0x80:
+                self.in_sysex = byte == 0xF0
+                self.data = []
+                if byte < 0xF0:
+                    self.running = byte
+                    self.expected = _DATA_LENGTH[byte & 0xF0]
+                else:
+                    self.running = 0  # Sistem mesajları running status'u iptal eder
+                    self.expected = _SYSTEM_LENGTH.get(byte, 0)
+                continue
+            if self.in_sysex or not self.running:
+                continue
+            self.data.append(byte)
+            if len(self.data) == self.expected:
+                self._message(self.running, self.data, events)
+                self.data = []
+        return events
+
+    def _message(self, status, data, events):
+        kind, channel = status & 0xF0, status & 0x0F
+        if channel == DRUM_CHANNEL:
+            return
+        if kind == 0x90 and data[1] > 0:
+            events.append((data[0], NOTE_ON, channel, 0))
+        elif kind == 0x80 or kind == 0x90:
+            events.append((data[0], NOTE_OFF, channel, 0))
+        elif kind == 0xE0:
+            cents = round(((data[1] << 7 | data[0]) - 8192) * self.bend_range[channel] / 8192)
+            if cents != self.bends[channel]:
+                self.bends[channel] = cents
+                events.append((0, PITCH_BEND, channel, cents))
+        elif kind == 0xB0:
+            controller, value = data
+            if controller == CC_RPN_MSB:
+                self.rpn_msb[channel] = value
+            elif controller == CC_RPN_LSB:
+                self.rpn_lsb[channel] = value
+            elif self.rpn_msb[channel] == 0 and self.rpn_lsb[channel] == 0:
+                if controller == CC_DATA_MSB:
+                    self.bend_range[channel] = value * 100 + self.bend_range[channel] % 100
+                elif controller == CC_DATA_LSB:
+                    self.bend_range[channel] = self.bend_range[channel] // 100 * 100 + value
+
+
+class UdpSource(threading.Thread):
+    """Yerel UDP portundan ham MIDI baytları (deneme ve döngü geri bağlantısı için).
+
+    Her datagram bir veya birden fazla MIDI mesajı içerebilir.
+    """
+    def __init__(self, host="127.0.0.1", port=UDP_PORT):
+        super().__init__()
+        self.daemon = True
+        self.handler = None
+        self.is_running = True
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((host, port))
+        self.sock.settimeout(UDP_TIMEOUT)
+        self.name = f"UDP {host}:{self.sock.getsockname()[1]}"
+
+    def open(self, handler):
+        self.handler = handler
+        self.start()
+
+    def run(self):
+        clock = time.perf_counter
+        while self.is_running:
+            try:
+                data = self.sock.recv(1024)
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            self.handler(data, clock())
+        self.sock.close()
+
+    def close(self):
+        # Soket hemen kapatılır: aynı port yeniden açılabilsin
+        self.is_running = False
+        self.sock.close()
+
+
+class MidoSource:
+    """mido giriş portu: mesajlar arka ucun (rtmidi) thread'inden doğrudan işlenir"""
+    def __init__(self, name=None):
+        import mido  # Yalnızca canlı girişte gerekir
+        self.mido = mido
+        self.name = name
+        self.port = None
+
+    def open(self, handler):
+        clock = time.perf_counter
+
+        def on_message(message):
+            handler(message.bin(), clock())
+        self.port = self.mido.open_input(self.name, callback=on_message)
+        self.name = self.port.name
+
+    def close(self):
+        if self.port:
+            self.port.close()
+            self.port = None
+
+
+def input_names():
+    """Bağlı MIDI giriş portları (mido yüklü değilse boş)"""
+    try:
+        import mido
+        return mido.get_input_names()
+    except Exception:
+        return []
+
+
+def histogram(samples, edges_ms=HISTOGRAM_MS):
+    """Saniye cinsinden örneklerin kova sayıları: {'<=0.05ms': n, ..., '>5.0ms': n}"""
+    counts = [0] * (len(edges_ms) + 1)
+    for sample in samples:
+        ms = sample * 1000
+        index = 0
+        while index < len(edges_ms) and ms > edges_ms[index]:
+            index += 1
+        counts[index] += 1
+    labels = [f"<={edge}ms" for edge in edges_ms] + [f">{edges_ms[-1]}ms"]
+    return dict(zip(labels, counts))
+
+
+class LivePlayer(threading.Thread):
+    """MIDI girişini Solo veya Chiptune ses mantığıyla doğrudan buzzer'a çalar.
+
+    Nota mesajı, geldiği thread'de (UDP alıcısı veya mido geri çağrısı)
+    işlenip seri yazıcıya verilir; arada kuyruk veya yoklama yoktur. Bu
+    thread yalnızca arpej adımlarını zamanlar. Komut üreten her mesajın
+    gelişinden komutun seri porta yazılmasına kadar geçen süre halka tampona
+    kaydedilir.
+    """
+    def __init__(self, source, buzzer, update_ui_callback, get_settings_callback, mode='solo', scheduler=None):
+        super().__init__()
+        self.source = source
+        self.buzzer = buzzer
+        self.mode = mode
+        self.path = None          # Arayüz için: dosya çalınmıyor
+        self.is_running = True
+        self.daemon = True
+        self.scheduler = scheduler or Scheduler()
+        self.decoder = MidiDecoder()
+        self.latency = deque(maxlen=HISTORY)  # Komut başına giriş -> seri port süresi (sn)
+        self.messages = 0
+
+        self.stats = PlaybackStats(self.latency)
+        self.update_ui = self.stats.timed(update_ui_callback, self.stats.ui_time)
+        self.get_settings = self.stats.timed(get_settings_callback, self.stats.settings_time)
+
+        if mode == 'arpej':
+            from arpeggiator import pattern_order  # NumPy ilk akorda değil şimdi yüklensin
+            self.pattern_order = pattern_order
+
+        self._lock = threading.Lock()
+        self.active_notes = []    # (nota, kanal) basılma sırasıyla
+        self.bends = [0] * 16
+        self.sent_freq = None
+        self.sequence = []        # Arpej: çalan akorun desen sırası
+        self.phase = 0
+        self.next_step = None     # Arpej: sonraki adımın perf_counter zamanı
+
+    def run(self):
+        try:
+            self.buzzer.begin_playback()
+            self.stats.begin(self.buzzer)
+            settings = self.get_settings()
+            get_table(settings['a4'], settings['cents'])  # Akort tablosu ilk notada değil şimdi kurulsun
+            self.source.open(self.handle)
+            self.update_ui(f"CANLI: {self.source.name}", False)
+        except Exception as e:
+            self.stats.finish()
+            self.update_ui(f"Hata: {e}", False)
+            return
+
+        # Arpej adımları: bir sonraki adıma kadar bekle, yeni akor gelirse uyan
+        while self.is_running:
+            next_step = self.next_step
+            target = next_step if next_step is not None else self.scheduler.now() + IDLE_WAIT
+            if not self.scheduler.wait_until(target) or next_step is None:
+                continue
+            with self._lock:
+                if self.next_step != next_step or not self.sequence:
+                    continue  # Beklerken akor değişti
+                self.phase += 1
+                text = self.play(self.sequence[self.phase % len(self.sequence)])
+                step = self.get_settings()['arp_speed'] / 1000.0
+                self.next_step = max(next_step + step, self.scheduler.now())
+            if text:
+                self.update_ui(*text)
+
+        self.source.close()
+        with self._lock:
+            self.buzzer.end_playback(wait=False)
+            self.buzzer.send_freq(0)
+        self.stats.finish()
+
+    def handle(self, data, arrived):
+        """Kaynak thread'inden: mesajı işle, gerekirse hemen çal"""
+        text = None
+        with self._lock:
+            if not self.is_running:
+                return
+            retrigger = changed = False
+            for note, kind, channel, bend in self.decoder.feed(data):
+                changed = True
+                if kind == PITCH_BEND:
+                    self.bends[channel] = bend
+                    continue
+                if (note, channel) in self.active_notes:
+                    self.active_notes.remove((note, channel))
+                if kind == NOTE_ON:
+                    self.active_notes.append((note, channel))
+                retrigger = True
+            if changed:
+                text = self.sound(retrigger, arrived)
+        self.messages += 1
+        if text:
+            self.update_ui(*text)
+
+    def sound(self, retrigger, arrived=None):
+        """Basılı notalardan çalınacak perdeyi seç ve gönder (kilit tutulurken)"""
+        pitches = [note * CENTS_PER_NOTE + self.bends[channel] for note, channel in self.active_notes]
+        if self.mode != 'arpej' or len(pitches) <= 1:
+            # Solo: son basılan nota kazanır
+            self.sequence = []
+            self.next_step = None
+            return self.play(pitches[-1] if pitches else REST, arrived)
+
+        settings = self.get_settings()
+        self.sequence = self.pattern_order(pitches, settings['arp_pattern'])
+        if retrigger or self.next_step is None:
+            # Yeni akor: desen baştan başlar, sonraki adım arpej hızı kadar sonra
+            self.phase = 0
+            self.next_step = self.scheduler.now() + settings['arp_speed'] / 1000.0
+            self.scheduler.wake()
+        # Yalnızca bükme değişti: çalan adım yeni perdesine geçer, faz korunur
+        return self.play(self.sequence[self.phase % len(self.sequence)], arrived)
+
+    def play(self, pitch, arrived=None):
+        """Perdeyi gönder; `arrived` verilmişse komut yazılınca gecikmesi kaydedilir"""
+        settings = self.get_settings()
+        final_pitch = transposed(pitch, settings['transpose'])
+        freq = get_table(settings['a4'], settings['cents']).lookup(final_pitch)
+        if freq == self.sent_freq:
+            return None
+        on_written = None
+        if arrived is not None:
+            on_written = lambda done: self.latency.append(done - arrived)
+        self.buzzer.send_freq(freq, on_written=on_written)
+        self.sent_freq = freq
+        if freq > 0:
+            return f"{self.buzzer.get_note_name(note_of(final_pitch))} | {freq} Hz", True
+        return "...", False
+
+    def latency_summary(self):
+        """Giriş gecikmesinin dağılımı, histogramı ve bütçeyi aşan mesaj sayısı"""
+        samples = list(self.latency)
+        return {
+            'messages': self.messages,
+            'latency': distribution(samples),
+            'histogram': histogram(samples),
+            'over_budget': sum(1 for sample in samples if sample > LATENCY_BUDGET),
+            'budget_ms': LATENCY_BUDGET * 1000,
+            'writer': self.buzzer.write_metrics() if hasattr(self.buzzer, 'write_metrics') else None,
+        }
+
+    def position(self):
+        return 0.0
+
+    def settings_changed(self):
+        """Transpoz, akort veya desen değişti: çalan nota hemen yeni ayarlarla gönderilir"""
+        with self._lock:
+            text = self.sound(False) if self.active_notes else None
+        if text:
+            self.update_ui(*text)
+
+    def stop(self):
+        self.is_running = False
+        self.source.close()  # Durdurulduktan sonra gelen mesajlar çalınmaz
+        self.scheduler.wake()
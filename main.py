@@ -1,10 +1,23 @@
+import os
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import serial
 import serial.tools.list_ports
-import time
 from player_solo import SoloPlayer
 from player_arpej import ChiptunePlayer
+from arpeggiator import PATTERNS
+from melody import STRATEGIES, DEFAULT_STRATEGY
+from arduino_buzzer import ArduinoBuzzer
+from ui_bridge import StatusSlot, UiRefresher, SettingsStore
+from tuning import DEFAULT_A4
+from instrumentation import format_summary
+from seek_index import seek_index
+from playlist import Playlist, PlaylistPlayer
+from library import Library, channel_list
+from live_input import LivePlayer, MidoSource, UdpSource, UDP_PORT, input_names
+
+FILE_INPUT = "Dosya"   # Giriş seçimi: MIDI dosyası / çalma listesi
+UDP_INPUT = f"UDP 127.0.0.1:{UDP_PORT}"
 
 # --- RENK PALETİ ---
 COLORS = {
@@ -91,87 +104,47 @@ class CustomRadioButton(tk.Canvas):
             self.itemconfig(self.circle, outline=COLORS["text_dim"])
             self.itemconfig(self.text_id, fill=COLORS["text"])
 
-class ArduinoBuzzer:
-    """Arduino iletişim sınıfı"""
-    def __init__(self):
-        self.ser = None
-        self.last_freq = -1
-        self.is_connected = False
-    
-    def connect(self, port):
-        try:
-            if self.ser and self.ser.is_open:
-                self.ser.close()
-            self.ser = serial.Serial(port, 115200, timeout=0.05)
-            time.sleep(2)
-            self.is_connected = True
-            return True, "Başarıyla bağlandı"
-        except Exception as e:
-            self.is_connected = False
-            return False, f"Bağlantı hatası: {str(e)}"
-    
-    def send_freq(self, freq):
-        if not self.is_connected:
-            return
-        try:
-            if freq != self.last_freq:
-                self.ser.write(f"{freq},0\n".encode())
-                self.last_freq = freq
-        except:
-            pass
-    
-    def get_stats(self):
-        if not self.is_connected:
-            return None
-        try:
-            self.ser.reset_input_buffer()
-            self.ser.write(b"?\n")
-            time.sleep(0.05)
-            if self.ser.in_waiting:
-                line = self.ser.readline().decode('utf-8').strip()
-                if line.startswith("STATS:"):
-                    parts = line.split(":")[1].split(",")
-                    return {
-                        'temp': parts[0],
-                        'ram': parts[1],
-                        'uptime': int(parts[2]) // 1000
-                    }
-        except:
-            return None
-        return None
-    
-    def stop(self):
-        self.send_freq(0)
-        if self.ser and self.ser.is_open:
-            self.ser.close()
-        self.is_connected = False
-    
-    @staticmethod
-    def midi_to_freq(note):
-        return int(440 * (2 ** ((note - 69) / 12))) if note > 0 else 0
-    
-    @staticmethod
-    def get_note_name(note):
-        if note <= 0:
-            return "Sus"
-        names = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
-        return f"{names[note % 12]}{(note // 12) - 1}"
-
 class MidiPlayerApp:
     def __init__(self, root):
         self.root = root
         self.root.title("Arduino MIDI Studio Pro")
-        self.root.geometry("900x750")
+        self.root.geometry("900x820")
         self.root.configure(bg=COLORS["bg"])
         self.root.resizable(False, False)
         
         self.buzzer = ArduinoBuzzer()
         self.current_thread = None
         self.midi_path = None
+        self.playlist = Playlist()
+        self.entry = 0            # Gösterilen (çalan veya çalınacak) liste girdisi
+        self.playlist_box = None  # Liste penceresi açıksa içindeki Listbox
+        self.library = None       # Kütüphane dizini (pencere ilk açıldığında)
+        self.library_tree = None  # Kütüphane penceresi açıksa sonuç tablosu
+        self.scan_slot = StatusSlot("", False)  # Tarama thread'inin ilerleme metni
+        self.summary_slot = StatusSlot("--", False)  # Son biten şarkının zamanlama özeti
+        self.stats_dir = None     # Şarkı kayıtlarının otomatik yazıldığı klasör (kapalı: None)
+        self.duration = None      # Şarkı süresi (dizin hazır olunca)
+        self.resume_at = 0.0      # OYNAT'ın başlayacağı konum (saniye)
+        self.paused = False
+        self.seeking = False      # Konum çubuğu sürükleniyor
         
+        # Oynatıcı thread'leri Tk'ye doğrudan dokunmaz: durum slot'a yazılır,
+        # ayarlar ise Tk tarafında güncellenen değişmez bir görüntüden okunur.
+        # İkisi de ilk yenileme veya değişken izleyicisi çalışmadan önce kurulur.
+        self.status_slot = StatusSlot()
+        self.buzzer.on_status = lambda text: self.status_slot.set(text, False)
         self.setup_ui()
+        self.settings = SettingsStore(self.read_settings)
+        for var in (self.var_speed, self.var_transpose, self.var_arp, self.var_a4, self.var_cents):
+            var.trace_add("write", self.settings_changed)
+        self.combo_pattern.bind("<<ComboboxSelected>>", self.settings_changed)
+        self.combo_melody.bind("<<ComboboxSelected>>", self.settings.refresh)  # Şarkı başında okunur
+        UiRefresher(self.root, self.status_slot, self.update_ui_status).start()
+        UiRefresher(self.root, self.summary_slot, self.update_summary, fps=5).start()
+        
         self.refresh_ports()
         self.update_telemetry()
+        self.update_position()
     
     def setup_ui(self):
         # === HEADER ===
@@ -301,6 +274,38 @@ class MidiPlayerApp:
             hover_bg=COLORS["accent_hover"],
             width=3
         ).pack(side="right", padx=(5, 0))
+        
+        # Kart zaten çalışıyorsa yeniden başlatılmaz: bağlantı beklemesiz kurulur
+        self.var_no_reset = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            inner,
+            text="Bağlanırken kartı yeniden başlatma",
+            variable=self.var_no_reset,
+            bg=COLORS["panel_bg"],
+            fg=COLORS["text"],
+            selectcolor=COLORS["bg"],
+            activebackground=COLORS["panel_bg"],
+            activeforeground=COLORS["accent"],
+            highlightthickness=0,
+            font=("Segoe UI", 8)
+        ).pack(anchor="w", pady=(5, 0))
+        
+        tk.Label(
+            inner,
+            text="MIDI Girişi:",
+            bg=COLORS["panel_bg"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 9)
+        ).pack(anchor="w", pady=(8, 5))
+        
+        # Dosya dışındaki seçimler klavyeden anlık çalar (Solo veya Chiptune modu)
+        self.combo_input = ttk.Combobox(
+            inner,
+            state="readonly",
+            width=25,
+            font=("Consolas", 9)
+        )
+        self.combo_input.pack(fill="x")
     
     def create_file_panel(self, parent):
         """Dosya seçim paneli"""
@@ -309,15 +314,38 @@ class MidiPlayerApp:
         inner = tk.Frame(content, bg=COLORS["panel_bg"])
         inner.pack(fill="both", padx=12, pady=12)
         
+        buttons = tk.Frame(inner, bg=COLORS["panel_bg"])
+        buttons.pack(fill="x")
+        
         ModernButton(
-            inner,
+            buttons,
             text="DOSYA SEÇ",
             command=self.select_file,
             bg="#424242",
             fg=COLORS["text"],
             hover_bg="#525252",
             font=("Segoe UI", 9, "bold")
-        ).pack(fill="x")
+        ).pack(side="left", fill="x", expand=True)
+        
+        ModernButton(
+            buttons,
+            text="☰ LİSTE",
+            command=self.open_playlist,
+            bg="#424242",
+            fg=COLORS["text"],
+            hover_bg="#525252",
+            font=("Segoe UI", 9, "bold")
+        ).pack(side="right", padx=(5, 0))
+        
+        ModernButton(
+            buttons,
+            text="⌕ KÜTÜPHANE",
+            command=self.open_library,
+            bg="#424242",
+            fg=COLORS["text"],
+            hover_bg="#525252",
+            font=("Segoe UI", 9, "bold")
+        ).pack(side="right", padx=(5, 0))
         
         self.lbl_file = tk.Label(
             inner,
@@ -349,6 +377,37 @@ class MidiPlayerApp:
         # Arpej hızı
         self.var_arp = tk.IntVar(value=40)
         self.create_slider(inner, "Arpej Gecikmesi", 10, 100, self.var_arp, 1, "ms")
+        
+        # Akort: A4 referansı ve cent kaydırması
+        tuning_frame = tk.Frame(inner, bg=COLORS["panel_bg"])
+        tuning_frame.pack(fill="x")
+        
+        self.var_a4 = tk.DoubleVar(value=DEFAULT_A4)
+        self.var_cents = tk.IntVar(value=0)
+        for label, var, from_, to_ in (("A4 (Hz):", self.var_a4, 415, 466),
+                                       ("İnce Akort (cent):", self.var_cents, -100, 100)):
+            tk.Label(
+                tuning_frame,
+                text=label,
+                bg=COLORS["panel_bg"],
+                fg=COLORS["text"],
+                font=("Segoe UI", 9)
+            ).pack(side="left")
+            
+            tk.Spinbox(
+                tuning_frame,
+                from_=from_,
+                to=to_,
+                increment=1,
+                textvariable=var,
+                width=5,
+                bg="#1a1a1a",
+                fg=COLORS["accent"],
+                buttonbackground=COLORS["panel_bg"],
+                insertbackground=COLORS["text"],
+                relief="flat",
+                font=("Consolas", 9, "bold")
+            ).pack(side="left", padx=(4, 12))
     
     def create_mode_panel(self, parent):
         """Çalma modu paneli"""
@@ -368,6 +427,28 @@ class MidiPlayerApp:
         )
         solo_btn.pack(fill="x", pady=5)
         
+        # Melodi çıkarma stratejisi (Solo modu, şarkı başında okunur)
+        melody_frame = tk.Frame(inner, bg=COLORS["panel_bg"])
+        melody_frame.pack(fill="x", pady=(0, 5))
+        
+        tk.Label(
+            melody_frame,
+            text="Melodi:",
+            bg=COLORS["panel_bg"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 9)
+        ).pack(side="left")
+        
+        self.combo_melody = ttk.Combobox(
+            melody_frame,
+            state="readonly",
+            width=16,
+            values=list(STRATEGIES.values()),
+            font=("Consolas", 9)
+        )
+        self.combo_melody.current(list(STRATEGIES).index(DEFAULT_STRATEGY))
+        self.combo_melody.pack(side="right")
+        
         # CHIPTUNE modu
         chip_btn = CustomRadioButton(
             inner,
@@ -376,6 +457,28 @@ class MidiPlayerApp:
             "arpej"
         )
         chip_btn.pack(fill="x", pady=5)
+        
+        # Arpej deseni (Chiptune modu)
+        pattern_frame = tk.Frame(inner, bg=COLORS["panel_bg"])
+        pattern_frame.pack(fill="x", pady=(5, 0))
+        
+        tk.Label(
+            pattern_frame,
+            text="Arpej Deseni:",
+            bg=COLORS["panel_bg"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 9)
+        ).pack(side="left")
+        
+        self.combo_pattern = ttk.Combobox(
+            pattern_frame,
+            state="readonly",
+            width=16,
+            values=list(PATTERNS.values()),
+            font=("Consolas", 9)
+        )
+        self.combo_pattern.current(0)
+        self.combo_pattern.pack(side="right")
     
     def create_lcd_display(self, parent):
         """LCD ekran"""
@@ -428,9 +531,36 @@ class MidiPlayerApp:
             inner, 2, "Çalışma Süresi:", "-- s", "#95e1d3"
         )
         
+        # Oynatma zamanlaması (son / süren oynatma)
+        self.lbl_lateness = self.create_stat_row(
+            inner, 3, "Gecikme p50/p99/max:", "-- ms", "#f7d794"
+        )
+        self.lbl_cmd_rate = self.create_stat_row(
+            inner, 4, "Komut Hızı:", "-- /s", "#c39bd3"
+        )
+        
+        # Son biten şarkının (veya canlı girişin) zamanlama özeti
+        tk.Label(
+            inner,
+            text="Son Oynatma:",
+            bg=COLORS["panel_bg"],
+            fg=COLORS["text_dim"],
+            font=("Segoe UI", 9)
+        ).grid(row=5, column=0, columnspan=2, sticky="w", pady=(8, 0))
+        self.lbl_summary = tk.Label(
+            inner,
+            text="--",
+            bg=COLORS["panel_bg"],
+            fg="#f7d794",
+            font=("Consolas", 8),
+            wraplength=240,
+            justify="left"
+        )
+        self.lbl_summary.grid(row=6, column=0, columnspan=2, sticky="w")
+        
         # Ayırıcı
         tk.Frame(inner, bg=COLORS["border"], height=1).grid(
-            row=3, column=0, columnspan=2, sticky="ew", pady=12
+            row=7, column=0, columnspan=2, sticky="ew", pady=12
         )
         
         # Alt bilgi
@@ -441,13 +571,87 @@ class MidiPlayerApp:
             fg=COLORS["text_dim"],
             font=("Consolas", 7),
             justify="center"
-        ).grid(row=4, column=0, columnspan=2)
+        ).grid(row=8, column=0, columnspan=2)
+        
+        # Zamanlama kaydını dışa aktar (JSON / CSV)
+        ModernButton(
+            inner,
+            text="⤓ ZAMANLAMA KAYDI",
+            command=self.export_stats,
+            bg=COLORS["border"],
+            fg=COLORS["text"],
+            hover_bg="#4a4a4a",
+            font=("Segoe UI", 8, "bold"),
+            pady=4
+        ).grid(row=9, column=0, columnspan=2, sticky="ew", pady=(10, 0))
+        
+        # Her şarkının kaydını bir klasöre otomatik yaz (komut satırındaki --stats-dir)
+        self.btn_stats_dir = ModernButton(
+            inner,
+            text="⤓ OTOMATİK KAYIT: KAPALI",
+            command=self.choose_stats_dir,
+            bg=COLORS["border"],
+            fg=COLORS["text"],
+            hover_bg="#4a4a4a",
+            font=("Segoe UI", 8, "bold"),
+            pady=4
+        )
+        self.btn_stats_dir.grid(row=10, column=0, columnspan=2, sticky="ew", pady=(6, 0))
     
     def create_controls(self, parent):
         """Kontrol butonları - Sağ panelde"""
         controls = tk.Frame(parent, bg=COLORS["bg"])
         controls.pack(fill="x", pady=(15, 0))
         
+        # Zamanlamayı Arduino'ya bırak (notalar önceden yüklenir)
+        self.var_device_timing = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            controls,
+            text="Cihaz zamanlaması (önden yükleme)",
+            variable=self.var_device_timing,
+            bg=COLORS["bg"],
+            fg=COLORS["text"],
+            selectcolor=COLORS["panel_bg"],
+            activebackground=COLORS["bg"],
+            activeforeground=COLORS["accent"],
+            highlightthickness=0,
+            font=("Segoe UI", 9)
+        ).pack(anchor="w", pady=(0, 8))
+        
+        # Konum çubuğu: bırakıldığı konuma atlanır (çalarken veya duraklatılmışken)
+        seek_frame = tk.Frame(controls, bg=COLORS["bg"])
+        seek_frame.pack(fill="x", pady=(0, 8))
+        
+        self.var_position = tk.DoubleVar(value=0.0)
+        self.scale_position = tk.Scale(
+            seek_frame,
+            from_=0,
+            to=1,
+            resolution=0.1,
+            orient="horizontal",
+            variable=self.var_position,
+            bg=COLORS["bg"],
+            fg=COLORS["accent"],
+            highlightthickness=0,
+            troughcolor=COLORS["panel_bg"],
+            activebackground=COLORS["accent"],
+            borderwidth=0,
+            showvalue=0,
+            state="disabled"
+        )
+        self.scale_position.pack(side="left", fill="x", expand=True)
+        self.scale_position.bind("<ButtonPress-1>", self.begin_seek)
+        self.scale_position.bind("<ButtonRelease-1>", self.seek)
+        
+        self.lbl_position = tk.Label(
+            seek_frame,
+            text="00:00 / --:--",
+            bg=COLORS["bg"],
+            fg=COLORS["accent"],
+            font=("Consolas", 9, "bold")
+        )
+        self.lbl_position.pack(side="right", padx=(8, 0))
+        
         # OYNAT butonu
         self.btn_play = ModernButton(
             controls,
@@ -461,9 +665,26 @@ class MidiPlayerApp:
         )
         self.btn_play.pack(fill="x", pady=(0, 10))
         
+        buttons = tk.Frame(controls, bg=COLORS["bg"])
+        buttons.pack(fill="x")
+        
+        # DURAKLAT butonu
+        self.btn_pause = ModernButton(
+            buttons,
+            text="⏸ DURAKLAT",
+            command=self.pause,
+            bg=COLORS["accent"],
+            fg="white",
+            hover_bg=COLORS["accent_hover"],
+            font=("Segoe UI", 12, "bold"),
+            pady=12
+        )
+        self.btn_pause.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.btn_pause.config(state="disabled", bg="#3a3a3a")
+        
         # DURDUR butonu
         self.btn_stop = ModernButton(
-            controls,
+            buttons,
             text="⏹ DURDUR",
             command=self.stop,
             bg=COLORS["danger"],
@@ -472,7 +693,7 @@ class MidiPlayerApp:
             font=("Segoe UI", 12, "bold"),
             pady=12
         )
-        self.btn_stop.pack(fill="x")
+        self.btn_stop.pack(side="left", fill="x", expand=True, padx=(5, 0))
         self.btn_stop.config(state="disabled", bg="#3a3a3a")
     
     def create_slider(self, parent, label, from_, to_, var, res=1, suffix=""):
@@ -543,14 +764,31 @@ class MidiPlayerApp:
         
         return value_label
     
-    def get_settings(self):
-        """Ayarları al"""
+    def read_settings(self):
+        """Ayarları Tk değişkenlerinden oku (sadece Tk thread'inde)"""
+        try:
+            a4 = self.var_a4.get()
+            cents = self.var_cents.get()
+        except tk.TclError:
+            # Kutuya yazılmakta olan geçersiz değer: son geçerli akort kalsın
+            a4 = self.settings.get()['a4']
+            cents = self.settings.get()['cents']
         return {
             'transpose': self.var_transpose.get(),
             'playback_speed': self.var_speed.get(),
-            'arp_speed': self.var_arp.get()
+            'arp_speed': self.var_arp.get(),
+            'arp_pattern': list(PATTERNS)[self.combo_pattern.current()],
+            'melody': list(STRATEGIES)[self.combo_melody.current()],
+            'a4': min(max(a4, 415.0), 466.0),
+            'cents': min(max(cents, -100), 100)
         }
     
+    def settings_changed(self, *args):
+        """Görüntüyü yenile ve çalan oynatıcıyı uyandır: değişiklik süren notada uygulanır"""
+        self.settings.refresh()
+        if self.current_thread and self.current_thread.is_alive():
+            self.current_thread.settings_changed()
+    
     def update_telemetry(self):
         """Telemetri güncelle"""
         if self.buzzer.is_connected:
@@ -560,30 +798,471 @@ class MidiPlayerApp:
                 self.lbl_ram.config(text=f"{stats['ram']} Bytes")
                 self.lbl_uptime.config(text=f"{stats['uptime']} s")
         
+        self.update_timing()
         self.root.after(2000, self.update_telemetry)
     
+    def update_timing(self):
+        """Son (veya süren) oynatmanın gecikme ve komut hızı özetini göster"""
+        if not self.current_thread:
+            return
+        summary = self.current_thread.stats.summary()
+        lateness = summary['lateness']
+        if lateness:
+            self.lbl_lateness.config(
+                text=f"{lateness['p50_ms']:.1f} / {lateness['p99_ms']:.1f} / {lateness['max_ms']:.1f} ms"
+            )
+        self.lbl_cmd_rate.config(text=f"{summary['commands_per_sec']:.0f} /s")
+    
+    def update_summary(self, text, active):
+        self.lbl_summary.config(text=text)
+    
+    def choose_stats_dir(self):
+        """Şarkı kayıtlarının otomatik yazılacağı klasörü seç; iptal otomatik kaydı kapatır"""
+        directory = filedialog.askdirectory(title="Zamanlama Kayıtları Klasörü")
+        self.stats_dir = directory or None
+        if self.stats_dir:
+            self.btn_stats_dir.config(text=f"⤓ OTOMATİK KAYIT: {os.path.basename(self.stats_dir) or self.stats_dir}")
+        else:
+            self.btn_stats_dir.config(text="⤓ OTOMATİK KAYIT: KAPALI")
+    
+    def song_ended(self, path, song):
+        """Şarkı bitti (oynatıcı thread'inde): özeti panele ver, otomatik kayıt açıksa JSON yaz"""
+        name = os.path.splitext(os.path.basename(path))[0]
+        text = f"{name}: {format_summary(song.stats.summary())}"
+        stats_dir = self.stats_dir
+        if stats_dir:
+            try:
+                song.stats.export(os.path.join(stats_dir, name + ".json"))
+            except OSError as e:
+                text += f" (kayıt yazılamadı: {e})"
+        self.summary_slot.set(text, False)
+    
+    def export_stats(self):
+        """Son oynatmanın zamanlama kaydını JSON veya CSV olarak kaydet"""
+        if not self.current_thread:
+            messagebox.showinfo("Kayıt Yok", "Henüz bir oynatma yapılmadı.")
+            return
+        
+        path = filedialog.asksaveasfilename(
+            title="Zamanlama Kaydını Kaydet",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json"), ("CSV", "*.csv")]
+        )
+        if path:
+            try:
+                self.current_thread.stats.export(path)
+            except OSError as e:
+                messagebox.showerror("Kayıt Hatası", str(e))
+    
     def refresh_ports(self):
         """Portları tazele"""
         ports = [p.device for p in serial.tools.list_ports.comports()]
         self.combo_port['values'] = ports
         if ports:
             self.combo_port.current(0)
+        
+        selected = self.combo_input.get() or FILE_INPUT
+        inputs = [FILE_INPUT] + input_names() + [UDP_INPUT]
+        self.combo_input['values'] = inputs
+        self.combo_input.set(selected if selected in inputs else FILE_INPUT)
     
     def select_file(self):
-        """MIDI dosyası seç"""
-        path = filedialog.askopenfilename(
+        """MIDI dosyalarını seç (birden fazlası çalma listesi olur)"""
+        paths = filedialog.askopenfilenames(
             title="MIDI Dosyası Seçin",
             filetypes=[("MIDI Files", "*.mid"), ("All Files", "*.*")]
         )
-        if path:
-            self.midi_path = path
-            filename = path.split("/")[-1]
-            display_name = filename if len(filename) <= 45 else filename[:42] + "..."
+        if paths:
+            self.playlist.set(paths)
+            self.show_entry(0)
+    
+    def show_entry(self, position):
+        """Listenin `position`. girdisini baştan çalınacak şarkı olarak göster"""
+        self.entry = position
+        self.resume_at = 0.0
+        if position < len(self.playlist.entries):
+            self.show_file(self.playlist.entries[position])
+        else:
+            self.midi_path = None
+            self.duration = None
             self.lbl_file.config(
-                text=f"✓ {display_name}",
-                fg=COLORS["success"],
-                font=("Segoe UI", 8, "bold")
+                text="Henüz dosya seçilmedi",
+                fg=COLORS["text_dim"],
+                font=("Segoe UI", 8, "italic")
             )
+        self.refresh_playlist()
+    
+    def show_file(self, path):
+        """Dosya etiketini güncelle ve konum dizinini hazırla"""
+        self.midi_path = path
+        self.duration = None
+        # Konum dizini arka planda kurulur; atlamalar ilk çalmayı beklemez
+        threading.Thread(target=self.prepare_seek, args=(path,), daemon=True).start()
+        filename = path.split("/")[-1]
+        display_name = filename if len(filename) <= 45 else filename[:42] + "..."
+        count = len(self.playlist.entries)
+        if count > 1:
+            display_name += f"  ({self.entry + 1}/{count})"
+        self.lbl_file.config(
+            text=f"✓ {display_name}",
+            fg=COLORS["success"],
+            font=("Segoe UI", 8, "bold")
+        )
+    
+    def follow_playlist(self):
+        """Oynatıcı sıradaki şarkıya geçtiyse dosya etiketini ve konum çubuğunu ona taşı"""
+        if not (self.current_thread and self.current_thread.is_alive() and self.current_thread.is_running):
+            return
+        path = self.current_thread.path
+        if path and (path != self.midi_path or self.playlist.index != self.entry):
+            self.entry = max(self.playlist.index, 0)
+            self.show_file(path)
+            self.refresh_playlist()
+    
+    def open_playlist(self):
+        """Çalma listesi penceresi"""
+        if self.playlist_box:
+            self.playlist_box.winfo_toplevel().lift()
+            return
+        window = tk.Toplevel(self.root)
+        window.title("Çalma Listesi")
+        window.geometry("420x360")
+        window.configure(bg=COLORS["bg"])
+        
+        self.playlist_box = tk.Listbox(
+            window,
+            bg=COLORS["panel_bg"],
+            fg=COLORS["text"],
+            selectbackground=COLORS["accent"],
+            highlightthickness=0,
+            relief="flat",
+            activestyle="none",
+            font=("Consolas", 9)
+        )
+        self.playlist_box.pack(fill="both", expand=True, padx=12, pady=(12, 8))
+        # Çift tıklanan şarkıya geç (çalıyorsa hemen, değilse OYNAT'ta)
+        self.playlist_box.bind("<Double-Button-1>", self.play_entry)
+        
+        buttons = tk.Frame(window, bg=COLORS["bg"])
+        buttons.pack(fill="x", padx=12, pady=(0, 12))
+        for text, command in (("EKLE", self.add_entries), ("KALDIR", self.remove_entry),
+                              ("TEMİZLE", self.clear_playlist)):
+            ModernButton(
+                buttons,
+                text=text,
+                command=command,
+                bg="#424242",
+                fg=COLORS["text"],
+                hover_bg="#525252",
+                font=("Segoe UI", 9, "bold")
+            ).pack(side="left", fill="x", expand=True, padx=2)
+        
+        def on_close():
+            self.playlist_box = None
+            window.destroy()
+        window.protocol("WM_DELETE_WINDOW", on_close)
+        self.refresh_playlist()
+    
+    def refresh_playlist(self):
+        """Liste penceresini doldur, gösterilen girdiyi vurgula"""
+        if not self.playlist_box:
+            return
+        self.playlist_box.delete(0, "end")
+        for position, path in enumerate(self.playlist.entries):
+            marker = "▶" if position == self.entry else " "
+            self.playlist_box.insert("end", f"{marker} {position + 1:>3}. {path.split('/')[-1]}")
+        if self.entry < len(self.playlist.entries):
+            self.playlist_box.itemconfig(self.entry, fg=COLORS["lcd_text"])
+            self.playlist_box.see(self.entry)
+    
+    def selected_entry(self):
+        selection = self.playlist_box.curselection() if self.playlist_box else ()
+        return selection[0] if selection else None
+    
+    def play_entry(self, event=None):
+        position = self.selected_entry()
+        if position is None:
+            return
+        playing = self.current_thread and self.current_thread.is_alive() and not self.paused
+        if playing:
+            self.halt_player()
+        self.show_entry(position)
+        if playing:
+            self.launch(0.0)
+    
+    def add_entries(self):
+        paths = filedialog.askopenfilenames(
+            title="Listeye Ekle",
+            filetypes=[("MIDI Files", "*.mid"), ("All Files", "*.*")]
+        )
+        if not paths:
+            return
+        self.append_entries(paths)
+    
+    def append_entries(self, paths):
+        self.playlist.add(paths)
+        if self.midi_path:
+            self.show_file(self.midi_path)  # Etiketteki sıra/toplam güncellenir
+            self.refresh_playlist()
+        else:
+            self.show_entry(0)
+    
+    def remove_entry(self):
+        position = self.selected_entry()
+        if position is None:
+            return
+        playing = self.current_thread and self.current_thread.is_alive()
+        if playing and position == self.entry:
+            messagebox.showwarning("Çalma Listesi", "Çalan şarkı listeden kaldırılamaz.")
+            return
+        self.playlist.remove(position)
+        if position < self.entry:
+            self.entry -= 1
+        if position == self.entry:
+            self.show_entry(min(position, max(len(self.playlist.entries) - 1, 0)))
+        elif self.midi_path:
+            self.show_file(self.midi_path)
+            self.refresh_playlist()
+    
+    def clear_playlist(self):
+        if self.current_thread and self.current_thread.is_alive():
+            messagebox.showwarning("Çalma Listesi", "Liste çalarken temizlenemez.")
+            return
+        self.playlist.set([])
+        self.show_entry(0)
+    
+    def open_library(self):
+        """Kütüphane penceresi: taranan klasörlerde arama ve süzme"""
+        if self.library_tree:
+            self.library_tree.winfo_toplevel().lift()
+            return
+        if self.library is None:
+            try:
+                self.library = Library()
+            except Exception as e:
+                messagebox.showerror("Kütüphane", f"Kütüphane açılamadı: {e}")
+                return
+            UiRefresher(self.root, self.scan_slot, self.update_scan_status, fps=5).start()
+        
+        window = tk.Toplevel(self.root)
+        window.title("MIDI Kütüphanesi")
+        window.geometry("760x480")
+        window.configure(bg=COLORS["bg"])
+        
+        # Arama ve süzgeçler: her değişiklikte dizin yeniden sorgulanır
+        filters = tk.Frame(window, bg=COLORS["bg"])
+        filters.pack(fill="x", padx=12, pady=(12, 8))
+        
+        self.var_search = tk.StringVar()
+        tk.Entry(
+            filters,
+            textvariable=self.var_search,
+            bg=COLORS["panel_bg"],
+            fg=COLORS["text"],
+            insertbackground=COLORS["text"],
+            relief="flat",
+            font=("Segoe UI", 10)
+        ).pack(side="left", fill="x", expand=True, ipady=4)
+        
+        self.var_fits = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            filters,
+            text="Buzzer'a sığanlar",
+            variable=self.var_fits,
+            bg=COLORS["bg"],
+            fg=COLORS["text"],
+            selectcolor=COLORS["panel_bg"],
+            activebackground=COLORS["bg"],
+            activeforeground=COLORS["accent"],
+            highlightthickness=0,
+            font=("Segoe UI", 9)
+        ).pack(side="left", padx=(8, 0))
+        
+        tk.Label(
+            filters,
+            text="Maks. polifoni:",
+            bg=COLORS["bg"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 9)
+        ).pack(side="left", padx=(8, 0))
+        
+        self.var_max_poly = tk.IntVar(value=0)
+        tk.Spinbox(
+            filters,
+            from_=0,
+            to=64,
+            increment=1,
+            textvariable=self.var_max_poly,
+            width=3,
+            bg="#1a1a1a",
+            fg=COLORS["accent"],
+            buttonbackground=COLORS["panel_bg"],
+            insertbackground=COLORS["text"],
+            relief="flat",
+            font=("Consolas", 9, "bold")
+        ).pack(side="left", padx=(4, 0))
+        
+        columns = (("name", "Dosya", 260), ("duration", "Süre", 60), ("tempo", "Tempo", 80),
+                   ("notes", "Nota Aralığı", 90), ("polyphony", "Polifoni", 60), ("channels", "Kanallar", 150))
+        self.library_tree = ttk.Treeview(window, columns=[key for key, _, _ in columns], show="headings")
+        for key, title, width in columns:
+            self.library_tree.heading(key, text=title)
+            self.library_tree.column(key, width=width, anchor="w")
+        self.library_tree.pack(fill="both", expand=True, padx=12)
+        # Çift tıklanan dosya tek başına seçilir (DOSYA SEÇ gibi)
+        self.library_tree.bind("<Double-Button-1>", self.choose_library_file)
+        
+        bottom = tk.Frame(window, bg=COLORS["bg"])
+        bottom.pack(fill="x", padx=12, pady=12)
+        
+        self.lbl_library = tk.Label(
+            bottom,
+            text="",
+            bg=COLORS["bg"],
+            fg=COLORS["text_dim"],
+            font=("Segoe UI", 8),
+            anchor="w"
+        )
+        self.lbl_library.pack(side="left", fill="x", expand=True)
+        
+        for text, command in (("KLASÖR EKLE", self.add_library_folder), ("YENİDEN TARA", self.rescan_library),
+                              ("LİSTEYE EKLE", self.add_library_selection)):
+            ModernButton(
+                bottom,
+                text=text,
+                command=command,
+                bg="#424242",
+                fg=COLORS["text"],
+                hover_bg="#525252",
+                font=("Segoe UI", 9, "bold")
+            ).pack(side="left", padx=(5, 0))
+        
+        for var in (self.var_search, self.var_fits, self.var_max_poly):
+            var.trace_add("write", self.search_library)
+        
+        def on_close():
+            self.library_tree = None
+            window.destroy()
+        window.protocol("WM_DELETE_WINDOW", on_close)
+        self.search_library()
+    
+    def search_library(self, *args):
+        """Süzgeçlere uyan dosyaları tabloya yaz"""
+        if not self.library_tree:
+            return
+        try:
+            max_poly = self.var_max_poly.get() or None
+        except tk.TclError:
+            max_poly = None  # Kutu yazılırken boş veya geçersiz
+        transpose = self.var_transpose.get() if self.var_fits.get() else None
+        rows = self.library.search(self.var_search.get(), transpose=transpose, max_polyphony=max_poly)
+        
+        self.library_tree.delete(*self.library_tree.get_children())
+        for row in rows:
+            if row['note_max'] is None:
+                notes = "-"
+            else:
+                notes = f"{self.buzzer.get_note_name(row['note_min'])} - {self.buzzer.get_note_name(row['note_max'])}"
+            tempo = f"{row['tempo_min']:.0f}"
+            if round(row['tempo_max']) != round(row['tempo_min']):
+                tempo += f"-{row['tempo_max']:.0f}"
+            self.library_tree.insert("", "end", iid=row['path'], values=(
+                row['name'], format_time(row['duration']), tempo, notes, row['polyphony'],
+                channel_list(row['channels'])
+            ))
+        if not self.scan_slot.value[1]:
+            self.lbl_library.config(text=f"{len(rows)} / {self.library.count()} dosya")
+    
+    def add_library_folder(self):
+        directory = filedialog.askdirectory(title="Kütüphaneye Klasör Ekle")
+        if directory:
+            self.start_scan([directory])
+    
+    def rescan_library(self):
+        self.start_scan(None)
+    
+    def start_scan(self, roots):
+        """Klasörleri arka planda tara (değişmeyen dosyalar yeniden okunmaz)"""
+        if self.scan_slot.value[1]:
+            return  # Tarama sürüyor
+        self.scan_slot.set("Dosyalar aranıyor...", True)
+        
+        def progress(done, total):
+            self.scan_slot.set(f"Taranıyor: {done} / {total}", True)
+        
+        def run():
+            try:
+                result = self.library.scan(roots, progress)
+                text = f"{result['scanned']} dosya okundu, {result['removed']} silindi"
+                if result['failed']:
+                    text += f", {result['failed']} okunamadı"
+            except Exception as e:
+                text = f"Tarama hatası: {e}"
+            self.scan_slot.set(text, False)
+        threading.Thread(target=run, daemon=True).start()
+    
+    def update_scan_status(self, text, active):
+        if not self.library_tree:
+            return
+        if active:
+            self.lbl_library.config(text=text)
+        else:
+            self.search_library()
+            if text:
+                self.lbl_library.config(text=f"{text} | {self.lbl_library.cget('text')}")
+    
+    def choose_library_file(self, event=None):
+        selection = self.library_tree.selection()
+        if not selection:
+            return
+        self.playlist.set(selection[:1])
+        self.show_entry(0)
+    
+    def add_library_selection(self):
+        selection = self.library_tree.selection() if self.library_tree else ()
+        if not selection:
+            return
+        self.append_entries(selection)
+    
+    def prepare_seek(self, path):
+        """Dosyayı derleyip konum dizinini kur (arka plan thread'i, Tk'ye dokunmaz)"""
+        try:
+            duration = seek_index(path).timeline.duration
+        except Exception:
+            return  # Hatalı dosya: hata OYNAT'ta gösterilir
+        if path == self.midi_path:
+            self.duration = duration
+    
+    def update_position(self):
+        """Konum çubuğunu ve süre etiketini güncelle"""
+        self.follow_playlist()
+        if self.duration:
+            self.scale_position.config(to=max(self.duration, 0.1), state="normal")
+            if not self.seeking:
+                playing = self.current_thread and self.current_thread.is_alive() and not self.paused
+                position = self.current_thread.position() if playing else self.resume_at
+                self.var_position.set(min(position, self.duration))
+            position = self.var_position.get()
+            self.lbl_position.config(text=f"{format_time(position)} / {format_time(self.duration)}")
+        else:
+            self.scale_position.config(state="disabled")
+            self.var_position.set(0.0)
+            self.lbl_position.config(text="00:00 / --:--")
+        self.root.after(200, self.update_position)
+    
+    def begin_seek(self, event):
+        self.seeking = bool(self.duration)
+    
+    def seek(self, event):
+        """Konum çubuğu bırakıldı: çalıyorsa o konumdan devam et, değilse başlangıcı ayarla"""
+        if not self.seeking:
+            return
+        self.seeking = False
+        self.follow_playlist()
+        self.resume_at = self.var_position.get()
+        if self.current_thread and self.current_thread.is_alive() and not self.paused:
+            self.halt_player()
+            self.launch(self.resume_at)
     
     def update_ui_status(self, text, active):
         """UI durumunu güncelle"""
@@ -598,7 +1277,8 @@ class MidiPlayerApp:
     
     def start(self):
         """Oynatmayı başlat"""
-        if not self.midi_path:
+        live = self.combo_input.get() not in ("", FILE_INPUT)
+        if not live and not self.playlist.entries:
             messagebox.showwarning("Eksik Bilgi", "Lütfen bir MIDI dosyası seçin.")
             return
         
@@ -606,29 +1286,83 @@ class MidiPlayerApp:
             messagebox.showwarning("Eksik Bilgi", "Lütfen bir seri port seçin.")
             return
         
-        if not self.buzzer.is_connected:
+        # Port şarkılar arasında açık kalır; yalnızca kopmuşsa veya başka port seçildiyse açılır
+        if not self.buzzer.is_connected or self.buzzer.port != self.combo_port.get():
+            self.buzzer.reset_on_connect = not self.var_no_reset.get()
             ok, msg = self.buzzer.connect(self.combo_port.get())
             if not ok:
                 messagebox.showerror("Bağlantı Hatası", msg)
                 return
         
+        self.buzzer.scheduled_mode = self.var_device_timing.get()
+        self.paused = False
+        if live:
+            if not self.launch_live(self.combo_input.get()):
+                return
+        else:
+            self.launch(self.resume_at)
+        
         self.btn_play.config(state="disabled", bg="#3a3a3a")
+        if not live:  # Canlı girişte duraklatılacak konum yok
+            self.btn_pause.config(state="normal", bg=COLORS["accent"])
         self.btn_stop.config(state="normal", bg=COLORS["danger"])
+        self.root.after(100, self.check_thread)
+    
+    def launch_live(self, name):
+        """Seçilen MIDI girişini seçilen modun ses mantığıyla buzzer'a çal"""
+        try:
+            source = UdpSource(port=UDP_PORT) if name == UDP_INPUT else MidoSource(name)
+        except ImportError:
+            messagebox.showerror("MIDI Girişi", "MIDI girişi için mido ve python-rtmidi gerekli.")
+            return False
+        except OSError as e:
+            messagebox.showerror("MIDI Girişi", f"UDP portu açılamadı: {e}")
+            return False
         
-        # Seçilen moda göre player seç
+        self.current_thread = LivePlayer(
+            source,
+            self.buzzer,
+            self.status_slot.set,
+            self.settings.get,
+            mode=self.mode.get()
+        )
+        self.current_thread.start()
+        return True
+    
+    def launch(self, position):
+        """Listeyi gösterilen girdiden, seçilen modun oynatıcısıyla `position` saniyesinden başlat"""
         player_class = SoloPlayer if self.mode.get() == "solo" else ChiptunePlayer
         
-        print(f"Seçilen Mod: {self.mode.get()}")
-        print(f"Player Sınıfı: {player_class.__name__}")
-        
-        self.current_thread = player_class(
-            self.midi_path,
+        # Sonraki şarkılar, öncekinin son notasının bittiği anda boşluksuz başlar
+        self.playlist.jump(self.entry)
+        self.current_thread = PlaylistPlayer(
+            self.playlist,
+            player_class,
             self.buzzer,
-            self.update_ui_status,
-            self.get_settings
+            self.status_slot.set,
+            self.settings.get,
+            start_at=position,
+            on_end=self.song_ended
         )
         self.current_thread.start()
-        self.root.after(100, self.check_thread)
+    
+    def halt_player(self):
+        """Çalan oynatıcıyı durdur ve son komutlarını göndermesini bekle (port açık kalır)"""
+        if self.current_thread and self.current_thread.is_alive():
+            self.current_thread.stop()
+            self.current_thread.join(1.0)
+    
+    def pause(self):
+        """Oynatmayı duraklat; OYNAT aynı konumdan devam eder"""
+        if not (self.current_thread and self.current_thread.is_alive()) or self.paused:
+            return
+        self.follow_playlist()
+        self.paused = True
+        self.resume_at = min(self.current_thread.position(), self.duration or float('inf'))
+        self.halt_player()
+        self.btn_play.config(text="▶ DEVAM", state="normal", bg=COLORS["success"])
+        self.btn_pause.config(state="disabled", bg="#3a3a3a")
+        self.status_slot.set("DURAKLATILDI", False)
     
     def stop(self):
         """Oynatmayı durdur"""
@@ -636,19 +1370,36 @@ class MidiPlayerApp:
             self.current_thread.stop()
         
         self.buzzer.stop()
-        self.btn_play.config(state="normal", bg=COLORS["success"])
+        self.paused = False
+        self.show_entry(0)  # Sonraki OYNAT listenin başından
+        self.btn_play.config(text="▶ OYNAT", state="normal", bg=COLORS["success"])
+        self.btn_pause.config(state="disabled", bg="#3a3a3a")
         self.btn_stop.config(state="disabled", bg="#3a3a3a")
-        self.update_ui_status("STOPPED", False)
+        self.status_slot.set("STOPPED", False)
     
     def check_thread(self):
         """Thread kontrolü"""
         if self.current_thread and self.current_thread.is_alive():
             self.root.after(100, self.check_thread)
+        elif self.paused:
+            return  # Duraklatıldı: port açık kalır, DEVAM yeni bir kontrol döngüsü başlatır
         else:
             self.stop()
+            if self.current_thread:
+                self.update_timing()
+                if isinstance(self.current_thread, LivePlayer):
+                    # Şarkı özetleri song_ended'da yazılır; canlı girişin tek özeti burada
+                    self.summary_slot.set(f"Canlı giriş: {format_summary(self.current_thread.stats.summary())}", False)
+
+def format_time(seconds):
+    """Saniyeyi dd:ss (bir saatten uzunsa s:dd:ss) olarak yaz"""
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = MidiPlayerApp(root)
-    root.protocol("WM_DELETE_WINDOW", lambda: (app.stop(), root.destroy()))
+    root.protocol("WM_DELETE_WINDOW", lambda: (app.stop(), app.buzzer.disconnect(), app.playlist.close(),
+                                               app.library and app.library.cancel(), root.destroy()))
     root.mainloop()
@@ -0,0 +1,216 @@
+import heapq
+import threading
+from bisect import bisect_right
+from collections import OrderedDict, defaultdict, deque
+from midi_timeline import NOTE_ON, PITCH_BEND
+from timeline_cache import default_cache
+from tuning import CENTS_PER_NOTE, REST
+
+# Melodi çıkarma stratejileri: anahtar -> arayüzde görünen isim
+STRATEGIES = {
+    'channel': "Kanal Önceliği",
+    'skyline': "En Tiz Nota",
+    'longest': "En Uzun Nota",
+    'latest': "Son Basılan",
+}
+DEFAULT_STRATEGY = 'channel'
+
+CACHE_SIZE = 16         # Bellekte tutulan melodi sayısı (dosya, strateji)
+
+# Kanal puanlaması
+MELODY_LOW = 48         # Ortalama notası bu aralıkta yükselen kanal melodiye daha yakındır
+MELODY_HIGH = 84
+MELODY_RANGE = 12       # Bir oktavdan dar aralık (pedal bas, ostinato) cezalandırılır
+MAX_DENSITY = 8.0       # Saniyede bundan fazla nota eşlik/arpej sayılır
+MELODY_GAP = 0.3        # Melodi kanalının bundan kısa susmaları sessizlik olarak kalır (sn)
+
+
+def collect_notes(events):
+    """Olay akışından nota sürelerini topla.
+
+    (nota, kanal) başına süreler basılma sırasıyla bir deque'de, kanal başına
+    (başlangıç, bitiş, nota) listeleri ve şarkının süresi döndürülür. Açık kalan
+    notalar son olayda kapatılır.
+    """
+    open_notes = {}
+    durations = defaultdict(deque)
+    channels = defaultdict(list)
+    end = 0.0
+
+    def close(key, start, at):
+        durations[key].append(at - start)
+        channels[key[1]].append((start, at, key[0]))
+
+    for event_time, note, kind, channel, bend in events:
+        end = event_time
+        if kind == PITCH_BEND:
+            continue
+        key = (note, channel)
+        start = open_notes.pop(key, None)
+        if start is not None:
+            close(key, start, event_time)  # Aynı nota yeniden basıldıysa önceki biter
+        if kind == NOTE_ON:
+            open_notes[key] = event_time
+
+    for key, start in open_notes.items():
+        close(key, start, end)
+    return durations, channels, end
+
+
+def score_channels(channels, duration):
+    """Kanalları melodi olma olasılığına göre puanla.
+
+    Puan; kanalın çaldığı süre oranı, tek seslilik (kendi notalarının
+    örtüşmediği süre), ortalama yükseklik, nota aralığı ve yoğunluktan oluşur.
+    Kanal -> ölçümler sözlüğü döndürülür.
+    """
+    profiles = {}
+    for channel, notes in channels.items():
+        points = sorted([(start, 1) for start, _, _ in notes] + [(end, -1) for _, end, _ in notes])
+        sounding = overlap = 0.0
+        depth = 0
+        previous = 0.0
+        for at, delta in points:
+            if depth >= 1: sounding += at - previous
+            if depth >= 2: overlap += at - previous
+            depth += delta
+            previous = at
+
+        pitches = [note for _, _, note in notes]
+        mean = sum(pitches) / len(pitches)
+        note_range = max(pitches) - min(pitches)
+        density = len(notes) / sounding if sounding else float('inf')
+
+        coverage = sounding / duration if duration else 0.0
+        monophony = 1.0 - overlap / sounding if sounding else 0.0
+        height = min(max((mean - MELODY_LOW) / (MELODY_HIGH - MELODY_LOW), 0.0), 1.0)
+        spread = min(note_range, MELODY_RANGE) / MELODY_RANGE
+        busy = min(1.0, MAX_DENSITY / density) if density else 1.0
+
+        profiles[channel] = {
+            'notes': len(notes),
+            'mean_note': mean,
+            'range': note_range,
+            'density': density,
+            'coverage': coverage,
+            'monophony': monophony,
+            'score': coverage * monophony * (0.5 + height) * (0.5 + 0.5 * spread) * busy,
+        }
+    return profiles
+
+
+def extract_melody(timeline, strategy=DEFAULT_STRATEGY):
+    """Zaman çizelgesinden tek sesli melodiyi (başlangıç, perde) segmentleri olarak çıkar.
+
+    Her an basılı notalardan biri stratejiye göre seçilir: 'skyline' en tiz
+    notayı, 'channel' en yüksek puanlı kanalın (kendi içinde en tiz) notasını,
+    'longest' en uzun süren notayı, 'latest' son basılanı. Perde nota * 100 +
+    kanal bükmesidir; REST sessizlik demektir.
+    """
+    durations, channels, duration = collect_notes(timeline)
+    profiles = score_channels(channels, duration)
+    scores = {channel: profile['score'] for channel, profile in profiles.items()}
+
+    # Notanın önceliği basıldığında belli olur: en büyük öncelik bir yığında
+    # tutulur, bırakılan notaların kayıtları tepeye çıktıkça atılır
+    def priority(note, channel, order, length):
+        if strategy == 'skyline':
+            return (-note, -order)
+        if strategy == 'channel':
+            return (-scores[channel], -note, -order)
+        if strategy == 'longest':
+            return (-length, -note, -order)
+        return (-order,)
+
+    active = {}                 # (nota, kanal) -> öncelik
+    heap = []
+    sounding = [0] * 16         # Kanal başına basılı nota sayısı
+    released = [0.0] * 16       # Kanalın son notasının bırakıldığı an
+    bends = [0] * 16
+    order = 0
+    segments = []
+    current = None
+    winner = None               # Son çalınan notanın kanalı
+    batch_time = 0.0
+
+    def top_pitch():
+        nonlocal winner
+        while heap and active.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        best = heap[0][1] if heap else None
+        # Kanal önceliğinde melodi kanalının kısa susmaları eşlikle doldurulmaz
+        if (strategy == 'channel' and winner is not None and not sounding[winner]
+                and batch_time - released[winner] < MELODY_GAP
+                and (best is None or scores[best[1]] < scores[winner])):
+            return REST
+        if best is None:
+            return REST
+        note, winner = best
+        return note * CENTS_PER_NOTE + bends[winner]
+
+    for event_time, note, kind, channel, bend in timeline:
+        if event_time > batch_time:
+            top = top_pitch()
+            if top != current:
+                segments.append((batch_time, top))
+                current = top
+            batch_time = event_time
+
+        if kind == PITCH_BEND:
+            bends[channel] = bend
+            continue
+        key = (note, channel)
+        if active.pop(key, None) is not None:
+            sounding[channel] -= 1
+            released[channel] = event_time
+        if kind == NOTE_ON:
+            order += 1
+            rank = priority(note, channel, order, durations[key].popleft())
+            active[key] = rank
+            sounding[channel] += 1
+            heapq.heappush(heap, (rank, key))
+
+    top = top_pitch()
+    if top != current:
+        segments.append((batch_time, top))
+    return segments
+
+
+_lines = OrderedDict()
+_lines_lock = threading.Lock()  # Oynatıcı ve ön hazırlık geri çağrısı thread'leri paylaşır
+
+
+def melody_line(path, strategy=DEFAULT_STRATEGY, cache=default_cache):
+    """Dosyanın melodisini bir kez çıkar ve (dosya içeriği, strateji) başına bellekte tut"""
+    key = cache.key_for(path)
+    with _lines_lock:
+        segments = _lines.get((key, strategy))
+        if segments is not None:
+            _lines.move_to_end((key, strategy))
+    if segments is None:
+        segments = extract_melody(cache.get_or_compile(path), strategy)
+        remember_line(key, strategy, segments)
+    return segments
+
+
+def has_line(key, strategy):
+    with _lines_lock:
+        return (key, strategy) in _lines
+
+
+def remember_line(key, strategy, segments):
+    """Başka yerde (ör. arka plan sürecinde) çıkarılmış melodiyi önbelleğe ekle"""
+    with _lines_lock:
+        _lines[(key, strategy)] = segments
+        _lines.move_to_end((key, strategy))
+        if len(_lines) > CACHE_SIZE:
+            _lines.popitem(last=False)
+
+
+def segments_from(segments, seconds):
+    """Melodi hattını `seconds` anından itibaren çal: o an çalan perde başa eklenir"""
+    index = bisect_right(segments, (seconds, float('inf')))
+    if index:
+        yield seconds, segments[index - 1][1]
+    for k in range(index, len(segments)):
+        yield segments[k]
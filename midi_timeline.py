@@ -0,0 +1,219 @@
+import array
+import heapq
+import mmap
+import struct
+from operator import itemgetter
+
+DRUM_CHANNEL = 9          # GM davul kanalı, buzzer'da çalınmaz
+DEFAULT_TEMPO = 500000    # MIDI varsayılanı: 120 BPM (mikrosaniye / vuruş)
+
+# Derleyici çıktısı değiştiğinde artırılır (disk önbelleğini geçersiz kılar)
+PARSER_VERSION = 4
+
+# Olay türleri
+NOTE_OFF = 0
+NOTE_ON = 1
+PITCH_BEND = 2            # bends sütunu: kanalın yeni bükme değeri (cent)
+
+# Sadece birleştirme aşamasında kullanılır, dışarı verilmez
+_SET_TEMPO = 255
+_CONTROL = 254            # değer: (kontrolcü << 8) | veri
+_PITCH_WHEEL = 253        # değer: -8192..8191
+
+DEFAULT_BEND_RANGE = 200  # cent (GM varsayılanı: +-2 yarım ton)
+# RPN 0 (pitch bend sensitivity) için izlenen kontrolcüler
+CC_RPN_MSB = 101
+CC_RPN_LSB = 100
+CC_DATA_MSB = 6
+CC_DATA_LSB = 38
+_RPN_CONTROLLERS = (CC_RPN_MSB, CC_RPN_LSB, CC_DATA_MSB, CC_DATA_LSB)
+
+
+class Timeline:
+    """Derlenmiş olay listesi: mutlak saniye, nota, tür, kanal ve bükme (cent) sütunları.
+
+    Disk önbelleğinden yüklenen zaman çizelgesinin sütunları dosyaya eşlenmiş
+    salt okunur memoryview'lardır (`readonly`); değiştirmek için copy() kullanılır.
+    """
+    # (sütun adı, array tip kodu) - disk önbelleği bu sırayla yazar/okur
+    COLUMNS = (('times', 'd'), ('notes', 'B'), ('kinds', 'B'), ('channels', 'B'), ('bends', 'h'))
+
+    def __init__(self, times=None, notes=None, kinds=None, channels=None, bends=None, readonly=False):
+        self.times = times if times is not None else array.array('d')
+        self.notes = notes if notes is not None else array.array('B')
+        self.kinds = kinds if kinds is not None else array.array('B')
+        self.channels = channels if channels is not None else array.array('B')
+        self.bends = bends if bends is not None else array.array('h')
+        self.readonly = readonly
+
+    def __len__(self):
+        return len(self.times)
+
+    def __iter__(self):
+        return zip(self.times, self.notes, self.kinds, self.channels, self.bends)
+
+    def append(self, time, note, kind, channel, bend=0):
+        if self.readonly:
+            raise TypeError("Önbellekten eşlenen zaman çizelgesi salt okunurdur (copy() kullanın)")
+        self.times.append(time)
+        self.notes.append(note)
+        self.kinds.append(kind)
+        self.channels.append(channel)
+        self.bends.append(bend)
+
+    def copy(self):
+        """Değiştirilebilir (array tabanlı) kopya"""
+        return Timeline(*(array.array(code, getattr(self, name)) for name, code in self.COLUMNS))
+
+    @property
+    def duration(self):
+        return self.times[-1] if self.times else 0.0
+
+
+def _read_varlen(data, pos):
+    value = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value = (value << 7) | (byte & 0x7F)
+        if byte < 0x80:
+            return value, pos
+
+
+def _read_chunks(data):
+    """MThd başlığını çöz ve MTrk parçalarının (başlangıç, bitiş) konumlarını bul"""
+    if data[:4] != b'MThd':
+        raise ValueError("Geçerli bir MIDI dosyası değil")
+    header_len = int.from_bytes(data[4:8], 'big')
+    _, _, division = struct.unpack('>HHH', data[8:14])
+    if division & 0x8000:
+        raise ValueError("SMPTE zaman bölümü desteklenmiyor")
+
+    chunks = []
+    pos = 8 + header_len
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        length = int.from_bytes(data[pos + 4:pos + 8], 'big')
+        start = pos + 8
+        if chunk_id == b'MTrk':
+            chunks.append((start, min(start + length, len(data))))
+        pos = start + length
+    return division, chunks
+
+
+def _iter_track(data, start, end):
+    """Tek bir parçayı okurken çözer: (mutlak tick, tür, değer, kanal)"""
+    pos = start
+    tick = 0
+    running = 0
+    try:
+        while pos < end:
+            delta, pos = _read_varlen(data, pos)
+            tick += delta
+
+            status = data[pos]
+            if status >= 0x80:
+                pos += 1
+                # Meta ve sysex olayları running status'u iptal eder
+                running = status if status < 0xF0 else 0
+            elif running:
+                status = running
+            else:
+                return  # Running status olmadan veri baytı: bozuk parça
+
+            if status == 0xFF:
+                meta_type = data[pos]
+                length, pos = _read_varlen(data, pos + 1)
+                if meta_type == 0x51 and length == 3:
+                    yield tick, _SET_TEMPO, int.from_bytes(data[pos:pos + 3], 'big'), 0
+                elif meta_type == 0x2F:
+                    return
+                pos += length
+            elif status == 0xF0 or status == 0xF7:
+                length, pos = _read_varlen(data, pos)
+                pos += length
+            else:
+                msg_type = status & 0xF0
+                channel = status & 0x0F
+                if msg_type == 0xC0 or msg_type == 0xD0:
+                    pos += 1
+                    continue
+                data1 = data[pos]
+                data2 = data[pos + 1]
+                pos += 2
+                if channel == DRUM_CHANNEL:
+                    continue
+                if msg_type == 0x90:
+                    yield tick, NOTE_ON if data2 > 0 else NOTE_OFF, data1, channel
+                elif msg_type == 0x80:
+                    yield tick, NOTE_OFF, data1, channel
+                elif msg_type == 0xE0:
+                    yield tick, _PITCH_WHEEL, (data2 << 7 | data1) - 8192, channel
+                elif msg_type == 0xB0 and data1 in _RPN_CONTROLLERS:
+                    yield tick, _CONTROL, data1 << 8 | data2, channel
+    except IndexError:
+        return  # Kesik dosya: okunabilen kısım çalınır
+
+
+def stream_events(path, tempos=None):
+    """Parçaları zaman sırasına göre tembel birleştirerek (saniye, nota, tür, kanal, bükme) üret.
+
+    Her parça için yalnızca bir imleç tutulur; bellek kullanımı olay sayısına
+    değil parça sayısına bağlıdır ve ilk olay dosyanın geri kalanı okunmadan gelir.
+    Pitch bend değerleri kanalın RPN 0 aralığıyla cent'e çevrilir. `tempos`
+    listesi verilirse tempo değişiklikleri (saniye, mikrosaniye / vuruş) olarak eklenir.
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        ticks_per_beat, chunks = _read_chunks(data)
+        cursors = [_iter_track(data, start, end) for start, end in chunks]
+
+        # Aynı tick'te heapq.merge parça sırasını korur (eski kararlı sıralama ile aynı)
+        seg_tick = 0
+        seg_seconds = 0.0
+        scale = DEFAULT_TEMPO * 1e-6 / ticks_per_beat
+
+        # Kanal başına RPN seçimi, bükme aralığı ve son bükme (cent)
+        rpn_msb = [127] * 16
+        rpn_lsb = [127] * 16
+        bend_range = [DEFAULT_BEND_RANGE] * 16
+        bends = [0] * 16
+
+        for tick, kind, value, channel in heapq.merge(*cursors, key=itemgetter(0)):
+            seconds = seg_seconds + (tick - seg_tick) * scale
+            if kind == NOTE_ON or kind == NOTE_OFF:
+                yield seconds, value, kind, channel, 0
+            elif kind == _PITCH_WHEEL:
+                cents = round(value * bend_range[channel] / 8192)
+                if cents != bends[channel]:
+                    bends[channel] = cents
+                    yield seconds, 0, PITCH_BEND, channel, cents
+            elif kind == _CONTROL:
+                controller, byte = value >> 8, value & 0x7F
+                if controller == CC_RPN_MSB:
+                    rpn_msb[channel] = byte
+                elif controller == CC_RPN_LSB:
+                    rpn_lsb[channel] = byte
+                elif rpn_msb[channel] == 0 and rpn_lsb[channel] == 0:
+                    if controller == CC_DATA_MSB:
+                        bend_range[channel] = byte * 100 + bend_range[channel] % 100
+                    else:
+                        bend_range[channel] = bend_range[channel] // 100 * 100 + byte
+            elif kind == _SET_TEMPO:
+                if tempos is not None:
+                    tempos.append((seconds, value))
+                seg_tick = tick
+                seg_seconds = seconds
+                scale = value * 1e-6 / ticks_per_beat
+    finally:
+        data.close()
+
+
+def compile_midi(path):
+    """MIDI dosyasını bir kez okuyup oynatıcıların yürüyeceği Timeline'a derle"""
+    timeline = Timeline()
+    for event in stream_events(path):
+        timeline.append(*event)
+    return timeline
@@ -1,106 +1,135 @@
-import threading
-import time
-import mido
-
-class ChiptunePlayer(threading.Thread):
-    def __init__(self, midi_path, buzzer, update_ui_callback, get_settings_callback):
-        super().__init__()
-        self.midi_path = midi_path
-        self.buzzer = buzzer
-        self.update_ui = update_ui_callback
-        self.get_settings = get_settings_callback
-        self.is_running = True
-        self.daemon = True
+from arpeggiator import iter_chords, arp_steps, pattern_order
+from player_base import BasePlayer
+from seek_index import open_events_at
+from tuning import REST, get_table, transposed
 
+class ChiptunePlayer(BasePlayer):
     def run(self):
         try:
-            mid = mido.MidiFile(self.midi_path)
-            events = []
-            for track in mid.tracks:
-                abs_time = 0
-                for msg in track:
-                    abs_time += msg.time
-                    if msg.type in ['note_on', 'note_off', 'set_tempo']:
-                        if hasattr(msg, 'channel') and msg.channel == 9: continue
-                        events.append({'time': abs_time, 'msg': msg})
-            events.sort(key=lambda x: x['time'])
+            chords = iter_chords(open_events_at(self.midi_path, self.start_at, self.cache))
 
-            start_time = time.perf_counter()
-            current_tick = 0
-            current_tempo = 500000
-            
-            active_notes = []
-            last_arp_time = 0
-            arp_index = 0
+            if self.start_time is None:
+                self.buzzer.begin_playback()
+                start_time = self.scheduler.now()
+            else:
+                start_time = self.start_time
+            self.stats.begin(self.buzzer)
+            last_pos = self.start_at     # Son akorun bittiği konum
+            self._clock = (start_time, self.start_at, self.get_settings()['playback_speed'])
+            sent_freq = None
+            sounding = REST       # Çalan adımın (transpozsuz) perdesi
+            phase = 0             # Son çalınan desen adımı
+            last_step_time = None # Son çalınan arpej adımının şarkı zamanı
 
-            for event in events:
+            for chord_start, chord_end, notes, retrigger in chords:
                 if not self.is_running: break
+                if chord_end <= self.start_at: continue  # Atlanan konumdan önceki boş başlangıç
+                last_pos = chord_end
                 
                 # Ayarları oku
                 settings = self.get_settings()
                 tempo_multiplier = settings['playback_speed']
+                self.rebase(tempo_multiplier)
                 transpose = settings['transpose']
-                arp_speed = settings['arp_speed'] / 1000.0 # ms to seconds
+                arp_key = (settings['arp_speed'], tempo_multiplier, settings['arp_pattern'])
+                # ms -> şarkı saniyesi (arpej hızı duvar saatine göre sabit kalır)
+                step = settings['arp_speed'] / 1000.0 * tempo_multiplier
+
+                # Akorun tüm arpej adımlarını önceden üret
+                if retrigger or len(notes) <= 1 or last_step_time is None:
+                    times, steps = arp_steps(chord_start, chord_end, notes, step, settings['arp_pattern'])
+                    first_index = 0
+                else:
+                    # Yalnızca bükme değişti: çalan adım hemen yeni perdesine geçer,
+                    # desen fazı ve adım ızgarası kesilmeden devam eder
+                    sequence = pattern_order(notes, settings['arp_pattern'])
+                    times, steps = [chord_start], [sequence[phase % len(sequence)]]
+                    next_step = max(last_step_time + step, chord_start)
+                    if next_step < chord_end:
+                        more_times, more_steps = arp_steps(next_step, chord_end, notes, step,
+                                                           settings['arp_pattern'], phase + 1)
+                        times += more_times
+                        steps += more_steps
+                    first_index = phase
+                i = 0
 
-                if event['time'] > current_tick:
-                    delta = event['time'] - current_tick
-                    wait = mido.tick2second(delta, mid.ticks_per_beat, current_tempo) / tempo_multiplier
-                    target = start_time + wait
-                    
-                    while time.perf_counter() < target and self.is_running:
-                        now = time.perf_counter()
-                        
-                        if len(active_notes) > 1:
-                            if now - last_arp_time >= arp_speed:
-                                arp_index = (arp_index + 1) % len(active_notes)
-                                last_arp_time = now
-                            
-                            sorted_notes = sorted(active_notes)
-                            current_note = sorted_notes[arp_index]
-                            self.play_note(current_note, transpose)
-                            time.sleep(0.002)
-                            
-                        elif len(active_notes) == 1:
-                            self.play_note(active_notes[0], transpose)
-                            time.sleep(0.01)
-                        else:
-                            self.play_note(0, 0)
-                            time.sleep(0.01)
+                while i < len(times) and self.is_running:
+                    step_time = times[i]
+                    pitch = steps[i]
+                    final_pitch = transposed(pitch, transpose)
+                    freq = get_table(settings['a4'], settings['cents']).lookup(final_pitch)
 
-                    start_time = target
-                    current_tick = event['time']
+                    if freq != sent_freq:
+                        reached = self.wait_for(step_time)
+                        if reached is None:
+                            # Ayar değişti: çalan adım yeni transpoz/akortla hemen yeniden gönderilir;
+                            # arpej hızı, tempo veya desen değiştiyse kalan adımlar şimdiki konumdan üretilir
+                            sent_freq = self.retune(sounding, sent_freq)
+                            settings = self.get_settings()
+                            transpose = settings['transpose']
+                            new_key = (settings['arp_speed'], settings['playback_speed'], settings['arp_pattern'])
+                            if (len(notes) > 1 and new_key != arp_key
+                                    and last_step_time is not None and last_step_time >= chord_start):
+                                arp_key = new_key
+                                first_index += i
+                                i = 0
+                                times, steps = self.remaining_steps(notes, chord_end, settings, first_index,
+                                                                    last_step_time)
+                            continue
+                        if not reached: break
 
-                msg = event['msg']
-                if msg.type == 'set_tempo':
-                    current_tempo = msg.tempo
-                else:
-                    note = msg.note
-                    vel = msg.velocity if msg.type == 'note_on' else 0
-                    if msg.type == 'note_on' and vel > 0:
-                        if note not in active_notes: active_notes.append(note)
-                    elif msg.type == 'note_off' or (msg.type == 'note_on' and vel == 0):
-                        if note in active_notes: active_notes.remove(note)
-                        arp_index = 0
+                    if not self.is_running: break
+                    # Buzzer tam sayı Hz çalar: frekansı değiştirmeyen adımlar yazılmaz
+                    if freq != sent_freq:
+                        self.play_note(final_pitch, freq, self._clock[0])
+                        sent_freq = freq
+                        sounding = pitch
+                    phase = first_index + i
+                    last_step_time = step_time
+                    i += 1
 
+                    if len(notes) > 1:
+                        settings = self.get_settings()
+                        tempo_multiplier = settings['playback_speed']
+                        self.rebase(tempo_multiplier)
+                        transpose = settings['transpose']
+                        new_key = (settings['arp_speed'], tempo_multiplier, settings['arp_pattern'])
+                        if new_key != arp_key:
+                            # Slider değişti: kalan adımları bulunduğumuz konumdan yeniden üret
+                            arp_key = new_key
+                            first_index += i
+                            i = 0
+                            times, steps = self.remaining_steps(notes, chord_end, settings, first_index,
+                                                                last_step_time)
+
+            if self.gapless:
+                # Son akorun bittiği ana kadar bekle; arada değişen ayarlar yine hemen uygulanır
+                while self.is_running and self.wait_for(last_pos) is None:
+                    sent_freq = self.retune(sounding, sent_freq)
+            start_time, current_pos, tempo_multiplier = self._clock
+            self.end_time = start_time + max(0.0, last_pos - current_pos) / tempo_multiplier
+            if self.gapless and self.is_running:
+                # Son akorun bittiği anda sustur; cihaz kuyruğu ve zamanlanmış mod sıradaki şarkıya kalır
+                self.buzzer.send_freq(0, self.end_time)
+                self.stats.finish()
+                return
+
+            self.buzzer.end_playback(wait=self.is_running)
             self.buzzer.send_freq(0)
+            self.stats.finish()
             self.update_ui("BİTTİ", False)
 
         except Exception as e:
+            self.stats.finish()
             self.update_ui(f"Hata: {e}", False)
 
-    def play_note(self, note, transpose):
-        if note > 0:
-            final_note = note + transpose
-            if final_note < 0: final_note = 0
-            if final_note > 127: final_note = 127
-            
-            freq = self.buzzer.midi_to_freq(final_note)
-            self.buzzer.send_freq(freq)
-            name = self.buzzer.get_note_name(final_note)
-            self.update_ui(f"{name} | {freq} Hz", True)
-        else:
-            self.buzzer.send_freq(0)
-            self.update_ui("...", False)
+    def remaining_steps(self, notes, chord_end, settings, first_index, last_step_time):
+        """Arpej hızı, tempo veya desen değişti: kalan adımları yeni hızla üret.
 
-    def stop(self):
-        self.is_running = False
+        Izgara son çalınan adımdan sürer; şarkı saati onu geçtiyse şimdiki konumdan.
+        """
+        step = settings['arp_speed'] / 1000.0 * settings['playback_speed']
+        next_step = max(last_step_time + step, self._clock[1])
+        if next_step >= chord_end:
+            return [], []
+        return arp_steps(next_step, chord_end, notes, step, settings['arp_pattern'], first_index)
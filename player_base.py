@@ -0,0 +1,103 @@
+import threading
+from timeline_cache import default_cache
+from scheduler import Scheduler
+from instrumentation import PlaybackStats
+from tuning import get_table, note_of, transposed
+
+
+class BasePlayer(threading.Thread):
+    """Oynatıcıların ortak iskeleti: ayarlar, zamanlama kaydı, saat çapası, durdurma.
+
+    Alt sınıflar yalnızca run() yazar; şarkı saati wait_for() / rebase() ile
+    ilerletilir, çalan ses ayar değişince retune() ile yeniden gönderilir.
+    Birden fazla buzzer süren oynatıcı retune()'u kendi seslerine göre yeniden tanımlar.
+    """
+    def __init__(self, midi_path, buzzer, update_ui_callback, get_settings_callback, scheduler=None, start_at=0.0,
+                 start_time=None, gapless=False, cache=default_cache):
+        super().__init__()
+        self.midi_path = midi_path
+        self.buzzer = buzzer
+        self.cache = cache        # Zaman çizelgesi önbelleği
+        self.start_at = start_at  # Çalmaya başlanacak konum (saniye)
+        self._clock = (0.0, start_at, 0.0)  # (duvar saati, şarkı konumu, tempo) çapası
+        # Çalma listesinde: start_time verilirse buzzer zaten çalıyordur ve şarkı o andan
+        # başlar; gapless ise şarkı sonunda kuyruk boşaltılmaz, sıradaki şarkı devralır
+        self.start_time = start_time
+        self.gapless = gapless
+        self.end_time = None      # Son olayın duvar saati (sıradaki şarkının başlangıcı)
+        self.is_running = True
+        self.daemon = True
+        self.scheduler = scheduler or Scheduler()
+
+        # Gecikme, arayüz ve ayar çağrılarının süreleri halka tamponlara kaydedilir
+        self.stats = PlaybackStats(self.scheduler.lateness)
+        self.update_ui = self.stats.timed(update_ui_callback, self.stats.ui_time)
+        self.get_settings = self.stats.timed(get_settings_callback, self.stats.settings_time)
+
+    @property
+    def lookahead(self):
+        # Çok kartlı oynatmada kartlar birlikte aynı modda çalar: ilk kartınki geçerlidir
+        return self.buzzer.lookahead
+
+    def wait_for(self, position):
+        """Şarkıdaki `position` konumuna kadar bekle.
+
+        Zamanlanmış modda nota, çalınacağı andan lookahead kadar önce gönderilir.
+        Ayar değişikliğiyle uyandırılırsa saat o anki konuma taşınıp None döner
+        (kalan bekleme yeni tempoyla yeniden hesaplanır); durdurulursa False.
+        """
+        start_time, pos, tempo_multiplier = self._clock
+        if position <= pos:
+            return True
+        target = start_time + (position - pos) / tempo_multiplier
+        if self.scheduler.wait_until(target - self.lookahead):
+            self._clock = (target, position, tempo_multiplier)
+            return True
+        if not self.is_running:
+            return False
+        self.rebase(self.get_settings()['playback_speed'])
+        return None
+
+    def rebase(self, tempo_multiplier):
+        """Tempo değiştiyse saati şimdiki şarkı konumuna taşıyıp yeni tempoyla sürdür"""
+        start_time, pos, old_tempo = self._clock
+        if tempo_multiplier == old_tempo:
+            return
+        now = self.scheduler.now()
+        if now > start_time:
+            pos += (now - start_time) * old_tempo
+            start_time = now
+        self._clock = (start_time, pos, tempo_multiplier)
+
+    def position(self):
+        """Şarkı içindeki yaklaşık konum (saniye): son beklenen an + geçen süre"""
+        start_time, pos, tempo_multiplier = self._clock
+        return pos + max(0.0, self.scheduler.now() - start_time) * tempo_multiplier
+
+    def play_note(self, pitch, freq, at=None):
+        """Tek buzzer'lı oynatıcılar: frekansı gönder ve çalan notayı göster"""
+        if freq > 0:
+            self.buzzer.send_freq(freq, at)
+            self.update_ui(f"{self.buzzer.get_note_name(note_of(pitch))} | {freq} Hz", True)
+        else:
+            self.buzzer.send_freq(0, at)
+            self.update_ui("...", False)
+
+    def retune(self, pitch, sent_freq):
+        """Çalan perdeyi güncel transpoz ve akortla yeniden gönder; gönderilen frekansı döndür"""
+        if sent_freq is None:
+            return None  # Henüz nota çalınmadı
+        settings = self.get_settings()
+        final_pitch = transposed(pitch, settings['transpose'])
+        freq = get_table(settings['a4'], settings['cents']).lookup(final_pitch)
+        if freq != sent_freq:
+            self.play_note(final_pitch, freq, self._clock[0])
+        return freq
+
+    def settings_changed(self):
+        """Ayar değişti: süren bekleme kesilir, kalan süre ve çalan nota yeni ayarlarla hesaplanır"""
+        self.scheduler.wake()
+
+    def stop(self):
+        self.is_running = False
+        self.scheduler.wake()
@@ -0,0 +1,115 @@
+from voice_allocator import iter_voice_segments
+from player_base import BasePlayer
+from seek_index import open_events_at
+from timeline_cache import default_cache
+from tuning import REST, get_table, note_of, transposed
+
+
+class PolyPlayer(BasePlayer):
+    """Eş zamanlı notaları birden fazla Arduino'ya dağıtarak gerçekten çok sesli çalar.
+
+    Her kartın kendi ArduinoBuzzer'ı ve yazıcı thread'i vardır; bir portun
+    yavaşlaması diğerlerinin komutlarını bekletmez. Tüm kartlar aynı
+    zaman çizelgesinden tek bir döngüyle sürülür.
+    """
+    def __init__(self, midi_path, buzzers, update_ui_callback, get_settings_callback, scheduler=None, pins=None,
+                 start_at=0.0, start_time=None, gapless=False, cache=default_cache):
+        # Ortak ayarlar ve nota adları ilk karttan; her ses kendi kartına yazılır
+        super().__init__(midi_path, buzzers[0], update_ui_callback, get_settings_callback, scheduler,
+                         start_at, start_time, gapless, cache)
+        self.buzzers = buzzers
+        self.pins = pins
+
+    def run(self):
+        try:
+            segments = iter_voice_segments(open_events_at(self.midi_path, self.start_at, self.cache), len(self.buzzers), self.pins)
+
+            if self.start_time is None:
+                for buzzer in self.buzzers:
+                    buzzer.begin_playback()
+                if len({buzzer.lookahead for buzzer in self.buzzers}) > 1:
+                    # Bazı kartlar zamanlanmış moda geçemedi: hepsi birlikte anlık modda çalsın
+                    for buzzer in self.buzzers:
+                        buzzer.end_playback(wait=False)
+                start_time = self.scheduler.now()
+            else:
+                start_time = self.start_time
+            self.stats.begin(*self.buzzers)
+
+            last_pos = self.start_at     # Son segmentin konumu (seyreltilmiş olsa da)
+            self._clock = (start_time, self.start_at, self.get_settings()['playback_speed'])
+            sent_freqs = [None] * len(self.buzzers)
+            held = [REST] * len(self.buzzers)      # Seslerin (transpozsuz) perdeleri
+            sounding = [REST] * len(self.buzzers)  # Seslerin transpoze edilmiş perdeleri
+
+            for segment_time, voice, pitch in segments:
+                if not self.is_running: break
+                last_pos = segment_time
+
+                while True:
+                    settings = self.get_settings()
+                    self.rebase(settings['playback_speed'])
+                    table = get_table(settings['a4'], settings['cents'])
+
+                    final_pitch = transposed(pitch, settings['transpose'])
+                    freq = table.lookup(final_pitch)
+                    # Buzzer tam sayı Hz çalar: frekansı değişmeyen ses için yazma yok
+                    if freq == sent_freqs[voice]: break
+
+                    reached = self.wait_for(segment_time)
+                    if reached is None:
+                        # Ayar değişti: çalan sesler yeni transpoz/akortla hemen yeniden gönderilir
+                        self.retune(held, sent_freqs, sounding)
+                        continue
+                    if reached and self.is_running:
+                        self.buzzers[voice].send_freq(freq, self._clock[0])
+                        sent_freqs[voice] = freq
+                        held[voice] = pitch
+                        sounding[voice] = final_pitch if freq > 0 else REST
+                        self.show_voices(sounding)
+                    break
+
+            if self.gapless:
+                # Son olayın anına kadar bekle; arada değişen ayarlar yine hemen uygulanır
+                while self.is_running and self.wait_for(last_pos) is None:
+                    self.retune(held, sent_freqs, sounding)
+            start_time, current_pos, tempo_multiplier = self._clock
+            self.end_time = start_time + max(0.0, last_pos - current_pos) / tempo_multiplier
+            if self.gapless and self.is_running:
+                # Son olayın anında tüm kartları sustur; kuyruklar sıradaki şarkıya kalır
+                for buzzer in self.buzzers:
+                    buzzer.send_freq(0, self.end_time)
+                self.stats.finish()
+                return
+
+            for buzzer in self.buzzers:
+                buzzer.end_playback(wait=self.is_running)
+                buzzer.send_freq(0)
+            self.stats.finish()
+            self.update_ui("BİTTİ", False)
+
+        except Exception as e:
+            self.stats.finish()
+            self.update_ui(f"Hata: {e}", False)
+
+    def retune(self, held, sent_freqs, sounding):
+        """Çalan seslerin perdelerini güncel transpoz ve akortla yeniden gönder"""
+        settings = self.get_settings()
+        table = get_table(settings['a4'], settings['cents'])
+        for voice, pitch in enumerate(held):
+            if sent_freqs[voice] is None:
+                continue  # Bu ses henüz çalmadı
+            final_pitch = transposed(pitch, settings['transpose'])
+            freq = table.lookup(final_pitch)
+            if freq != sent_freqs[voice]:
+                self.buzzers[voice].send_freq(freq, self._clock[0])
+                sent_freqs[voice] = freq
+                sounding[voice] = final_pitch if freq > 0 else REST
+        self.show_voices(sounding)
+
+    def show_voices(self, sounding):
+        names = [self.buzzers[0].get_note_name(note_of(p)) for p in sounding if p != REST]
+        if names:
+            self.update_ui(" ".join(names), True)
+        else:
+            self.update_ui("...", False)
@@ -1,92 +1,116 @@
-import threading
-import time
-import mido
-
-class SoloPlayer(threading.Thread):
-    def __init__(self, midi_path, buzzer, update_ui_callback, get_settings_callback):
-        super().__init__()
-        self.midi_path = midi_path
-        self.buzzer = buzzer
-        self.update_ui = update_ui_callback
-        self.get_settings = get_settings_callback # Ayarları okuyan fonksiyon
-        self.is_running = True
-        self.daemon = True
+from midi_timeline import NOTE_ON, PITCH_BEND
+from player_base import BasePlayer
+from seek_index import open_events_at
+from melody import melody_line, segments_from
+from tuning import CENTS_PER_NOTE, REST, get_table, transposed
 
+
+def iter_solo_segments(events):
+    """Son basılan notanın kazandığı tek sesli akışı tek geçişte (başlangıç, perde) segmentlerine çevir.
+
+    Perde nota * 100 + kanalın bükmesidir (cent). Aynı zamandaki olaylar
+    birlikte işlenir; perde yalnızca değiştiğinde segment üretilir. REST sessizlik demektir.
+    """
+    active_notes = []  # (nota, kanal) basılma sırasıyla
+    bends = [0] * 16
+    current = None
+    batch_time = 0.0
+
+    def top_pitch():
+        if not active_notes:
+            return REST
+        note, channel = active_notes[-1]
+        return note * CENTS_PER_NOTE + bends[channel]
+
+    for event_time, note, kind, channel, bend in events:
+        if event_time > batch_time:
+            top = top_pitch()
+            if top != current:
+                yield batch_time, top
+                current = top
+            batch_time = event_time
+
+        if kind == PITCH_BEND:
+            bends[channel] = bend
+        elif kind == NOTE_ON:
+            if (note, channel) in active_notes: active_notes.remove((note, channel))
+            active_notes.append((note, channel))
+        else:
+            if (note, channel) in active_notes: active_notes.remove((note, channel))
+
+    top = top_pitch()
+    if top != current:
+        yield batch_time, top
+
+
+class SoloPlayer(BasePlayer):
     def run(self):
         try:
-            mid = mido.MidiFile(self.midi_path)
-            events = []
-            for track in mid.tracks:
-                abs_time = 0
-                for msg in track:
-                    abs_time += msg.time
-                    if msg.type in ['note_on', 'note_off', 'set_tempo']:
-                        if hasattr(msg, 'channel') and msg.channel == 9: continue
-                        events.append({'time': abs_time, 'msg': msg})
-            events.sort(key=lambda x: x['time'])
-
-            start_time = time.perf_counter()
-            current_tick = 0
-            current_tempo = 500000
-            active_notes = []
-
-            for event in events:
+            # Melodi dosya başına bir kez çıkarılır; son basılan nota kuralı
+            # analiz gerektirmediği için olay akışından doğrudan çalınır
+            strategy = self.get_settings()['melody']
+            if strategy == 'latest':
+                segments = iter_solo_segments(open_events_at(self.midi_path, self.start_at, self.cache))
+            else:
+                segments = segments_from(melody_line(self.midi_path, strategy, self.cache), self.start_at)
+
+            if self.start_time is None:
+                self.buzzer.begin_playback()
+                start_time = self.scheduler.now()
+            else:
+                start_time = self.start_time
+            self.stats.begin(self.buzzer)
+            last_pos = self.start_at     # Son segmentin konumu (seyreltilmiş olsa da)
+            self._clock = (start_time, self.start_at, self.get_settings()['playback_speed'])
+            sent_freq = None
+            sounding = REST              # Çalan segmentin (transpozsuz) perdesi
+
+            for segment_time, pitch in segments:
                 if not self.is_running: break
-                
-                # Ayarları Anlık Olarak Al
-                settings = self.get_settings()
-                tempo_multiplier = settings['playback_speed']
-                transpose = settings['transpose']
-
-                if event['time'] > current_tick:
-                    delta = event['time'] - current_tick
-                    # Tempo çarpanını bekleme süresine uygula
-                    wait = mido.tick2second(delta, mid.ticks_per_beat, current_tempo) / tempo_multiplier
-                    target = start_time + wait
-                    
-                    while time.perf_counter() < target and self.is_running:
-                        # Beklerken notayı çal (Transpoze eklenmiş haliyle)
-                        if active_notes:
-                            self.play_note(active_notes[-1], transpose)
-                        else:
-                            self.play_note(0, 0)
-                        time.sleep(0.01)
-                    
-                    start_time = target
-                    current_tick = event['time']
-
-                msg = event['msg']
-                if msg.type == 'set_tempo':
-                    current_tempo = msg.tempo
-                else:
-                    note = msg.note
-                    vel = msg.velocity if msg.type == 'note_on' else 0
-                    if msg.type == 'note_on' and vel > 0:
-                        if note in active_notes: active_notes.remove(note)
-                        active_notes.append(note)
-                    elif msg.type == 'note_off' or (msg.type == 'note_on' and vel == 0):
-                        if note in active_notes: active_notes.remove(note)
+                if segment_time < self.start_at: continue  # Atlanan konumdan önceki boş başlangıç
+                last_pos = segment_time
+
+                while True:
+                    # Ayarları Anlık Olarak Al
+                    settings = self.get_settings()
+                    self.rebase(settings['playback_speed'])
+                    table = get_table(settings['a4'], settings['cents'])
+
+                    final_pitch = transposed(pitch, settings['transpose'])
+                    freq = table.lookup(final_pitch)
+                    # Buzzer tam sayı Hz çalar: frekansı değiştirmeyen bükmeler için
+                    # ne beklenir ne de seri porta yazılır
+                    if freq == sent_freq: break
+
+                    # Segment sınırına kadar bekle, arada seri porta yazma
+                    reached = self.wait_for(segment_time)
+                    if reached is None:
+                        # Ayar değişti: çalan nota yeni transpoz/akortla hemen yeniden gönderilir
+                        sent_freq = self.retune(sounding, sent_freq)
+                        continue
+                    if reached and self.is_running:
+                        self.play_note(final_pitch, freq, self._clock[0])
+                        sent_freq = freq
+                        sounding = pitch
+                    break
+
+            if self.gapless:
+                # Son olayın anına kadar bekle; arada değişen ayarlar yine hemen uygulanır
+                while self.is_running and self.wait_for(last_pos) is None:
+                    sent_freq = self.retune(sounding, sent_freq)
+            start_time, current_pos, tempo_multiplier = self._clock
+            self.end_time = start_time + max(0.0, last_pos - current_pos) / tempo_multiplier
+            if self.gapless and self.is_running:
+                # Son olayın anında sustur; cihaz kuyruğu ve zamanlanmış mod sıradaki şarkıya kalır
+                self.buzzer.send_freq(0, self.end_time)
+                self.stats.finish()
+                return
 
+            self.buzzer.end_playback(wait=self.is_running)
             self.buzzer.send_freq(0)
+            self.stats.finish()
             self.update_ui("BİTTİ", False)
 
         except Exception as e:
+            self.stats.finish()
             self.update_ui(f"Hata: {e}", False)
-
-    def play_note(self, note, transpose):
-        if note > 0:
-            final_note = note + transpose
-            # Nota 0-127 arasında kalmalı
-            if final_note < 0: final_note = 0
-            if final_note > 127: final_note = 127
-            
-            freq = self.buzzer.midi_to_freq(final_note)
-            self.buzzer.send_freq(freq)
-            name = self.buzzer.get_note_name(final_note)
-            self.update_ui(f"{name} | {freq} Hz", True)
-        else:
-            self.buzzer.send_freq(0)
-            self.update_ui("...", False)
-
-    def stop(self):
-        self.is_running = False
@@ -0,0 +1,206 @@
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from timeline_cache import default_cache
+from melody import extract_melody, has_line, remember_line
+from seek_index import SeekIndex, has_index, remember_index
+from instrumentation import PlaybackStats
+
+PREFETCH_AHEAD = 2      # Çalan şarkıdan sonra önceden hazırlanan dosya sayısı
+
+
+def prepare_entry(path, strategy):
+    """Çalışan süreçte: dosyayı derleyip disk önbelleğine yaz, melodiyi ve konum dizinini çıkar"""
+    timeline = default_cache.get_or_compile(path)
+    segments = extract_melody(timeline, strategy) if strategy != 'latest' else None
+    return default_cache.key_for(path), SeekIndex(timeline).checkpoints, segments
+
+
+class Playlist:
+    """Çalma sırası.
+
+    Sıradaki PREFETCH_AHEAD dosya ayrı bir süreçte derlenir: zaman çizelgesi
+    disk önbelleğine yazılır, melodi ve konum dizini bu sürecin belleğine
+    alınır. Böylece şarkı geçişinde ayrıştırma beklenmez ve ayrıştırma çalan
+    thread'le GIL için yarışmaz.
+    """
+    def __init__(self, paths=(), loop=False):
+        self.entries = list(paths)
+        self.index = -1         # Çalan girdi (-1: henüz başlamadı)
+        self.loop = loop
+        self._lock = threading.Lock()
+        self._executor = None
+        self._prepared = set()  # (dosya, strateji) süren işler; sonuç gelince çıkarılır
+
+    def set(self, paths):
+        """Listeyi değiştir; sonraki şarkı yeni listenin ilk girdisidir"""
+        with self._lock:
+            self.entries = list(paths)
+            self.index = -1
+
+    def add(self, paths):
+        with self._lock:
+            self.entries.extend(paths)
+
+    def remove(self, position):
+        with self._lock:
+            del self.entries[position]
+            if position <= self.index:
+                self.index -= 1  # Çalan girdi silinse de sıra kaldığı yerden sürer
+
+    def jump(self, position):
+        """Sonraki çağrıda `position`. girdiye geçilecek şekilde konumlan"""
+        with self._lock:
+            self.index = position - 1
+
+    def current(self):
+        with self._lock:
+            if 0 <= self.index < len(self.entries):
+                return self.entries[self.index]
+            return None
+
+    def next(self):
+        """Sıradaki dosyaya geç ve yolunu döndür (liste bittiyse None)"""
+        with self._lock:
+            self.index += 1
+            if self.index >= len(self.entries):
+                if not (self.loop and self.entries):
+                    self.index = len(self.entries)
+                    return None
+                self.index = 0
+            return self.entries[self.index]
+
+    def upcoming(self, count=PREFETCH_AHEAD):
+        """Çalan girdiden sonraki `count` dosya (döngüde baştan devam eder)"""
+        with self._lock:
+            paths = []
+            for offset in range(1, count + 1):
+                position = self.index + offset
+                if position >= len(self.entries):
+                    if not self.loop or not self.entries:
+                        break
+                    position %= len(self.entries)
+                paths.append(self.entries[position])
+            return paths
+
+    def prefetch(self, strategy, paths=None):
+        """Dosyaları (varsayılan: sıradakiler) arka plandaki süreçte hazırla.
+
+        Sonucu hâlâ bellek önbelleklerinde olan veya hazırlanmakta olan dosya
+        atlanır; önbellekten düşmüş dosya yeniden hazırlanır.
+        """
+        for path in self.upcoming() if paths is None else paths:
+            try:
+                key = default_cache.key_for(path)
+            except OSError:
+                continue  # Dosya yok: hata çalınırken gösterilir
+            if has_index(key) and (strategy == 'latest' or has_line(key, strategy)):
+                continue
+            with self._lock:
+                if (path, strategy) in self._prepared:
+                    continue
+                self._prepared.add((path, strategy))
+            if self._executor is None:
+                # spawn: Tk ve oynatıcı thread'leri olan süreç çatallanmaz
+                self._executor = ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn'))
+            future = self._executor.submit(prepare_entry, path, strategy)
+            future.add_done_callback(lambda f, p=path, s=strategy: self._prepared_entry(f, p, s))
+
+    def _prepared_entry(self, future, path, strategy):
+        # Yürütücünün geri çağrı thread'inde: sonuçlar bu sürecin (kilitli) bellek
+        # önbelleklerine eklenir, zaman çizelgesi diskten mmap'lenir
+        try:
+            key, checkpoints, segments = future.result()
+            if segments is not None:
+                remember_line(key, strategy, segments)
+            timeline = default_cache.load(key)
+            if timeline is not None:
+                remember_index(key, SeekIndex(timeline, checkpoints=checkpoints))
+        except Exception:
+            pass  # Hatalı dosya: hata çalınırken gösterilir
+        finally:
+            with self._lock:
+                self._prepared.discard((path, strategy))
+
+    def close(self):
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class PlaylistPlayer(threading.Thread):
+    """Listeyi şarkılar arasında boşluk bırakmadan çalar.
+
+    Her şarkı kendi oynatıcısıyla (SoloPlayer, ChiptunePlayer, PolyPlayer) bu
+    thread'de çalıştırılır. Sonraki şarkı, öncekinin son olayının duvar
+    saatine bağlanır; buzzer'ın zamanlanmış modu ve cihaz kuyruğu şarkılar
+    arasında sıfırlanmaz.
+    """
+    def __init__(self, playlist, player_class, buzzer, update_ui_callback, get_settings_callback,
+                 scheduler=None, start_at=0.0, on_start=None, on_end=None, **options):
+        super().__init__()
+        self.playlist = playlist
+        self.player_class = player_class
+        self.buzzer = buzzer
+        self.buzzers = buzzer if isinstance(buzzer, list) else [buzzer]
+        self.update_ui = update_ui_callback
+        self.get_settings = get_settings_callback
+        self.scheduler = scheduler
+        self.start_at = start_at    # Yalnızca ilk şarkı için
+        self.on_start = on_start    # on_start(yol), on_end(yol, oynatıcı): bu thread'den çağrılır
+        self.on_end = on_end
+        self.options = options      # Oynatıcıya aynen verilir (ör. PolyPlayer pins)
+        self.is_running = True
+        self.daemon = True
+        self.player = None
+        self.path = None
+        self._idle_stats = PlaybackStats(())
+
+    @property
+    def stats(self):
+        """Çalan (veya son çalınan) şarkının zamanlama kaydı"""
+        return self.player.stats if self.player else self._idle_stats
+
+    def position(self):
+        return self.player.position() if self.player else self.start_at
+
+    def run(self):
+        start_at = self.start_at
+        start_time = None   # İlk şarkı buzzer'ı hazırlar; sonrakiler öncekinin bittiği andan başlar
+        path = self.playlist.next()
+        while path and self.is_running:
+            self.path = path
+            self.playlist.prefetch(self.get_settings()['melody'])
+            if self.on_start:
+                self.on_start(path)
+
+            player = self.player_class(path, self.buzzer, self.update_ui, self.get_settings, self.scheduler,
+                                       start_at=start_at, start_time=start_time, gapless=True, **self.options)
+            self.scheduler = player.scheduler   # Tüm şarkılar aynı zamanlayıcıyı paylaşır
+            self.player = player
+            if not self.is_running: break
+            player.run()
+            if self.on_end:
+                self.on_end(path, player)
+
+            if player.end_time is None:
+                start_time = None   # Hata: sonraki şarkı buzzer'ı yeniden hazırlar
+            else:
+                start_time = player.end_time
+            start_at = 0.0
+            path = self.playlist.next() if self.is_running else None
+
+        for buzzer in self.buzzers:
+            buzzer.end_playback(wait=self.is_running)
+            buzzer.send_freq(0)
+        if self.is_running:
+            self.update_ui("BİTTİ", False)
+
+    def settings_changed(self):
+        if self.player:
+            self.player.settings_changed()
+
+    def stop(self):
+        self.is_running = False
+        if self.player:
+            self.player.stop()
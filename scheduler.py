@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import deque
+
+# Son kaç saniyenin meşgul döngüyle bekleneceği: hassasiyet / CPU dengesi
+PRECISION_PROFILES = {
+    'eco': 0.0,        # Sadece uyku: en düşük CPU, işletim sistemi zamanlayıcısı kadar hassas
+    'balanced': 0.002,
+    'precise': 0.005,
+}
+DEFAULT_PRECISION = 'balanced'
+
+
+class Scheduler:
+    """Bir sonraki olaya kadar uyuyup son kısmı döngüyle bekleyen zamanlayıcı"""
+    def __init__(self, precision=DEFAULT_PRECISION, history=4096):
+        self.spin_threshold = PRECISION_PROFILES[precision]
+        self.lateness = deque(maxlen=history)  # Saniye cinsinden gecikmeler
+        self._wake = threading.Event()
+
+    def wait_until(self, target):
+        """perf_counter() hedefine kadar bekle ve ne kadar geç kalındığını kaydet.
+
+        wake() ile erken uyandırılırsa False döner.
+        """
+        while True:
+            remaining = target - time.perf_counter()
+            if remaining <= self.spin_threshold:
+                break
+            if self._wake.wait(remaining - self.spin_threshold):
+                self._wake.clear()
+                return False
+
+        # sleep(0) GIL'i her turda bırakır: döngü sürerken seri yazıcı thread'i de çalışır
+        while time.perf_counter() < target:
+            time.sleep(0)
+
+        self.lateness.append(time.perf_counter() - target)
+        return True
+
+    def now(self):
+        """Oynatıcıların zaman çizelgesini bağladığı saat"""
+        return time.perf_counter()
+
+    def wake(self):
+        """Bekleyen wait_until çağrısını hemen sonlandır"""
+        self._wake.set()
+
+    def summary(self):
+        """Kaydedilen gecikmelerin özeti (ms)"""
+        samples = list(self.lateness)  # Oynatıcı thread'i eklerken güvenli kopya
+        if not samples:
+            return None
+        return {
+            'count': len(samples),
+            'mean_ms': sum(samples) / len(samples) * 1000,
+            'max_ms': max(samples) * 1000,
+        }
+
+
+class OfflineScheduler:
+    """Hiç beklemeyen sanal saat: oynatıcıyı gerçek zaman yerine şarkı zamanında koşturur.
+
+    Çevrimdışı işleme (WAV) için kullanılır: wait_until() saati hedefe ilerletip hemen döner.
+    """
+    def __init__(self):
+        self.time = 0.0
+        self.lateness = deque(maxlen=1)  # Sanal saatte gecikme olmaz
+
+    def wait_until(self, target):
+        self.time = max(self.time, target)
+        return True
+
+    def now(self):
+        return self.time
+
+    def wake(self):
+        pass
+
+    def summary(self):
+        return None
@@ -0,0 +1,114 @@
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from midi_timeline import Timeline, NOTE_ON, PITCH_BEND
+from timeline_cache import default_cache
+
+CHECKPOINT_INTERVAL = 512   # Kaç olayda bir basılı notaların kaydedileceği
+CACHE_SIZE = 8              # Bellekte tutulan dizin sayısı
+
+
+class SeekIndex:
+    """Derlenmiş zaman çizelgesinde herhangi bir konuma atlamak için dizin.
+
+    Her CHECKPOINT_INTERVAL olayda bir, o olaydan hemen önce basılı olan
+    notalar (basılma sırasıyla) ve kanal bükmeleri saklanır. Konum zaman
+    sütununda ikili aramayla bulunur; durum en yakın kontrol noktasından en
+    fazla bir aralık kadar olay işlenerek kurulur.
+    """
+    def __init__(self, timeline, interval=CHECKPOINT_INTERVAL, checkpoints=None):
+        self.timeline = timeline
+        self.interval = interval
+        self.checkpoints = []   # (basılı (nota, kanal) demeti, bükmeler demeti)
+        if checkpoints is not None:
+            self.checkpoints = checkpoints  # Başka süreçte aynı zaman çizelgesinden kurulmuş
+            return
+
+        held = {}
+        bends = [0] * 16
+        for index, event in enumerate(timeline):
+            if index % interval == 0:
+                self.checkpoints.append((tuple(held), tuple(bends)))
+            self._apply(held, bends, event)
+
+    @staticmethod
+    def _apply(held, bends, event):
+        _, note, kind, channel, bend = event
+        if kind == PITCH_BEND:
+            bends[channel] = bend
+            return
+        held.pop((note, channel), None)
+        if kind == NOTE_ON:
+            held[(note, channel)] = True  # Yeniden basılan nota sıranın sonuna geçer
+
+    def _events(self, start, stop=None):
+        # Sütunları kopyalamadan dilimle (mmap'lenmiş önbellek kayıtları dahil)
+        return zip(*(memoryview(getattr(self.timeline, name))[start:stop]
+                     for name, _ in Timeline.COLUMNS))
+
+    def state_at(self, index):
+        """`index`. olaydan hemen önce basılı notalar ve kanal bükmeleri"""
+        checkpoint = min(index // self.interval, len(self.checkpoints) - 1)
+        held_keys, bends = self.checkpoints[checkpoint]
+        held = dict.fromkeys(held_keys, True)
+        bends = list(bends)
+        for event in self._events(checkpoint * self.interval, index):
+            self._apply(held, bends, event)
+        return list(held), bends
+
+    def events_from(self, seconds):
+        """`seconds` anından itibaren çalınacak olay akışı.
+
+        O an basılı notalar ve sıfırdan farklı bükmeler `seconds` zamanlı
+        olaylar olarak başa eklenir; oynatıcılar akışı baştan çalıyormuş gibi işler.
+        """
+        if not self.checkpoints:
+            return
+        index = bisect_left(self.timeline.times, seconds)
+        held, bends = self.state_at(index)
+        for channel, bend in enumerate(bends):
+            if bend:
+                yield seconds, 0, PITCH_BEND, channel, bend
+        for note, channel in held:
+            yield seconds, note, NOTE_ON, channel, 0
+        yield from self._events(index)
+
+
+_indexes = OrderedDict()
+# Arayüz, oynatıcı ve ön hazırlık geri çağrısı thread'leri aynı LRU'yu kullanır;
+# dizin kilidin dışında kurulur, kilit yalnızca sözlük işlemlerini korur
+_indexes_lock = threading.Lock()
+
+
+def seek_index(path, cache=default_cache):
+    """Dosyanın dizinini bir kez kur ve dosya içeriği başına bellekte tut"""
+    key = cache.key_for(path)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+    if index is None:
+        index = SeekIndex(cache.get_or_compile(path))
+        remember_index(key, index)
+    return index
+
+
+def has_index(key):
+    with _indexes_lock:
+        return key in _indexes
+
+
+def remember_index(key, index):
+    """Hazır bir dizini (ör. arka plan sürecinin kontrol noktalarıyla) önbelleğe ekle"""
+    with _indexes_lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        if len(_indexes) > CACHE_SIZE:
+            _indexes.popitem(last=False)
+
+
+def open_events_at(path, seconds=0.0, cache=default_cache):
+    """Oynatıcılar için: baştan akan olaylar veya `seconds` anından itibaren dizinden olaylar"""
+    if seconds > 0:
+        return seek_index(path, cache).events_from(seconds)
+    return cache.open_events(path)
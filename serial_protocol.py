@@ -0,0 +1,115 @@
+# Python ile arduino_buzzer_player.ino arasındaki ikili çerçeve protokolü.
+#
+# Her komut şu biçimdedir:
+#   [0xA0 | opcode] [veri baytları (opcode'a göre sabit uzunluk)] [checksum]
+# checksum = başlık ve veri baytlarının XOR'u. Çok baytlı değerler little-endian.
+# Çerçeve başlığı üst dört biti 0xA olan bayttır; bozuk bir çerçeve atlanır ve
+# ayrıştırıcı bir sonraki başlığı bekler.
+#
+# Arduino'dan gelen yanıtlar metin satırlarıdır ("RESET:64", "CREDIT:8",
+# "STATS:24.5,1480,61234" ...).
+
+import struct
+
+BAUD_RATE = 115200
+
+FRAME_HEADER = 0xA0
+FRAME_MASK = 0xF0
+
+# Opcode'lar (alt dört bit)
+OP_TONE = 0x01    # veri: uint16 frekans (Hz), 0 = sessiz
+OP_STATS = 0x02   # veri yok: STATS satırı iste
+OP_RESET = 0x03   # veri yok: kuyruğu boşalt, sustur, cihaz saatini sıfırla
+OP_QUEUE = 0x04   # veri: uint32 cihaz zamanı (ms) + uint16 frekans
+
+PAYLOAD_SIZES = {
+    OP_TONE: 2,
+    OP_STATS: 0,
+    OP_RESET: 0,
+    OP_QUEUE: 6,
+}
+
+# Zamanlanmış oynatma: cihazdaki halka tamponun boyutu (ATmega328P: 6 bayt x 64)
+QUEUE_SIZE = 64
+
+# Gelen satır önekleri
+LINE_READY = "Arduino Buzzer Player hazir!"   # Kart açılırken setup() içinde bir kez
+LINE_RESET = "RESET:"     # RESET:<boş kuyruk kapasitesi>
+LINE_CREDIT = "CREDIT:"   # CREDIT:<çalınıp boşalan kuyruk yeri sayısı>
+LINE_STATS = "STATS:"     # STATS:<sıcaklık °C>,<boş RAM bayt>,<çalışma süresi ms>
+
+_U16 = struct.Struct("<H")
+_QUEUE = struct.Struct("<IH")
+
+
+def encode(opcode, payload=b""):
+    """Tek bir komut çerçevesi oluştur"""
+    header = FRAME_HEADER | opcode
+    checksum = header
+    for byte in payload:
+        checksum ^= byte
+    return bytes((header,)) + payload + bytes((checksum,))
+
+
+def encode_tone(freq):
+    return encode(OP_TONE, _U16.pack(min(max(int(freq), 0), 0xFFFF)))
+
+
+def encode_stats():
+    return encode(OP_STATS)
+
+
+def encode_reset():
+    return encode(OP_RESET)
+
+
+def encode_queue(device_ms, freq):
+    return encode(OP_QUEUE, _QUEUE.pack(device_ms & 0xFFFFFFFF, min(max(int(freq), 0), 0xFFFF)))
+
+
+class FrameDecoder:
+    """Bayt akışından komut çerçevelerini çözer (.ino'daki readSerial() ile aynı durum makinesi).
+
+    feed() her geçerli çerçeve için (opcode, veri) üretir; checksum'ı tutmayan
+    çerçeve atlanır ve bad_frames sayacı artar.
+    """
+    def __init__(self):
+        self.bad_frames = 0
+        self.reset()
+
+    def reset(self):
+        self._state = None          # None: başlık bekleniyor, aksi halde kalan veri baytı
+        self._frame = bytearray()
+
+    def feed(self, data):
+        for byte in data:
+            if self._state is None:
+                if byte & FRAME_MASK == FRAME_HEADER and byte & 0x0F in PAYLOAD_SIZES:
+                    self._frame = bytearray((byte,))
+                    self._state = PAYLOAD_SIZES[byte & 0x0F]
+                continue
+
+            if self._state > 0:
+                self._frame.append(byte)
+                self._state -= 1
+                continue
+
+            checksum = 0
+            for b in self._frame:
+                checksum ^= b
+            frame = self._frame
+            self.reset()
+            if byte == checksum:
+                yield frame[0] & 0x0F, bytes(frame[1:])
+            else:
+                self.bad_frames += 1
+
+
+def decode_tone(payload):
+    """OP_TONE verisi -> frekans (Hz)"""
+    return _U16.unpack(payload)[0]
+
+
+def decode_queue(payload):
+    """OP_QUEUE verisi -> (cihaz zamanı ms, frekans)"""
+    return _QUEUE.unpack(payload)
@@ -0,0 +1,93 @@
+import threading
+import time
+from serial_protocol import LINE_CREDIT, LINE_READY, LINE_RESET, LINE_STATS
+
+
+class SerialReader(threading.Thread):
+    """Arduino'dan gelen tüm veriyi okuyan tek thread.
+
+    Tk ve oynatıcı thread'leri porttan hiç okumaz: telemetri bir anlık görüntü
+    olarak, kuyruk kredileri ise bir semafor olarak buradan alınır. Karttan
+    gelen ilk geçerli satır `ready` olayını kurar (bağlantı el sıkışması).
+    """
+    def __init__(self, ser, on_error=None, on_boot=None):
+        super().__init__()
+        self.daemon = True
+        self.ser = ser
+        self.on_error = on_error
+        self.on_boot = on_boot      # Bağlandıktan sonra kart yeniden başlarsa çağrılır
+        self.is_running = True
+
+        self.ready = threading.Event()
+
+        self.credits = threading.Semaphore(0)
+        self.reset_event = threading.Event()
+        self._awaiting_reset = False
+
+        self._stats = None
+        self._lock = threading.Lock()
+        self._buffer = b""
+
+    def run(self):
+        while self.is_running:
+            try:
+                # Port zaman aşımı (0.05 sn) kadar bekler, thread'i kilitlemez
+                data = self.ser.read(self.ser.in_waiting or 1)
+            except Exception as e:
+                if self.is_running and self.on_error:
+                    self.on_error(e)
+                return
+            if not data:
+                continue
+
+            self._buffer += data
+            *lines, self._buffer = self._buffer.split(b"\n")
+            for raw in lines:
+                self._handle(raw.decode('utf-8', 'replace').strip())
+
+    def _handle(self, line):
+        try:
+            if line.startswith(LINE_READY):
+                # Hazır olduktan sonra gelen karşılama: kart yeniden başladı, kuyruğu boş
+                if self.ready.is_set() and self.on_boot:
+                    self.on_boot()
+                self.ready.set()
+            elif line.startswith(LINE_CREDIT):
+                # RESET yanıtından önce gelen krediler eski kuyruğa aittir
+                if not self._awaiting_reset:
+                    self.credits.release(int(line[len(LINE_CREDIT):]))
+            elif line.startswith(LINE_RESET):
+                count = int(line[len(LINE_RESET):])
+                if count > 0:
+                    self.credits.release(count)
+                self._awaiting_reset = False
+                self.reset_event.set()
+            elif line.startswith(LINE_STATS):
+                temp, ram, uptime = line[len(LINE_STATS):].split(",")
+                snapshot = {
+                    'temp': temp,
+                    'ram': ram,
+                    'uptime': int(uptime) // 1000,
+                    'received': time.perf_counter(),
+                }
+                with self._lock:
+                    self._stats = snapshot
+            else:
+                return
+            self.ready.set()
+        except ValueError:
+            pass  # Bozuk satır: yok say
+
+    def prepare_reset(self):
+        """RESET gönderilmeden önce çağrılır: krediler yanıtla birlikte yeniden sayılır"""
+        self._awaiting_reset = True
+        self.reset_event.clear()
+        self.credits = threading.Semaphore(0)
+
+    def stats(self):
+        """Son alınan telemetri (yoksa None)"""
+        with self._lock:
+            return dict(self._stats) if self._stats else None
+
+    def stop(self):
+        self.is_running = False
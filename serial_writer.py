@@ -0,0 +1,136 @@
+import threading
+import time
+from collections import deque
+
+MAX_PENDING = 256      # Sıradaki komut sınırı; dolarsa yeni komut atılır
+METRIC_WINDOW = 1.0    # bytes/sn hesaplanan pencere (saniye)
+
+
+class SerialWriter(threading.Thread):
+    """Seri porta yazan tek thread: oynatıcı döngüsü hiçbir zaman G/Ç'de beklemez.
+
+    Frekans komutları "son gelen kazanır" mantığıyla birleştirilir: kuyruğun
+    sonunda henüz yazılmamış bir ton komutu varken yenisi gelirse eskisi
+    gönderilmez. Arkasına sıralı komut eklenmiş bir ton birleştirilmez; böylece
+    diğer komutlar (kuyruk girdileri, reset, sorgu) tonlarla sırası bozulmadan yazılır.
+    Ton komutuna verilen `on_written(bitiş_zamanı)` çerçeve porta yazılınca bu
+    thread'de çağrılır; birleştirilen komutun geri çağrısı yerine geçen çerçeveyle gelir.
+    """
+    def __init__(self, ser, on_error=None):
+        super().__init__()
+        self.daemon = True
+        self.ser = ser
+        self.on_error = on_error
+        self.is_running = True
+        self.last_error = None
+
+        self._items = deque()
+        self._pending_tone = None
+        self._writing = False          # Kuyruktan alınmış, yazılmakta olan komut var
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)   # Yazıcı: yeni komut / durdurma
+        self._idle = threading.Condition(self._lock)   # flush(): kuyruk boşaldı
+
+        # Sayaçlar
+        self.bytes_written = 0
+        self.commands_written = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.errors = 0
+        self._recent = deque(maxlen=4096)  # (bitiş zamanı, bayt, gecikme)
+
+    def send(self, frame):
+        """Sıralı komut ekle (atlanmaz, birleştirilmez)"""
+        with self._cond:
+            if len(self._items) >= MAX_PENDING:
+                self.dropped += 1
+                return False
+            self._items.append([frame, time.perf_counter(), None])
+            self._cond.notify()
+        return True
+
+    def send_tone(self, frame, on_written=None):
+        """Ton komutu ekle; kuyruğun sonunda bekleyen eski ton komutunun yerine geçer"""
+        callbacks = [on_written] if on_written else []
+        with self._cond:
+            if self._items and self._items[-1] is self._pending_tone:
+                self._pending_tone[0] = frame
+                self._pending_tone[2] += callbacks
+                self.coalesced += 1
+                return True
+            if len(self._items) >= MAX_PENDING:
+                self.dropped += 1
+                return False
+            item = [frame, time.perf_counter(), callbacks]
+            self._items.append(item)
+            self._pending_tone = item
+            self._cond.notify()
+        return True
+
+    def run(self):
+        while True:
+            with self._cond:
+                while self.is_running and not self._items:
+                    self._cond.wait()
+                if not self._items:
+                    self._idle.notify_all()
+                    return
+                item = self._items.popleft()
+                if item is self._pending_tone:
+                    self._pending_tone = None
+                self._writing = True
+                frame, queued_at, callbacks = item
+
+            try:
+                self.ser.write(frame)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                if self.on_error:
+                    self.on_error(e)
+            else:
+                done = time.perf_counter()
+                self.bytes_written += len(frame)
+                self.commands_written += 1
+                self._recent.append((done, len(frame), done - queued_at))
+                for callback in callbacks or ():
+                    callback(done)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    if not self._items:
+                        self._idle.notify_all()
+
+    def flush(self, timeout=0.5):
+        """Sıradaki ve yazılmakta olan tüm komutlar porta yazılana kadar bekle"""
+        with self._idle:
+            return self._idle.wait_for(lambda: not self._items and not self._writing, timeout)
+
+    def stop(self):
+        with self._cond:
+            self.is_running = False
+            self._cond.notify()
+
+    def metrics(self):
+        """Anlık yazma istatistikleri (gecikmeler ms)"""
+        now = time.perf_counter()
+        recent = list(self._recent)
+        window = [r for r in recent if now - r[0] <= METRIC_WINDOW]
+        latencies = sorted(r[2] for r in recent)
+
+        def percentile(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+        return {
+            'bytes_per_sec': sum(r[1] for r in window) / METRIC_WINDOW,
+            'commands_per_sec': len(window) / METRIC_WINDOW,
+            'queue_depth': len(self._items),
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'latency_p50_ms': percentile(0.50),
+            'latency_p99_ms': percentile(0.99),
+            'latency_max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        }
@@ -0,0 +1,10 @@
+import pytest
+from benchmark import make_midi
+
+
+@pytest.fixture
+def song(tmp_path):
+    """Çok parçalı, tempo değişiklikli, çakışan notalı sentetik MIDI dosyası"""
+    path = tmp_path / "song.mid"
+    make_midi(str(path), 2000, tracks=4, polyphony=3, tempo_changes=20)
+    return str(path)
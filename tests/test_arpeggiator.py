@@ -0,0 +1,74 @@
+import pytest
+from arpeggiator import build_schedule, iter_chords, pattern_order
+from midi_timeline import NOTE_OFF, NOTE_ON, PITCH_BEND
+from player_arpej import ChiptunePlayer
+from scheduler import OfflineScheduler
+from tuning import REST
+from wav_renderer import ScheduleRecorder
+
+
+def chord(notes, start=0.0, end=1.0):
+    """Aynı anda basılıp bırakılan notaların olayları (basılma sırası korunur)"""
+    events = [(start, note, NOTE_ON, 0, 0) for note in notes]
+    return events + [(end, note, NOTE_OFF, 0, 0) for note in notes]
+
+
+@pytest.mark.parametrize("pattern, expected", [
+    ('up', [6000, 6400, 6700, 6000]),
+    ('down', [6700, 6400, 6000, 6700]),
+    ('updown', [6000, 6400, 6700, 6400]),
+    ('played', [6700, 6000, 6400, 6700]),
+])
+def test_patterns(pattern, expected):
+    times, pitches = build_schedule(chord([67, 60, 64]), 0.25, pattern)
+    assert times.tolist() == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert pitches.tolist() == expected + [REST]
+
+
+@pytest.mark.parametrize("step, count", [(0.25, 4), (0.1, 10), (0.3, 4), (2.0, 1)])
+def test_speed_sets_step_count(step, count):
+    times, _ = build_schedule(chord([60, 64]), step)
+    held = times[:-1]  # Son adım bırakıştaki sessizlik
+    assert len(held) == count
+    assert held.tolist() == pytest.approx([i * step for i in range(count)])
+
+
+def test_single_note_is_one_step():
+    times, pitches = build_schedule(chord([60]), 0.05)
+    assert times.tolist() == [0.0, 1.0]
+    assert pitches.tolist() == [6000, REST]
+
+
+def test_bend_keeps_phase():
+    events = chord([60, 64])
+    events.insert(2, (0.5, 0, PITCH_BEND, 0, 50))
+    ranges = list(iter_chords(events))
+    assert ranges[0] == (0.0, 0.5, (6000, 6400), True)
+    assert ranges[1] == (0.5, 1.0, (6050, 6450), False)  # Yalnızca bükme değişti
+
+
+def test_updown_does_not_repeat_ends():
+    assert pattern_order([60, 64, 67, 72], 'updown') == [60, 64, 67, 72, 67, 64]
+    assert pattern_order([64, 60], 'updown') == [60, 64]
+
+
+def test_speed_change_keeps_step_grid(tmp_path):
+    mido = pytest.importorskip("mido")
+    path = str(tmp_path / "chord.mid")
+    track = mido.MidiTrack()
+    track += [mido.Message('note_on', note=note, velocity=100, time=0) for note in (60, 64, 67)]
+    track += [mido.Message('note_off', note=note, time=960 if i == 0 else 0) for i, note in enumerate((60, 64, 67))]
+    mido.MidiFile(tracks=[track]).save(path)  # 120 BPM: akor 1 sn basılı
+
+    scheduler = OfflineScheduler()
+    recorder = ScheduleRecorder(scheduler)
+
+    def settings():
+        # 0.3 sn'de arpej hızı 100 ms'den 50 ms'ye iner
+        return {'transpose': 0, 'playback_speed': 1.0, 'arp_speed': 100 if scheduler.time < 0.3 else 50,
+                'arp_pattern': 'up', 'a4': 440.0, 'cents': 0}
+
+    ChiptunePlayer(path, recorder, lambda *a: None, settings, scheduler).run()
+    assert recorder.times == pytest.approx([0.0, 0.1, 0.2, 0.3] + [0.3 + 0.05 * i for i in range(1, 14)] + [1.0])
+    # Desen fazı kesilmeden sürer: C E G C | E G C ...
+    assert recorder.freqs == [261, 329, 391] * 5 + [261, 329, 0]
@@ -0,0 +1,90 @@
+import struct
+import pytest
+from library import Library, audible_notes, channel_list, scan_file
+
+PPQ = 480
+
+
+def write_midi(path, events):
+    """Tek parçalı MIDI dosyası: events = [(tick farkı, mesaj baytları)]"""
+    data = b""
+    for delta, message in events + [(0, b"\xff\x2f\x00")]:
+        varlen = [delta & 0x7F]
+        while delta > 0x7F:
+            delta >>= 7
+            varlen.insert(0, delta & 0x7F | 0x80)
+        data += bytes(varlen) + message
+    with open(path, "wb") as f:
+        f.write(b"MThd" + struct.pack(">IHHH", 6, 0, 1, PPQ))
+        f.write(b"MTrk" + struct.pack(">I", len(data)) + data)
+    return str(path)
+
+
+def tempo(bpm):
+    return b"\xff\x51\x03" + round(60e6 / bpm).to_bytes(3, "big")
+
+
+def chord_song(path, notes=(60, 64, 67)):
+    """120 BPM'de başlayıp 150 BPM'e geçen; kanal 1'de akor, kanal 3'te tek nota"""
+    events = [(0, tempo(120))]
+    events += [(0, bytes((0x90, note, 100))) for note in notes]
+    events += [(0, bytes((0x92, 48, 100)))]
+    events += [(PPQ, tempo(150))]
+    events += [(PPQ if i == 0 else 0, bytes((0x80, note, 0))) for i, note in enumerate(notes)]
+    events += [(0, bytes((0x82, 48, 0)))]
+    return write_midi(path, events)
+
+
+def test_scan_file_fields(tmp_path):
+    row = scan_file(chord_song(tmp_path / "chord.mid"))
+    low, high = audible_notes()
+    assert row['name'] == "chord.mid"
+    assert 'error' not in row
+    assert row['events'] == 8
+    assert row['duration'] == pytest.approx(0.5 + 0.4)
+    assert (row['tempo_min'], row['tempo_max']) == pytest.approx((120, 150))
+    assert (row['note_min'], row['note_max']) == (48, 67)
+    assert row['polyphony'] == 4
+    assert channel_list(row['channels']) == "1, 3"
+    assert (row['fit_low'], row['fit_high']) == (low - 48, high - 67)
+
+
+def test_scan_file_records_errors(tmp_path):
+    path = tmp_path / "broken.mid"
+    path.write_bytes(b"MThd\x00\x00")
+    row = scan_file(str(path))
+    assert row['error']
+    assert 'duration' not in row
+
+
+@pytest.fixture(scope="module")
+def library(tmp_path_factory):
+    root = tmp_path_factory.mktemp("midi")
+    chord_song(root / "a_b.mid")
+    chord_song(root / "axb.mid")
+    chord_song(root / "100%.mid", notes=(60,))
+    chord_song(root / "high.mid", notes=(115, 119))
+    (root / "broken.mid").write_bytes(b"MThd")
+    library = Library(str(tmp_path_factory.mktemp("db") / "library.sqlite"))
+    result = library.scan([str(root)], workers=1)
+    assert result == {'files': 5, 'scanned': 5, 'removed': 0, 'failed': 1}
+    return library
+
+
+def names(rows):
+    return [row['name'] for row in rows]
+
+
+def test_search_words_are_literal(library):
+    assert names(library.search("a_b")) == ["a_b.mid"]
+    assert names(library.search("100%")) == ["100%.mid"]
+    assert names(library.search("b .mid")) == ["a_b.mid", "axb.mid"]
+    assert names(library.search("")) == ["100%.mid", "a_b.mid", "axb.mid", "high.mid"]  # Hatalı dosya yok
+
+
+def test_search_filters(library):
+    assert names(library.search(max_polyphony=2)) == ["100%.mid"]
+    assert "high.mid" not in names(library.search(transpose=0))
+    assert "high.mid" in names(library.search(transpose=-12))
+    assert names(library.search(min_duration=1.0)) == []
+    assert len(library.search(max_duration=1.0, limit=2)) == 2
@@ -0,0 +1,73 @@
+from live_input import LivePlayer, MidiDecoder, histogram
+from midi_timeline import NOTE_OFF, NOTE_ON, PITCH_BEND
+
+SETTINGS = {'transpose': 0, 'playback_speed': 1.0, 'arp_speed': 40, 'arp_pattern': 'up',
+            'a4': 440.0, 'cents': 0}
+
+
+def test_running_status():
+    decoder = MidiDecoder()
+    assert decoder.feed(bytes([0x90, 60, 100, 64, 100, 67, 0])) == [
+        (60, NOTE_ON, 0, 0), (64, NOTE_ON, 0, 0), (67, NOTE_OFF, 0, 0),
+    ]
+    # Durum baytı önceki pakette kaldı; mesaj iki pakete bölündü
+    assert decoder.feed(bytes([72])) == []
+    assert decoder.feed(bytes([90])) == [(72, NOTE_ON, 0, 0)]
+
+
+def test_realtime_and_system_bytes():
+    decoder = MidiDecoder()
+    # Saat baytı mesajın ortasında olabilir ve running status'u bozmaz
+    assert decoder.feed(bytes([0x91, 60, 0xF8, 100, 0xFE, 62, 100])) == [(60, NOTE_ON, 1, 0), (62, NOTE_ON, 1, 0)]
+    # SysEx ve sistem mesajları running status'u iptal eder: ardından gelen veri baytları atılır
+    assert decoder.feed(bytes([0xF0, 0x7E, 0x01, 0xF7, 64, 100])) == []
+    assert decoder.feed(bytes([0x91, 64, 100, 0xF2, 1, 2, 65, 100])) == [(64, NOTE_ON, 1, 0)]
+
+
+def test_drum_channel_is_skipped():
+    assert MidiDecoder().feed(bytes([0x99, 36, 100, 0x89, 36, 0])) == []
+
+
+def test_bend_uses_rpn_range():
+    decoder = MidiDecoder()
+    assert decoder.feed(bytes([0xE0, 0x7F, 0x7F])) == [(0, PITCH_BEND, 0, 200)]
+    assert decoder.feed(bytes([0xE0, 0x7F, 0x7F])) == []  # Değişmeyen bükme olay üretmez
+    decoder.feed(bytes([0xB0, 101, 0, 100, 0, 6, 12]))     # RPN 0: aralık 12 yarım ton
+    assert decoder.feed(bytes([0xE0, 0x00, 0x00])) == [(0, PITCH_BEND, 0, -1200)]
+    assert decoder.feed(bytes([0xE0, 0x00, 0x40])) == [(0, PITCH_BEND, 0, 0)]
+
+
+def test_histogram_buckets():
+    buckets = histogram([0.00001, 0.00005, 0.0002, 0.0015, 0.0015, 0.004, 0.5])
+    assert list(buckets) == ['<=0.05ms', '<=0.1ms', '<=0.25ms', '<=0.5ms', '<=1.0ms', '<=2.0ms', '<=5.0ms', '>5.0ms']
+    assert list(buckets.values()) == [2, 0, 1, 0, 0, 2, 1, 1]
+    assert sum(histogram([]).values()) == 0
+
+
+class WrittenBuzzer:
+    """Komutu hemen 'yazan' sahte buzzer: yazılma anı gönderilen sırayla verilir"""
+    def __init__(self, written_at):
+        self.written_at = iter(written_at)
+        self.sent = []
+
+    def send_freq(self, freq, at=None, on_written=None):
+        self.sent.append(freq)
+        if on_written:
+            on_written(next(self.written_at))
+
+    @staticmethod
+    def get_note_name(note):
+        return str(note)
+
+
+def test_latency_counts_only_messages_that_send():
+    buzzer = WrittenBuzzer([10.25, 11.5])
+    player = LivePlayer(None, buzzer, lambda *a: None, lambda: SETTINGS)
+    player.handle(bytes([0x90, 60, 100]), 10.0)
+    player.handle(bytes([0xB0, 7, 100]), 10.5)     # Ses değişmedi: komut yok
+    player.handle(bytes([0x90, 60, 100]), 10.75)   # Aynı frekans: komut yok
+    player.handle(bytes([0x80, 60, 0]), 11.0)
+
+    assert buzzer.sent == [261, 0]
+    assert player.messages == 4
+    assert list(player.latency) == [0.25, 0.5]
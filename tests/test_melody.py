@@ -0,0 +1,56 @@
+import pytest
+from melody import extract_melody, segments_from
+from midi_timeline import NOTE_OFF, NOTE_ON, PITCH_BEND
+from tuning import REST
+
+
+def note(start, end, pitch, channel):
+    return [(start, pitch, NOTE_ON, channel, 0), (end, pitch, NOTE_OFF, channel, 0)]
+
+
+def song(*notes):
+    events = [event for n in notes for event in note(*n)]
+    events.sort(key=lambda event: (event[0], event[2] == NOTE_ON))  # Aynı anda önce bırakma
+    return events
+
+
+# Kanal 0: tek sesli melodi; kanal 1: uzun tutulan eşlik akoru; kanal 2: kısa tiz bir süs notası
+MIXED = song((0.0, 2.0, 48, 1), (0.0, 2.0, 55, 1),
+             (0.0, 0.5, 76, 0), (0.5, 1.0, 74, 0), (1.0, 1.5, 72, 0), (1.5, 2.0, 67, 0),
+             (0.2, 0.3, 84, 2))
+
+
+@pytest.mark.parametrize("strategy, expected", [
+    ('skyline', [(0.0, 7600), (0.2, 8400), (0.3, 7600), (0.5, 7400), (1.0, 7200), (1.5, 6700), (2.0, REST)]),
+    ('channel', [(0.0, 7600), (0.5, 7400), (1.0, 7200), (1.5, 6700), (2.0, REST)]),
+    ('longest', [(0.0, 5500), (2.0, REST)]),
+])
+def test_strategies(strategy, expected):
+    assert extract_melody(MIXED, strategy) == expected
+
+
+def test_latest_follows_last_pressed():
+    events = song((0.0, 1.0, 60, 0), (0.5, 1.0, 55, 0))
+    assert extract_melody(events, 'latest') == [(0.0, 6000), (0.5, 5500), (1.0, REST)]
+    assert extract_melody(events, 'skyline') == [(0.0, 6000), (1.0, REST)]
+
+
+def test_channel_keeps_short_melody_rests():
+    # Melodinin kısa susması eşlikle doldurulmaz; uzun susmada eşliğin sonraki notası çalar
+    events = song((0.0, 4.0, 48, 1), (0.0, 2.5, 52, 1), (2.5, 4.0, 53, 1),
+                  (0.0, 1.0, 72, 0), (1.1, 2.0, 74, 0), (3.0, 4.0, 76, 0))
+    assert extract_melody(events, 'channel') == [
+        (0.0, 7200), (1.0, REST), (1.1, 7400), (2.0, REST), (2.5, 5300), (3.0, 7600), (4.0, REST),
+    ]
+
+
+def test_bend_applies_to_melody_note():
+    events = song((0.0, 1.0, 69, 0))
+    events.insert(1, (0.5, 0, PITCH_BEND, 0, -100))
+    assert extract_melody(events, 'channel') == [(0.0, 6900), (0.5, 6800), (1.0, REST)]
+
+
+def test_segments_from_starts_with_sounding_pitch():
+    segments = extract_melody(MIXED, 'channel')
+    assert list(segments_from(segments, 0.7)) == [(0.7, 7400), (1.0, 7200), (1.5, 6700), (2.0, REST)]
+    assert list(segments_from(segments, 0.0))[0] == (0.0, 7600)
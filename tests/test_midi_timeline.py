@@ -0,0 +1,98 @@
+import pytest
+from midi_timeline import NOTE_OFF, NOTE_ON, PITCH_BEND, DEFAULT_BEND_RANGE, DRUM_CHANNEL, compile_midi
+
+mido = pytest.importorskip("mido")
+
+
+def mido_events(path):
+    """Referans: mido ile (saniye, nota, tür, kanal, bükme) listesi"""
+    mid = mido.MidiFile(path)
+    events = []
+    seconds = 0.0
+    tempo = 500000
+    bend_range = [DEFAULT_BEND_RANGE] * 16
+    bends = [0] * 16
+    rpn = [(127, 127)] * 16
+    for msg in mido.merge_tracks(mid.tracks):
+        seconds += mido.tick2second(msg.time, mid.ticks_per_beat, tempo)
+        if msg.type == 'set_tempo':
+            tempo = msg.tempo
+            continue
+        if getattr(msg, 'channel', None) == DRUM_CHANNEL:
+            continue
+        if msg.type == 'note_on':
+            events.append((seconds, msg.note, NOTE_ON if msg.velocity else NOTE_OFF, msg.channel, 0))
+        elif msg.type == 'note_off':
+            events.append((seconds, msg.note, NOTE_OFF, msg.channel, 0))
+        elif msg.type == 'pitchwheel':
+            cents = round(msg.pitch * bend_range[msg.channel] / 8192)
+            if cents != bends[msg.channel]:
+                bends[msg.channel] = cents
+                events.append((seconds, 0, PITCH_BEND, msg.channel, cents))
+        elif msg.type == 'control_change':
+            msb, lsb = rpn[msg.channel]
+            if msg.control == 101:
+                rpn[msg.channel] = (msg.value, lsb)
+            elif msg.control == 100:
+                rpn[msg.channel] = (msb, msg.value)
+            elif msg.control == 6 and (msb, lsb) == (0, 0):
+                bend_range[msg.channel] = msg.value * 100 + bend_range[msg.channel] % 100
+    return events
+
+
+def assert_same(actual, expected):
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        assert got[0] == pytest.approx(want[0], abs=1e-9)
+        assert got[1:] == want[1:]
+
+
+def test_parity_with_mido(song):
+    assert_same(list(compile_midi(song)), mido_events(song))
+
+
+def test_parity_bends_and_channels(tmp_path):
+    path = str(tmp_path / "bends.mid")
+    mid = mido.MidiFile(ticks_per_beat=96)
+    lead = mido.MidiTrack()
+    lead += [
+        mido.MetaMessage('set_tempo', tempo=400000, time=0),
+        # Kanal 1'in bükme aralığı RPN 0 ile 12 yarım ton
+        mido.Message('control_change', channel=1, control=101, value=0, time=0),
+        mido.Message('control_change', channel=1, control=100, value=0, time=0),
+        mido.Message('control_change', channel=1, control=6, value=12, time=0),
+        mido.Message('note_on', channel=1, note=60, velocity=90, time=10),
+        mido.Message('pitchwheel', channel=1, pitch=4096, time=20),
+        mido.Message('pitchwheel', channel=1, pitch=4097, time=5),
+        mido.Message('note_on', channel=1, note=60, velocity=0, time=30),
+        mido.MetaMessage('set_tempo', tempo=700000, time=0),
+        mido.Message('pitchwheel', channel=0, pitch=-8192, time=10),
+        mido.Message('note_on', channel=0, note=1, velocity=90, time=0),
+        mido.Message('note_off', channel=0, note=1, time=40),
+    ]
+    drums = mido.MidiTrack()
+    drums += [
+        mido.Message('note_on', channel=DRUM_CHANNEL, note=36, velocity=100, time=0),
+        mido.Message('note_on', channel=2, note=72, velocity=100, time=10),
+        mido.Message('note_off', channel=DRUM_CHANNEL, note=36, time=10),
+        mido.Message('note_off', channel=2, note=72, time=50),
+    ]
+    mid.tracks += [lead, drums]
+    mid.save(path)
+
+    events = list(compile_midi(path))
+    assert_same(events, mido_events(path))
+    assert all(channel != DRUM_CHANNEL for _, _, _, channel, _ in events)
+    assert (0, PITCH_BEND, 1, 600) in [e[1:] for e in events]
+
+
+def test_running_status_cleared_by_meta(tmp_path):
+    # Meta olayından sonra running status ile gelen veri baytları geçersizdir: parça orada biter
+    track = bytes([0x00, 0x90, 60, 64,
+                   0x00, 0xFF, 0x01, 0x00,
+                   0x0A, 62, 64,
+                   0x00, 0xFF, 0x2F, 0x00])
+    path = tmp_path / "running.mid"
+    path.write_bytes(b"MThd" + (6).to_bytes(4, 'big') + bytes([0, 0, 0, 1, 0, 96])
+                     + b"MTrk" + len(track).to_bytes(4, 'big') + track)
+    assert list(compile_midi(str(path))) == [(0.0, 60, NOTE_ON, 0, 0)]
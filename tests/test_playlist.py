@@ -0,0 +1,75 @@
+import time
+from collections import deque
+import seek_index
+from benchmark import make_midi
+from playlist import Playlist, PlaylistPlayer
+from player_solo import SoloPlayer
+from scheduler import OfflineScheduler
+from timeline_cache import default_cache
+from wav_renderer import ScheduleRecorder
+
+SETTINGS = {'transpose': 0, 'playback_speed': 1.0, 'arp_speed': 40, 'arp_pattern': 'up',
+            'melody': 'latest', 'a4': 440.0, 'cents': 0}
+
+
+class CountingScheduler(OfflineScheduler):
+    """Her beklemeyi gecikme tamponuna yazan sanal saat"""
+    def __init__(self):
+        super().__init__()
+        self.lateness = deque(maxlen=100000)
+
+    def wait_until(self, target):
+        self.lateness.append(0.0)
+        return super().wait_until(target)
+
+
+def songs(tmp_path, *sizes):
+    paths = []
+    for i, size in enumerate(sizes):
+        path = str(tmp_path / f"song{i}.mid")
+        make_midi(path, size, tracks=2, polyphony=2, tempo_changes=0, seed=i + 1)
+        paths.append(path)
+    return paths
+
+
+def waits_alone(path):
+    scheduler = CountingScheduler()
+    SoloPlayer(path, ScheduleRecorder(scheduler), lambda *a: None, lambda: SETTINGS, scheduler, gapless=True).run()
+    return len(scheduler.lateness)
+
+
+def test_song_stats_are_per_song(tmp_path):
+    paths = songs(tmp_path, 200, 400)
+    playlist = Playlist(paths)
+    ended = []
+    scheduler = CountingScheduler()
+    player = PlaylistPlayer(playlist, SoloPlayer, ScheduleRecorder(scheduler), lambda *a: None, lambda: SETTINGS,
+                            scheduler, on_end=lambda path, song: ended.append((path, len(song.stats.lateness))))
+    try:
+        player.run()
+    finally:
+        playlist.close()
+
+    assert ended == [(path, waits_alone(path)) for path in paths]
+
+
+def test_evicted_entry_is_prefetched_again(tmp_path):
+    path, = songs(tmp_path, 200)
+    key = default_cache.key_for(path)
+    playlist = Playlist([path])
+
+    def prepared():
+        deadline = time.monotonic() + 60
+        while not seek_index.has_index(key) and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return seek_index.has_index(key)
+
+    try:
+        playlist.prefetch('latest', [path])
+        assert prepared()
+        with seek_index._indexes_lock:
+            del seek_index._indexes[key]
+        playlist.prefetch('latest', [path])
+        assert prepared()
+    finally:
+        playlist.close()
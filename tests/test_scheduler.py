@@ -0,0 +1,30 @@
+import time
+from scheduler import Scheduler
+from serial_writer import SerialWriter
+
+
+class NullPort:
+    def write(self, frame):
+        pass
+
+
+def test_spin_lets_writer_thread_run():
+    # Her ton bir sonraki hedefin döngüyle beklenen penceresinde kuyruğa girer:
+    # döngü GIL'i bırakmazsa yazıcı ancak bekleme bitince yazabilir
+    scheduler = Scheduler('precise')
+    writer = SerialWriter(NullPort())
+    writer.start()
+    try:
+        target = time.perf_counter()
+        for i in range(100):
+            target += 0.004
+            scheduler.wait_until(target)
+            writer.send_tone(bytes([i]))
+        assert writer.flush(1.0)
+        metrics = writer.metrics()
+    finally:
+        writer.stop()
+        writer.join(1.0)
+
+    assert metrics['coalesced'] == 0
+    assert metrics['latency_p50_ms'] < 1.0
@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import OrderedDict
+import pytest
+import melody
+import seek_index
+from melody import has_line
+from midi_timeline import NOTE_OFF, NOTE_ON, compile_midi
+from seek_index import SeekIndex, has_index, remember_index
+from player_solo import iter_solo_segments
+from voice_allocator import iter_voice_segments
+from tuning import REST
+
+
+def heard_from(segments, seconds, start=REST):
+    """`seconds` anından itibaren duyulan perde değişiklikleri: [(zaman, perde)]"""
+    current = start
+    heard = []
+    for time, pitch in segments:
+        if time <= seconds:
+            current = pitch
+            continue
+        if not heard:
+            heard.append((seconds, current))
+        if pitch != heard[-1][1]:
+            heard.append((time, pitch))
+    return heard or [(seconds, current)]
+
+
+def positions(timeline):
+    # Olay anları, olay aralarının ortası ve kontrol noktası sınırları
+    times = timeline.times
+    picks = [times[i] for i in range(0, len(times), 97)]
+    picks += [(times[i] + times[i + 1]) / 2 for i in range(0, len(times) - 1, 131)]
+    return [0.0] + picks + [times[-1], times[-1] + 1.0]
+
+
+@pytest.mark.parametrize("interval", [1, 16, 512])
+def test_solo_seek_matches_full_play(song, interval):
+    timeline = compile_midi(song)
+    index = SeekIndex(timeline, interval=interval)
+    full = list(iter_solo_segments(timeline))
+    for seconds in positions(timeline):
+        seek = list(iter_solo_segments(index.events_from(seconds)))
+        assert heard_from(seek, seconds) == heard_from(full, seconds), seconds
+
+
+def test_voice_seek_matches_full_play(song):
+    timeline = compile_midi(song)
+    index = SeekIndex(timeline, interval=64)
+    voices = 3
+
+    def per_voice(changes):
+        tracks = [[] for _ in range(voices)]
+        for time, voice, pitch in changes:
+            tracks[voice].append((time, pitch))
+        return tracks
+
+    full = per_voice(iter_voice_segments(timeline, voices))
+    for seconds in positions(timeline):
+        seek = per_voice(iter_voice_segments(index.events_from(seconds), voices))
+        # Atlamada ses ataması farklı olabilir; duyulan perde kümesi aynı kalmalı
+        heard_full = sorted(heard_from(track, seconds)[0][1] for track in full)
+        heard_seek = sorted(heard_from(track, seconds)[0][1] for track in seek)
+        assert heard_seek == heard_full, seconds
+
+
+def test_shared_checkpoints(song):
+    timeline = compile_midi(song)
+    built = SeekIndex(timeline, interval=32)
+    reused = SeekIndex(timeline, interval=32, checkpoints=built.checkpoints)
+    seconds = timeline.times[len(timeline) // 2]
+    assert list(reused.events_from(seconds)) == list(built.events_from(seconds))
+
+
+class SlowLru(OrderedDict):
+    """Okuma ile sıraya taşıma arasında thread geçişini zorlayan LRU sözlüğü"""
+    def get(self, key, default=None):
+        value = super().get(key, default)
+        time.sleep(0)
+        return value
+
+
+def hammer(module, name, work, threads=8):
+    """Modülün LRU'sunu SlowLru ile değiştirip `work(thread_no)` işini aynı anda çalıştır"""
+    errors = []
+
+    def run(n):
+        try:
+            work(n)
+        except Exception as e:
+            errors.append(e)
+
+    saved = getattr(module, name)
+    lru = SlowLru()
+    setattr(module, name, lru)
+    try:
+        workers = [threading.Thread(target=run, args=(n,)) for n in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        setattr(module, name, saved)
+    return errors, lru
+
+
+class KeyCache:
+    """Yolu anahtar olarak kullanan, her dosya için aynı küçük zaman çizelgesini veren önbellek"""
+    def __init__(self, timeline):
+        self.timeline = timeline
+
+    def key_for(self, path):
+        return path
+
+    def get_or_compile(self, path):
+        return self.timeline
+
+
+def test_index_lru_is_thread_safe(song):
+    timeline = compile_midi(song)
+    cache = KeyCache(timeline)
+    index = SeekIndex(timeline, interval=512)
+
+    def work(n):
+        for i in range(500):
+            key = f"lru-{(n + i) % 12}"
+            if i % 3:
+                seek_index.seek_index(key, cache)
+            else:
+                remember_index(key, index)
+            has_index(key)
+
+    errors, lru = hammer(seek_index, "_indexes", work)
+    assert errors == []
+    assert len(lru) == seek_index.CACHE_SIZE
+
+
+def test_melody_lru_is_thread_safe():
+    cache = KeyCache([(0.0, 60, NOTE_ON, 0, 0), (1.0, 60, NOTE_OFF, 0, 0)])
+
+    def work(n):
+        for i in range(500):
+            key = f"lru-{(n * 3 + i) % 18}"
+            melody.melody_line(key, 'skyline', cache)
+            has_line(key, 'skyline')
+
+    errors, lru = hammer(melody, "_lines", work)
+    assert errors == []
+    assert len(lru) == melody.CACHE_SIZE
@@ -0,0 +1,40 @@
+from serial_protocol import (OP_TONE, OP_STATS, OP_RESET, OP_QUEUE, FrameDecoder, encode_tone, encode_stats,
+                             encode_reset, encode_queue, decode_tone, decode_queue)
+
+
+def test_round_trip():
+    frames = [encode_tone(0), encode_tone(440), encode_tone(65535), encode_stats(), encode_reset(),
+              encode_queue(0, 262), encode_queue(0xFFFFFFFF, 1), encode_queue(123456, 8000)]
+    decoded = list(FrameDecoder().feed(b"".join(frames)))
+
+    assert [opcode for opcode, _ in decoded] == [OP_TONE] * 3 + [OP_STATS, OP_RESET] + [OP_QUEUE] * 3
+    assert [decode_tone(payload) for _, payload in decoded[:3]] == [0, 440, 65535]
+    assert [payload for _, payload in decoded[3:5]] == [b"", b""]
+    assert [decode_queue(payload) for _, payload in decoded[5:]] == [(0, 262), (0xFFFFFFFF, 1), (123456, 8000)]
+
+
+def test_values_are_clamped():
+    decoder = FrameDecoder()
+    (_, payload), = decoder.feed(encode_tone(70000))
+    assert decode_tone(payload) == 65535
+    (_, payload), = decoder.feed(encode_queue(1 << 32 | 5, -3))
+    assert decode_queue(payload) == (5, 0)
+
+
+def test_bad_frame_is_skipped():
+    decoder = FrameDecoder()
+    broken = bytearray(encode_tone(440))
+    broken[-1] ^= 0xFF
+    # Başlık olmayan gürültü ve bozuk çerçeve atlanır, sonraki çerçeve çözülür
+    stream = b"\x00\x17" + bytes(broken) + encode_tone(880)
+    assert [decode_tone(payload) for _, payload in decoder.feed(stream)] == [880]
+    assert decoder.bad_frames == 1
+
+
+def test_frame_split_across_reads():
+    decoder = FrameDecoder()
+    frame = encode_queue(1000, 440)
+    decoded = []
+    for i in range(len(frame)):
+        decoded += decoder.feed(frame[i:i + 1])
+    assert decoded == [(OP_QUEUE, frame[1:-1])]
@@ -0,0 +1,33 @@
+import threading
+from serial_writer import SerialWriter
+
+
+class GatedPort:
+    """İlk yazma `gate` açılana kadar bekler; yazılan çerçeveleri sırayla tutar"""
+    def __init__(self):
+        self.gate = threading.Event()
+        self.frames = []
+
+    def write(self, frame):
+        self.gate.wait(5.0)
+        self.frames.append(frame)
+
+
+def test_on_written_follows_coalesced_tone():
+    port = GatedPort()
+    writer = SerialWriter(port)
+    writer.start()
+    written = []
+    try:
+        writer.send(b"A")
+        writer.send_tone(b"t1", lambda done: written.append("t1"))
+        writer.send_tone(b"t2", lambda done: written.append("t2"))
+        writer.send_tone(b"t3")
+        port.gate.set()
+        assert writer.flush(5.0)
+    finally:
+        writer.stop()
+        writer.join(5.0)
+
+    assert port.frames == [b"A", b"t3"]
+    assert written == ["t1", "t2"]  # Birleştirilen tonların geri çağrıları yazılan çerçeveyle gelir
@@ -0,0 +1,99 @@
+import os
+import threading
+import pytest
+from midi_timeline import compile_midi
+from timeline_cache import HEADER, TimelineCache, content_digest
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TimelineCache(str(tmp_path / "cache"))
+
+
+def test_store_load_round_trip(cache, song):
+    timeline = compile_midi(song)
+    key = cache.key_for(song)
+    cache.store(key, timeline, content_digest(song))
+
+    loaded = cache.load(key)
+    assert loaded is not None
+    assert list(loaded) == list(timeline)
+    assert loaded.duration == timeline.duration
+
+
+def test_loaded_timeline_is_read_only(cache, song):
+    key = cache.key_for(song)
+    cache.store(key, compile_midi(song))
+    loaded = cache.load(key)
+    with pytest.raises(TypeError):
+        loaded.append(1.0, 60, 1, 0)
+    copy = loaded.copy()
+    copy.append(1e9, 60, 1, 0)
+    assert len(copy) == len(loaded) + 1
+
+
+def test_get_or_compile_hit_matches_miss(cache, song):
+    first = cache.get_or_compile(song)
+    second = cache.get_or_compile(song)
+    assert list(second) == list(first)
+    assert list(cache.open_events(song)) == list(first)
+
+
+def test_truncated_entry_is_a_miss(cache, song):
+    key = cache.key_for(song)
+    cache.store(key, compile_midi(song))
+    entry = cache._entry_path(key)
+    with open(entry, "r+b") as f:
+        f.truncate(os.path.getsize(entry) - 8)
+
+    assert cache.load(key) is None
+    assert not os.path.exists(entry)
+
+
+def test_key_follows_file_stat(cache, song):
+    key = cache.key_for(song)
+    stat = os.stat(song)
+    os.utime(song, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert cache.key_for(song) != key
+
+
+def test_stale_entry_is_a_miss(cache, song):
+    cache.get_or_compile(song)
+    key = cache.key_for(song)
+
+    # İçerik değişti ama yol, boyut ve zaman aynı kaldı
+    stat = os.stat(song)
+    data = bytearray(open(song, "rb").read())
+    data[-5] ^= 0x01
+    with open(song, "wb") as f:
+        f.write(data)
+    os.utime(song, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert cache.key_for(song) == key
+
+    # Bayat kayıt daha ilk açılışta çalınmaz; yeni içerikle yeniden yazılır
+    assert list(cache.get_or_compile(song)) == list(compile_midi(song))
+    with open(cache._entry_path(key), "rb") as f:
+        assert HEADER.unpack(f.read(HEADER.size))[3] == content_digest(song)
+
+
+def test_concurrent_stores_do_not_collide(cache, song):
+    timeline = compile_midi(song)
+    key = cache.key_for(song)
+    errors = []
+
+    def store():
+        try:
+            for _ in range(20):
+                cache.store(key, timeline, content_digest(song))
+        except OSError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=store) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert list(cache.load(key)) == list(timeline)
+    assert not [name for name in os.listdir(cache.directory) if name.endswith(".tmp")]
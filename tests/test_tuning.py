@@ -0,0 +1,48 @@
+import pytest
+from tuning import CENTS_PER_NOTE, MAX_FREQ, REST, TABLE_SIZE, get_table, note_of, transposed
+
+
+def pitch(note, bend=0):
+    return note * CENTS_PER_NOTE + bend
+
+
+@pytest.mark.parametrize("note, freq", [(69, 440), (81, 880), (57, 220), (60, 261), (0, 8)])
+def test_equal_temperament(note, freq):
+    assert get_table().lookup(pitch(note)) == freq
+
+
+def test_a4_and_cent_offset():
+    assert get_table(432.0).lookup(pitch(69)) == 432
+    assert get_table(440.0, 100).lookup(pitch(69)) == get_table().lookup(pitch(70))
+    assert get_table(440.0, -1200).lookup(pitch(69)) == 220
+
+
+def test_bend_resolves_between_notes():
+    table = get_table()
+    assert table.lookup(pitch(69, 200)) == table.lookup(pitch(71))
+    assert table.lookup(pitch(69, -200)) == table.lookup(pitch(67))
+    assert table.lookup(pitch(69)) < table.lookup(pitch(69, 50)) < table.lookup(pitch(70))
+
+
+def test_rest_and_clamping():
+    table = get_table()
+    assert table.lookup(REST) == 0
+    # Aralık dışı perdeler sessizlik değil, en yakın sınırdır
+    assert table.lookup(pitch(0, -300)) == table.lookup(0) > 0
+    assert table.lookup(pitch(200)) == table.lookup(TABLE_SIZE - 1) <= MAX_FREQ
+
+
+def test_transpose_keeps_rest():
+    assert transposed(pitch(60, 30), 2) == pitch(62, 30)
+    assert transposed(REST, -24) == REST
+    assert transposed(pitch(1), -12) != REST
+
+
+def test_note_of_rounds_to_nearest():
+    assert note_of(pitch(60, 49)) == 60
+    assert note_of(pitch(60, 50)) == 61
+    assert note_of(pitch(60, -50)) == 60
+
+
+def test_tables_are_shared():
+    assert get_table(441.0, 5) is get_table(441.0, 5)
@@ -0,0 +1,110 @@
+import time
+import pytest
+
+pytest.importorskip("tty")      # Sahte terminal yalnızca POSIX'te
+pytest.importorskip("serial")   # ArduinoBuzzer pyserial ile bağlanır
+
+from arduino_buzzer import ArduinoBuzzer
+from benchmark import make_midi
+from player_solo import SoloPlayer
+from serial_protocol import OP_QUEUE, OP_RESET, OP_TONE
+from virtual_arduino import VirtualArduino, measure
+from wav_renderer import render_schedule
+
+SETTINGS = {'transpose': 0, 'playback_speed': 4.0, 'arp_speed': 40, 'arp_pattern': 'up',
+            'melody': 'latest', 'a4': 440.0, 'cents': 0}
+
+
+@pytest.fixture
+def short_song(tmp_path):
+    path = str(tmp_path / "short.mid")
+    make_midi(path, 40, tracks=1, polyphony=1, tempo_changes=0)
+    return path
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def play(path, device, device_timing):
+    buzzer = ArduinoBuzzer()
+    buzzer.reset_on_connect = False
+    ok, message = buzzer.connect(device.port)
+    assert ok, message
+    buzzer.scheduled_mode = device_timing
+    device.commands.clear()
+    device.tones.clear()
+    try:
+        SoloPlayer(path, buzzer, lambda text, active: None, lambda: SETTINGS).run()
+    finally:
+        buzzer.disconnect()
+    return buzzer
+
+
+def test_immediate_mode_sends_tones(short_song):
+    expected = render_schedule(short_song, 'solo', SETTINGS)[1].tolist()
+    with VirtualArduino() as device:
+        play(short_song, device, device_timing=False)
+        assert wait_for(lambda: device.tones and device.tones[-1][1] == 0)
+        commands = list(device.commands)
+
+    assert device.bad_frames == 0
+    assert {opcode for _, opcode, _ in commands} == {OP_TONE}
+    # Yazıcı bekleyen tonları birleştirebilir: alınanlar programın sıralı bir alt kümesidir
+    received = iter(expected)
+    assert all(values[0] in received for _, _, values in commands)
+    assert len(commands) >= len(expected) * 0.9
+
+
+def test_device_timing_queues_the_schedule(short_song):
+    times, freqs = render_schedule(short_song, 'solo', SETTINGS)
+    with VirtualArduino() as device:
+        play(short_song, device, device_timing=True)
+        assert wait_for(lambda: len(device.commands) > 1 and device.commands[-1][1] == OP_RESET)
+        commands = list(device.commands)
+        played = [freq for _, freq, source in device.tones if source == 'queue']
+
+    assert device.bad_frames == 0
+    assert commands[0][1] == OP_RESET and commands[-1][1] == OP_RESET
+    queued = [values for _, opcode, values in commands if opcode == OP_QUEUE]
+    assert [freq for _, freq in queued] == freqs.tolist()
+    # Cihaz zamanları şarkı programını izler (yuvarlama ve saat eşitleme payıyla)
+    offsets = [device_ms / 1000 - at for (device_ms, _), at in zip(queued, times)]
+    assert max(offsets) - min(offsets) < 0.01
+    # Kapanıştaki RESET, çalınmayı bekleyen son sessizliği kesebilir (RESET de susturur)
+    assert played == freqs.tolist()[:len(played)]
+    assert len(played) >= len(freqs) - 1
+
+
+@pytest.mark.parametrize("device_timing", [False, True])
+def test_measure(short_song, device_timing):
+    result = measure(short_song, 'solo', SETTINGS, device_timing)
+    assert result['bad_frames'] == 0
+    assert result['sent'] > 0
+    assert result['matched'] >= result['sent'] - 1
+
+
+def test_reboot_falls_back_to_immediate():
+    with VirtualArduino() as device:
+        buzzer = ArduinoBuzzer()
+        buzzer.reset_on_connect = False
+        ok, message = buzzer.connect(device.port)
+        assert ok, message
+        try:
+            buzzer.scheduled_mode = True
+            buzzer.begin_playback()
+            assert buzzer.schedule_epoch is not None
+
+            # Kart kendiliğinden yeniden başladı: kuyruğu ve saati gitti
+            device.reboot()
+            assert wait_for(lambda: buzzer.schedule_epoch is None)
+            assert buzzer.lookahead == 0.0
+            device.commands.clear()
+            buzzer.send_freq(440, time.perf_counter())
+            assert wait_for(lambda: device.commands)
+            assert device.commands[0][1:] == (OP_TONE, (440,))
+        finally:
+            buzzer.disconnect()
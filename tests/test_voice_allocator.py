@@ -0,0 +1,48 @@
+from midi_timeline import NOTE_OFF, NOTE_ON, PITCH_BEND
+from tuning import REST
+from voice_allocator import VoiceAllocator, iter_voice_segments
+
+
+def test_free_voices_then_oldest_is_stolen():
+    allocator = VoiceAllocator(3)
+    assert [allocator.note_on(note, 0) for note in (60, 64, 67)] == [0, 1, 2]
+    # Ses kalmadı: en eski nota (60) susturulur
+    assert allocator.note_on(72, 0) == 0
+    assert allocator.note_off(60, 0) is None
+    # Yeniden basılan nota yaşlanmaz: sıradaki kurban 67 değil 64 olur
+    allocator.note_on(64, 0)
+    allocator.note_on(76, 0)
+    assert allocator.keys == [(72, 0), (64, 0), (76, 0)]
+
+
+def test_released_voice_is_reused():
+    allocator = VoiceAllocator(2)
+    allocator.note_on(60, 0)
+    allocator.note_on(62, 0)
+    assert allocator.note_off(60, 0) == 0
+    assert allocator.note_on(65, 1) == 0
+
+
+def test_pinned_channel_keeps_its_voices():
+    allocator = VoiceAllocator(3, pins={9: [2]})
+    assert allocator.note_on(36, 9) == 2
+    assert allocator.note_on(38, 9) == 2  # Sabitlenmiş kanal kendi sesini çalar
+    assert [allocator.note_on(note, 0) for note in (60, 64, 67)] == [0, 1, 0]
+    assert allocator.keys[2] == (38, 9)   # Diğer kanallar sabit sese dokunmaz
+
+
+def test_all_voices_pinned_shares_every_voice():
+    allocator = VoiceAllocator(2, pins={0: [0], 1: [1]})
+    assert allocator.note_on(60, 5) == 0
+    assert allocator.note_on(62, 5) == 1
+
+
+def test_voice_segments():
+    events = [(0.0, 60, NOTE_ON, 0, 0), (0.0, 64, NOTE_ON, 0, 0),
+              (0.5, 0, PITCH_BEND, 0, 50),
+              (1.0, 60, NOTE_OFF, 0, 0), (1.0, 64, NOTE_OFF, 0, 0)]
+    assert list(iter_voice_segments(events, 2)) == [
+        (0.0, 0, 6000), (0.0, 1, 6400),
+        (0.5, 0, 6050), (0.5, 1, 6450),
+        (1.0, 0, REST), (1.0, 1, REST),
+    ]
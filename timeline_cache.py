@@ -0,0 +1,211 @@
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import weakref
+from midi_timeline import Timeline, PARSER_VERSION, compile_midi, stream_events
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "arduino_midi_studio")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024   # 256 MB
+
+# Dosya başlığı: sihirli değer, derleyici sürümü, olay sayısı, kaynak dosyanın SHA-1 özeti
+HEADER = struct.Struct("<8sIQ20s")
+MAGIC = b"AMSTL\x00\x00\x02"
+NO_DIGEST = bytes(20)
+ALIGN = 8
+
+
+def _padded(size):
+    return (size + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _entry_size(count):
+    """`count` olaylık kaydın bayt cinsinden beklenen boyutu"""
+    return _padded(HEADER.size) + sum(_padded(count * struct.calcsize(code)) for _, code in Timeline.COLUMNS)
+
+
+def content_digest(path):
+    """Dosya içeriğinin SHA-1 özeti"""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def _close_mapping(buf):
+    # Zaman çizelgesi bırakıldı: eşlemeyi kapat (Windows'ta kayıt ancak kapalıyken silinebilir
+    # veya değiştirilebilir). Sütunlar hâlâ bir yerde okunuyorsa eşleme onlarla birlikte kapanır.
+    try:
+        buf.close()
+    except BufferError:
+        pass
+
+
+class TimelineCache:
+    """Derlenmiş zaman çizelgelerini mmap'lenebilir ikili dosyalar olarak saklar (LRU)"""
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or os.environ.get("ARDUINO_MIDI_CACHE", DEFAULT_CACHE_DIR)
+        self.max_bytes = max_bytes
+
+    def key_for(self, path):
+        """Dosya yolu, boyutu, değişme zamanı + derleyici sürümünden anahtar üret.
+
+        Dosya okunmadığı için bellek içi tablolar (seek index, melodi) ucuzca
+        anahtarlanır. Disk kaydı ayrıca kaynak içerik özetini taşır ve isabet
+        döndürülmeden önce doğrulanır.
+        """
+        st = os.stat(path)
+        ident = f"{os.path.abspath(path)}\0{st.st_size}\0{st.st_mtime_ns}"
+        digest = hashlib.sha1(ident.encode("utf-8", "surrogateescape"))
+        return f"{digest.hexdigest()}-v{PARSER_VERSION}"
+
+    def _entry_path(self, key):
+        return os.path.join(self.directory, key + ".tl")
+
+    def load(self, key):
+        """Önbellekte varsa zaman çizelgesini diskten kopyalamadan eşle.
+
+        Sütunlar salt okunurdur. Başlıktaki olay sayısıyla dosya boyutu
+        uyuşmayan (yarım yazılmış, kesilmiş) kayıt silinir ve yok sayılır.
+        """
+        return self._map(key)
+
+    def _map(self, key, digest=None):
+        # Zaman çizelgesi veya None. `digest` verilirse kayıttaki kaynak özetiyle aynı
+        # olmalı: yol, boyut ve zaman aynı kalıp içerik değiştiyse (ör. zamanı
+        # korunarak üzerine kopyalanan dosya) bayat kayıt silinir
+        entry = self._entry_path(key)
+        try:
+            with open(entry, "rb") as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        try:
+            magic, version, count, stored = HEADER.unpack_from(buf, 0)
+            if magic != MAGIC or version != PARSER_VERSION:
+                raise ValueError("uyumsuz önbellek kaydı")
+            if digest is not None and stored != digest:
+                raise ValueError("bayat önbellek kaydı")
+            if len(buf) != _entry_size(count):
+                raise ValueError("kesik önbellek kaydı")
+
+            view = memoryview(buf)
+            offset = _padded(HEADER.size)
+            columns = {}
+            for name, code in Timeline.COLUMNS:
+                size = count * struct.calcsize(code)
+                columns[name] = view[offset:offset + size].cast(code)
+                offset += _padded(size)
+        except (ValueError, TypeError, struct.error):
+            buf.close()
+            self._remove(entry)
+            return None
+
+        # LRU için son kullanım zamanını güncelle
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+        timeline = Timeline(**columns, readonly=True)
+        weakref.finalize(timeline, _close_mapping, buf)
+        return timeline
+
+    def store(self, key, timeline, digest=NO_DIGEST):
+        """Zaman çizelgesini atomik olarak yaz, ardından boyut sınırını uygula.
+
+        `digest` kaynak dosyanın content_digest() özetidir; verilmezse kayıt
+        yalnızca anahtarla (load) okunabilir, dosya yoluyla açılışta isabet sayılmaz.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        entry = self._entry_path(key)
+        # Aynı süreçte önceden yükleme ve arayüz aynı dosyayı aynı anda yazabilir
+        tmp = f"{entry}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, PARSER_VERSION, len(timeline), digest))
+            f.write(b"\x00" * (_padded(HEADER.size) - HEADER.size))
+            for name, _ in Timeline.COLUMNS:
+                data = memoryview(getattr(timeline, name)).cast("B")
+                f.write(data)
+                f.write(b"\x00" * (_padded(len(data)) - len(data)))
+        os.replace(tmp, entry)
+
+        self.evict()
+
+    def get_or_compile(self, path):
+        """Önbellekten yükle, yoksa derleyip önbelleğe yaz"""
+        key = self.key_for(path)
+        digest = content_digest(path)
+        timeline = self._map(key, digest)
+        if timeline is not None:
+            return timeline
+        timeline = compile_midi(path)
+        try:
+            self.store(key, timeline, digest)
+        except OSError:
+            pass  # Önbellek yazılamıyorsa oynatma yine de devam etsin
+        return timeline
+
+    def open_events(self, path):
+        """Önbellekte varsa Timeline'ı, yoksa dosyayı akıtan bir üreteci döndür"""
+        key = self.key_for(path)
+        digest = content_digest(path)
+        timeline = self._map(key, digest)
+        if timeline is not None:
+            return timeline
+        return self._stream_and_store(key, path, digest)
+
+    def _stream_and_store(self, key, path, digest):
+        # Olaylar okundukça çalınır; akış sonuna kadar tüketilirse önbelleğe yazılır
+        timeline = Timeline()
+        for event in stream_events(path):
+            timeline.append(*event)
+            yield event
+        try:
+            self.store(key, timeline, digest)
+        except OSError:
+            pass
+
+    def evict(self):
+        """Toplam boyut sınırı aşılırsa en eski kullanılan kayıtları sil"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        entries = []
+        total = 0
+        for name in names:
+            if not name.endswith(".tl"):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+            total += st.st_size
+
+        entries.sort()
+        for _, size, name in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(os.path.join(self.directory, name))
+            total -= size
+
+    @staticmethod
+    def _remove(entry):
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+
+default_cache = TimelineCache()
+
+
+def open_events(path):
+    """Oynatıcılar için: ilk olaylar hazır olur olmaz çalmaya başlanabilen olay akışı"""
+    return default_cache.open_events(path)
@@ -0,0 +1,47 @@
+import array
+from functools import lru_cache
+
+# Perde birimi: nota * 100 + bükme (cent). Sessizlik yalnızca REST ile belirtilir.
+CENTS_PER_NOTE = 100
+TABLE_SIZE = 128 * CENTS_PER_NOTE
+A4_PITCH = 69 * CENTS_PER_NOTE
+DEFAULT_A4 = 440.0
+MAX_FREQ = 65535  # Arduino tone() üst sınırı (unsigned int)
+REST = -0x8000    # Açık sessizlik (es): hiçbir nota + bükme + transpoz bu değere inmez
+
+
+class FrequencyTable:
+    """Cent çözünürlüklü perde -> tam sayı frekans (Hz) tablosu.
+
+    Tüm nota x bükme adımları akort değiştiğinde bir kez hesaplanır; oynatma
+    sırasında her nota ve bükme güncellemesi tek bir dizi erişimidir.
+    """
+    def __init__(self, a4=DEFAULT_A4, cents_offset=0):
+        self.a4 = a4
+        self.cents_offset = cents_offset
+        self.freqs = array.array('H', (
+            min(int(a4 * 2 ** ((pitch + cents_offset - A4_PITCH) / 1200)), MAX_FREQ)
+            for pitch in range(TABLE_SIZE)
+        ))
+
+    def lookup(self, pitch):
+        """Perdenin çalınacak frekansı (aralık dışı perdeler sınıra sabitlenir, REST -> 0)"""
+        if pitch == REST:
+            return 0
+        return self.freqs[min(max(pitch, 0), TABLE_SIZE - 1)]
+
+
+@lru_cache(maxsize=8)
+def get_table(a4=DEFAULT_A4, cents_offset=0):
+    """Akort ayarı için tabloyu bir kez üret, sonra aynısını döndür"""
+    return FrequencyTable(a4, cents_offset)
+
+
+def transposed(pitch, semitones):
+    """Perdeyi yarım ton kaydır; es olduğu gibi kalır"""
+    return pitch + semitones * CENTS_PER_NOTE if pitch != REST else REST
+
+
+def note_of(pitch):
+    """Perdeye en yakın MIDI notası"""
+    return (pitch + CENTS_PER_NOTE // 2) // CENTS_PER_NOTE
@@ -0,0 +1,50 @@
+from types import MappingProxyType
+
+DEFAULT_FPS = 30
+
+
+class StatusSlot:
+    """Oynatıcı thread'inin kilitsiz yazdığı son durum (metin, aktif)"""
+    def __init__(self, text="READY", active=False):
+        self.value = (text, active)
+
+    def set(self, text, active):
+        # Tek bir referans ataması: kilit gerekmez, Tk'ye dokunulmaz
+        self.value = (text, active)
+
+
+class UiRefresher:
+    """Tk after() döngüsü: slot değiştiyse sabit kare hızında ekrana yansıtır"""
+    def __init__(self, root, slot, apply, fps=DEFAULT_FPS):
+        self.root = root
+        self.slot = slot
+        self.apply = apply
+        self.interval_ms = max(1, int(1000 / fps))
+        self._last = None
+
+    def start(self):
+        self._tick()
+
+    def _tick(self):
+        value = self.slot.value
+        if value is not self._last:
+            self._last = value
+            self.apply(*value)
+        self.root.after(self.interval_ms, self._tick)
+
+
+class SettingsStore:
+    """Ayarların değişmez anlık görüntüsü.
+
+    Görüntü yalnızca Tk thread'inde (değişken izleyicilerinden) yenilenir;
+    oynatıcılar get() ile tk.Variable okumadan son hali alır.
+    """
+    def __init__(self, read_settings):
+        self.read_settings = read_settings
+        self.snapshot = MappingProxyType(read_settings())
+
+    def refresh(self, *args):
+        self.snapshot = MappingProxyType(self.read_settings())
+
+    def get(self):
+        return self.snapshot
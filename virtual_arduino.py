@@ -0,0 +1,274 @@
+import json
+import os
+import select
+import threading
+import time
+import tty
+from collections import deque
+from serial_protocol import (BAUD_RATE, QUEUE_SIZE, OP_TONE, OP_STATS, OP_RESET, OP_QUEUE, LINE_READY,
+                             LINE_RESET, LINE_CREDIT, LINE_STATS, FrameDecoder, decode_tone, decode_queue)
+
+BANNER = LINE_READY
+CREDIT_BATCH = 8            # arduino_buzzer_player.ino ile aynı
+CREDIT_INTERVAL = 0.020     # saniye
+TICK = 0.001                # Kuyruk kontrol aralığı (loop() taklidi)
+FREE_RAM = 1480             # STATS yanıtındaki sabit değerler
+CHIP_TEMP = 25.0
+
+
+class VirtualArduino(threading.Thread):
+    """Sahte terminal (pty) üzerinde arduino_buzzer_player.ino'yu taklit eden cihaz.
+
+    `port` yolu gerçek bir seri port gibi ArduinoBuzzer.connect() ile açılır.
+    Gelen her komut zaman damgasıyla `commands` listesine, çalınan her frekans
+    `tones` listesine (perf_counter saniyesi, Hz, kaynak) kaydedilir.
+    `baud` verilirse baytlar hattaki aktarım süresi kadar gecikmeli işlenir.
+    """
+    def __init__(self, baud=BAUD_RATE):
+        super().__init__()
+        self.daemon = True
+        self.is_running = True
+        self.byte_time = 10.0 / baud if baud else 0.0  # 8N1: bayt başına 10 bit
+
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)  # Yankı ve satır düzenleme kapalı: ikili veri bozulmaz
+        os.set_blocking(self.master, False)
+        self.port = os.ttyname(self.slave)
+
+        self.commands = []   # (zaman, opcode, değerler)
+        self.tones = []      # (zaman, frekans, 'tone' | 'queue' | 'reset')
+        self.bytes_received = 0
+        self._decoder = FrameDecoder()
+        self._lock = threading.Lock()
+
+        self._incoming = deque()   # (varış zamanı, baytlar)
+        self._wire_free = 0.0
+        self._reset_state()
+        self.boot_time = time.perf_counter()
+        self._write_line(BANNER)
+
+    def _reset_state(self):
+        self._decoder.reset()
+        self._queue = deque()       # (cihaz ms, frekans)
+        self._epoch = time.perf_counter()
+        self._pending_credits = 0
+        self._last_credit = 0.0
+
+    # --- Arduino tarafı ---
+
+    def millis(self):
+        return int((time.perf_counter() - self.boot_time) * 1000)
+
+    def run(self):
+        while self.is_running:
+            try:
+                readable, _, _ = select.select([self.master], [], [], TICK)
+                if readable:
+                    self._receive(os.read(self.master, 4096))
+            except OSError:
+                pass  # Uygulama portu kapattı; yeniden açılmasını bekle
+            now = time.perf_counter()
+            while self._incoming and self._incoming[0][0] <= now:
+                arrived, data = self._incoming.popleft()
+                self._parse(data, arrived)
+            self._play_queue(now)
+
+    def _receive(self, data):
+        # Baytlar hat hızında gelmiş gibi sıraya alınır
+        now = time.perf_counter()
+        self._wire_free = max(now, self._wire_free) + len(data) * self.byte_time
+        self._incoming.append((self._wire_free, data))
+        self.bytes_received += len(data)
+
+    @property
+    def bad_frames(self):
+        return self._decoder.bad_frames
+
+    def _parse(self, data, arrived):
+        for opcode, payload in self._decoder.feed(data):
+            self._handle(opcode, payload, arrived)
+
+    def _handle(self, opcode, payload, arrived):
+        if opcode == OP_TONE:
+            freq = decode_tone(payload)
+            self._record(arrived, opcode, (freq,))
+            self._play(arrived, freq, 'tone')
+        elif opcode == OP_STATS:
+            self._record(arrived, opcode, ())
+            self._write_line(f"{LINE_STATS}{CHIP_TEMP:.1f},{FREE_RAM},{self.millis()}")
+        elif opcode == OP_RESET:
+            self._record(arrived, opcode, ())
+            self._reset_state()
+            self._play(arrived, 0, 'reset')
+            self._write_line(f"{LINE_RESET}{QUEUE_SIZE}")
+        elif opcode == OP_QUEUE:
+            device_ms, freq = decode_queue(payload)
+            self._record(arrived, opcode, (device_ms, freq))
+            # Python kredi sayarak taşmayı önler; yine de doluysa komut atılır
+            if len(self._queue) < QUEUE_SIZE:
+                self._queue.append((device_ms, freq))
+
+    def _play_queue(self, now):
+        device_ms = (now - self._epoch) * 1000
+        while self._queue and self._queue[0][0] <= device_ms:
+            _, freq = self._queue.popleft()
+            self._play(now, freq, 'queue')
+            self._pending_credits += 1
+
+        if self._pending_credits and (self._pending_credits >= CREDIT_BATCH or
+                                      now - self._last_credit >= CREDIT_INTERVAL):
+            self._write_line(f"{LINE_CREDIT}{self._pending_credits}")
+            self._pending_credits = 0
+            self._last_credit = now
+
+    def _record(self, arrived, opcode, values):
+        with self._lock:
+            self.commands.append((arrived, opcode, values))
+
+    def _play(self, at, freq, source):
+        with self._lock:
+            self.tones.append((at, freq, source))
+
+    def _write_line(self, text):
+        try:
+            os.write(self.master, (text + "\r\n").encode())
+        except OSError:
+            pass  # Okuyan yoksa (tampon dolu) satır atılır, gerçek kartta olduğu gibi
+
+    # --- Test tarafı ---
+
+    def reboot(self):
+        """DTR ile yeniden başlatmayı taklit et: durumu sıfırla ve karşılama satırını gönder"""
+        self._reset_state()
+        self.boot_time = time.perf_counter()
+        self._write_line(BANNER)
+
+    def summary(self):
+        """Alınan komutların ve çalınan tonların özeti"""
+        with self._lock:
+            commands = list(self.commands)
+            tones = list(self.tones)
+        span = commands[-1][0] - commands[0][0] if len(commands) > 1 else 0.0
+        return {
+            'commands': len(commands),
+            'bytes': self.bytes_received,
+            'bad_frames': self.bad_frames,
+            'commands_per_sec': len(commands) / span if span else 0.0,
+            'bytes_per_sec': self.bytes_received / span if span else 0.0,
+            'tones': len(tones),
+        }
+
+    def save(self, path):
+        """Kayıtlı komut ve ton zaman çizelgesini JSON olarak yaz (zamanlar başlangıca göre sn)"""
+        with self._lock:
+            commands = list(self.commands)
+            tones = list(self.tones)
+        data = {
+            'summary': self.summary(),
+            'commands': [[t - self.boot_time, op, list(values)] for t, op, values in commands],
+            'tones': [[t - self.boot_time, freq, source] for t, freq, source in tones],
+        }
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+    def stop(self):
+        self.is_running = False
+        self.join(1.0)
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def tone_latencies(sent, received):
+    """Uygulamanın send_freq çağrıları ile cihaza ulaşan ton komutlarını eşleştir (sn).
+
+    `sent` ve `received` (zaman, frekans) listeleridir. Yazıcı thread'i bekleyen
+    tonları birleştirebildiği için her alınan ton, ondan önce aynı frekansla
+    yapılan son çağrıyla eşleştirilir.
+    """
+    latencies = []
+    j = 0
+    for received_at, freq in received:
+        while j + 1 < len(sent) and sent[j + 1][0] <= received_at:
+            j += 1
+        for k in range(j, max(-1, j - 64), -1):
+            if sent[k][1] == freq and sent[k][0] <= received_at:
+                latencies.append(received_at - sent[k][0])
+                break
+    return latencies
+
+
+def measure(midi_path, mode, settings, device_timing=False, baud=BAUD_RATE):
+    """Dosyayı uygulamanın tamamıyla (ArduinoBuzzer + oynatıcı) sanal karta çal ve ölç.
+
+    Gecikme, oynatıcının notayı istediği an ile tonun sanal kartta çalındığı
+    an arasındaki farktır (ms). Zamanlanmış modda cihaz kuyruğu da dahildir.
+    Kart yanıt vermezse ConnectionError, oynatıcı hata bildirirse RuntimeError yükselir.
+    """
+    from arduino_buzzer import ArduinoBuzzer
+    if mode == 'arpej':
+        from player_arpej import ChiptunePlayer as Player
+    else:
+        from player_solo import SoloPlayer as Player
+
+    class TimedBuzzer(ArduinoBuzzer):
+        # Her frekans değişikliğinin istenen çalma anını kaydeder
+        def send_freq(self, freq, at=None):
+            if self.is_connected and freq != self.last_freq:
+                sent.append((time.perf_counter() if at is None else at, freq))
+            super().send_freq(freq, at)
+
+    sent = []
+    errors = []
+
+    def status(text, active):
+        if text.startswith("Hata:"):
+            errors.append(text[len("Hata:"):].strip())
+
+    with VirtualArduino(baud) as device:
+        buzzer = TimedBuzzer()
+        buzzer.reset_on_connect = False  # Sanal kart DTR ile yeniden başlamaz: yoklamaya hemen yanıt verir
+        ok, message = buzzer.connect(device.port)
+        if not ok:
+            raise ConnectionError(message)
+        buzzer.scheduled_mode = device_timing
+        device.tones.clear()  # Bağlantı öncesi kayıtlar ölçüme girmesin
+        device.commands.clear()
+
+        player = Player(midi_path, buzzer, status, lambda: settings)
+        player.run()
+        if errors:
+            buzzer.disconnect()
+            raise RuntimeError(errors[0])
+        writer = buzzer.write_metrics()
+        buzzer.disconnect()
+        time.sleep(0.05)  # Son komutların sanal karta ulaşması için
+        received = [(t, freq) for t, freq, source in device.tones if source != 'reset']
+        summary = device.summary()
+
+    latencies = sorted(tone_latencies(sent, received))
+
+    def percentile(p):
+        if not latencies:
+            return 0.0
+        return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000
+
+    summary.update({
+        'sent': len(sent),
+        'matched': len(latencies),
+        'latency_mean_ms': sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+        'latency_p50_ms': percentile(0.50),
+        'latency_p99_ms': percentile(0.99),
+        'latency_max_ms': latencies[-1] * 1000 if latencies else 0.0,
+        'writer': writer,
+    })
+    return summary
@@ -0,0 +1,81 @@
+from midi_timeline import NOTE_ON, PITCH_BEND
+from tuning import CENTS_PER_NOTE, REST
+
+
+class VoiceAllocator:
+    """Eş zamanlı notaları sınırlı sayıda sese (karta) dağıtır.
+
+    Boş ses yoksa en eski nota susturulup yerine yenisi çalınır. `pins`
+    kanal -> ses listesi eşlemesidir: sabitlenmiş kanal yalnızca kendi
+    seslerinde çalar, bu sesler de diğer kanallara verilmez.
+    """
+    def __init__(self, voices, pins=None):
+        self.voices = voices
+        self.pins = pins or {}
+        self.keys = [None] * voices     # Her seste çalan (nota, kanal)
+        self.started = [0] * voices     # Notanın sırası (küçük = eski)
+        self._counter = 0
+
+        reserved = {voice for pinned in self.pins.values() for voice in pinned}
+        free = [voice for voice in range(voices) if voice not in reserved]
+        self._shared = free or list(range(voices))
+
+    def candidates(self, channel):
+        return self.pins.get(channel, self._shared)
+
+    def note_on(self, note, channel):
+        """Notaya ses ata ve sesin numarasını döndür"""
+        key = (note, channel)
+        self._counter += 1
+        if key in self.keys:
+            voice = self.keys.index(key)  # Aynı nota yeniden basıldı: sesi korunur
+        else:
+            candidates = self.candidates(channel)
+            voice = next((v for v in candidates if self.keys[v] is None), None)
+            if voice is None:
+                voice = min(candidates, key=self.started.__getitem__)  # En eski notayı çal
+        self.keys[voice] = key
+        self.started[voice] = self._counter
+        return voice
+
+    def note_off(self, note, channel):
+        """Notanın sesini boşalt (nota çalmıyorsa, örn. çalındıysa, None)"""
+        key = (note, channel)
+        if key not in self.keys:
+            return None
+        voice = self.keys.index(key)
+        self.keys[voice] = None
+        return voice
+
+
+def iter_voice_segments(events, voices, pins=None):
+    """Olay akışını ses başına (başlangıç, ses, perde) değişikliklerine çevir.
+
+    Perde nota * 100 + kanal bükmesidir; REST o sesin susması demektir. Aynı
+    zamandaki olaylar birlikte işlenir ve yalnızca perdesi değişen sesler üretilir.
+    """
+    allocator = VoiceAllocator(voices, pins)
+    bends = [0] * 16
+    current = [REST] * voices
+    batch_time = 0.0
+
+    def changes():
+        for voice, key in enumerate(allocator.keys):
+            pitch = key[0] * CENTS_PER_NOTE + bends[key[1]] if key else REST
+            if pitch != current[voice]:
+                current[voice] = pitch
+                yield batch_time, voice, pitch
+
+    for event_time, note, kind, channel, bend in events:
+        if event_time > batch_time:
+            yield from changes()
+            batch_time = event_time
+
+        if kind == PITCH_BEND:
+            bends[channel] = bend
+        elif kind == NOTE_ON:
+            allocator.note_on(note, channel)
+        else:
+            allocator.note_off(note, channel)
+
+    yield from changes()
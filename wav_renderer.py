@@ -0,0 +1,102 @@
+import wave
+import numpy as np
+from scheduler import OfflineScheduler
+from arduino_buzzer import ArduinoBuzzer
+from timeline_cache import default_cache
+
+SAMPLE_RATE = 44100
+CHUNK_SAMPLES = 1 << 18   # Bellek kullanımı şarkı uzunluğundan bağımsız kalır
+AMPLITUDE = 0.3           # Tam ölçeğin oranı (kare dalga kulağa çok sert gelir)
+TAIL_SECONDS = 0.5        # Son nota susturulmadıysa eklenen süre
+
+
+class ScheduleRecorder:
+    """ArduinoBuzzer yerine geçer: gönderilecek frekansları (sanal saniye, Hz) olarak kaydeder"""
+    lookahead = 0.0
+    get_note_name = staticmethod(ArduinoBuzzer.get_note_name)
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+        self.last_freq = -1
+        self.times = []
+        self.freqs = []
+
+    def send_freq(self, freq, at=None):
+        if freq == self.last_freq:
+            return
+        self.times.append(self.scheduler.now() if at is None else at)
+        self.freqs.append(freq)
+        self.last_freq = freq
+
+    def begin_playback(self):
+        self.last_freq = -1
+
+    def end_playback(self, wait=True):
+        pass
+
+
+def render_schedule(midi_path, mode, settings, cache=default_cache):
+    """Oynatıcının seri porta göndereceği frekans programını beklemeden çıkar: (zamanlar, frekanslar).
+
+    Aynı SoloPlayer / ChiptunePlayer kodu sanal saatle çalıştırılır; transpoz,
+    tempo, arpej ve akort ayarları oynatmadaki gibi uygulanır.
+    """
+    if mode == 'arpej':
+        from player_arpej import ChiptunePlayer as Player
+    else:
+        from player_solo import SoloPlayer as Player
+
+    errors = []
+    def on_status(text, active):
+        if text.startswith("Hata:"):
+            errors.append(text)
+
+    scheduler = OfflineScheduler()
+    recorder = ScheduleRecorder(scheduler)
+    Player(midi_path, recorder, on_status, lambda: settings, scheduler, cache=cache).run()
+    if errors:
+        raise RuntimeError(errors[0])
+    return np.asarray(recorder.times, dtype=np.float64), np.asarray(recorder.freqs, dtype=np.float64)
+
+
+def write_wav(wav_path, times, freqs, sample_rate=SAMPLE_RATE, chunk=CHUNK_SAMPLES):
+    """Frekans programını buzzer benzeri kare dalga olarak 16 bit mono WAV'a yaz.
+
+    Faz notalar arasında sürekli taşınır; her parça NumPy ile tek seferde üretilir.
+    """
+    # Başa sessizlik ekle: ilk örnekten önceki aralık da bir segment olsun
+    starts = np.concatenate(([0], np.round(np.asarray(times) * sample_rate).astype(np.int64)))
+    freqs = np.concatenate(([0.0], np.asarray(freqs, dtype=np.float64)))
+    total = int(starts[-1]) + (int(TAIL_SECONDS * sample_rate) if freqs[-1] > 0 else 0)
+    level = int(AMPLITUDE * 32767)
+
+    phase = 0.0
+    with wave.open(wav_path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+
+        for begin in range(0, total, chunk):
+            end = min(begin + chunk, total)
+            # Parçaya düşen segmentler ve her birinin örnek sayısı
+            first = np.searchsorted(starts, begin, side='right') - 1
+            last = np.searchsorted(starts, end, side='left')
+            bounds = np.clip(starts[first:last], begin, end)
+            lengths = np.diff(np.append(bounds, end))
+            sample_freqs = np.repeat(freqs[first:last], lengths)
+
+            cycles = np.cumsum(sample_freqs * (1.0 / sample_rate))
+            cycles += phase
+            phase = cycles[-1] % 1.0
+            # Dalganın ilk yarısı +, ikinci yarısı -; frekansı 0 olan örnekler sessiz
+            samples = np.where(cycles % 1.0 < 0.5, level, -level).astype('<i2')
+            samples[sample_freqs == 0] = 0
+            wav.writeframes(samples.tobytes())
+
+    return total / sample_rate
+
+
+def render_file(midi_path, wav_path, mode, settings, sample_rate=SAMPLE_RATE):
+    """MIDI dosyasını seçilen modda WAV'a işle; ses süresini (saniye) döndürür"""
+    times, freqs = render_schedule(midi_path, mode, settings)
+    return write_wav(wav_path, times, freqs, sample_rate)